@@ -19,6 +19,16 @@ class CrawlSubmitSerializer(serializers.Serializer):
         min_value=1,
         help_text="Maximum number of pages to crawl (default: 100)"
     )
+    distributed = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Spread the crawl over many workers (no single browser session/IP, default: false)"
+    )
+    partitioned = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Split a large crawl into shards crawled in parallel, one session each (default: false)"
+    )
 
 
 class CrawlStatusRequestSerializer(serializers.Serializer):
@@ -26,6 +36,16 @@ class CrawlStatusRequestSerializer(serializers.Serializer):
     job_id = serializers.UUIDField(required=True, help_text="Existing crawl job identifier")
 
 
+class CrawlResumeSerializer(serializers.Serializer):
+    """Serializer for crawl job resume request."""
+    job_id = serializers.UUIDField(required=True, help_text="Existing crawl job identifier")
+    force = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Also resume a job still marked queued/running, e.g. its worker died (default: false)"
+    )
+
+
 class CrawlStatusSerializer(serializers.Serializer):
     """Serializer for crawl job status response."""
     job_id = serializers.UUIDField(read_only=True)
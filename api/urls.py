@@ -3,12 +3,13 @@ URL configuration for api app.
 
 """
 from django.urls import path
-from api.views import CrawlSubmitView, CrawlStatusView, SearchView, PageDetailsView
+from api.views import CrawlSubmitView, CrawlStatusView, CrawlResumeView, SearchView, PageDetailsView
 
 
 urlpatterns = [
     path('crawl/', CrawlSubmitView.as_view(), name='crawl'),
     path('crawl/<job_id>/', CrawlStatusView.as_view(), name='crawl-status'),
+    path('crawl/<job_id>/resume/', CrawlResumeView.as_view(), name='crawl-resume'),
     path('search/', SearchView.as_view(), name='search'),
     path('page/<page_id>/', PageDetailsView.as_view(), name='page'),
 ]
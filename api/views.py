@@ -1,3 +1,4 @@
+from django.http import HttpResponse
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -7,14 +8,17 @@ from rest_framework.reverse import reverse
 from api.serializers import (
     CrawlSubmitSerializer,
     CrawlStatusRequestSerializer,
+    CrawlResumeSerializer,
     CrawlStatusSerializer,
     SearchRequestSerializer,
     SearchResponseSerializer,
     PageDetailsRequestSerializer,
 )
-from services.crawl_service import CrawlService, SLAExceededError
+from services.crawl_service import AdmissionDeferredError, CrawlService, JobNotResumableError, SLAExceededError
+from models.crawl_job import CrawlJob
 from services.page_service import PageService
 from services.search_service import SearchService
+from integrations.metrics import metrics_payload
 
 
 @api_view(['GET'])
@@ -25,6 +29,7 @@ def api_root(request, format=None):
     return Response({
         "crawl": reverse('crawl', request=request, format=format),
         "crawl-status": reverse('crawl-status', request=request, format=format, kwargs={'job_id': ':job_id'}),
+        "crawl-resume": reverse('crawl-resume', request=request, format=format, kwargs={'job_id': ':job_id'}),
         "search": reverse('search', request=request, format=format),
         "page": reverse('page', request=request, format=format, kwargs={'page_id': ':page_id'}),
     })
@@ -41,7 +46,7 @@ class CrawlSubmitView(GenericAPIView):
 
     def post(self, request, *args, **kwargs):
         """
-        Accepts JSON payload like: {"url": "https://example.com"}
+        Accepts JSON payload like: {"url": "https://example.com", "distributed": false, "partitioned": false}
         """
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -49,13 +54,17 @@ class CrawlSubmitView(GenericAPIView):
         url = serializer.validated_data["url"]
         max_depth = serializer.validated_data.get("max_depth", 2)
         max_pages = serializer.validated_data.get("max_pages", 100)
+        distributed = serializer.validated_data.get("distributed", False)
+        partitioned = serializer.validated_data.get("partitioned", False)
 
         try:
             # Call crawl_service to create job and queue crawl task
             job_data = CrawlService.submit_crawl(
                 url=url,
                 max_depth=max_depth,
-                max_pages=max_pages
+                max_pages=max_pages,
+                distributed=distributed,
+                partitioned=partitioned,
             )
 
             response_data = {
@@ -69,6 +78,12 @@ class CrawlSubmitView(GenericAPIView):
             response_serializer = CrawlStatusSerializer(response_data)
             return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
 
+        except AdmissionDeferredError as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(e.retry_after_s)},
+            )
         except SLAExceededError as e:
             return Response(
                 {"error": str(e)},
@@ -113,6 +128,55 @@ class CrawlStatusView(GenericAPIView):
             )
 
 
+class CrawlResumeView(GenericAPIView):
+    """
+    Resume a failed or cut-short crawl job from its checkpoint.
+
+    POST /api/crawl/<job_id>/resume/
+    """
+    permission_classes = [AllowAny]
+    serializer_class = CrawlResumeSerializer
+
+    def post(self, request, job_id, *args, **kwargs):
+        """
+        Accepts optional JSON payload like: {"force": false}
+        """
+        data = {"job_id": job_id, "force": request.data.get("force", False)}
+        serializer = self.get_serializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        job_id = serializer.validated_data["job_id"]
+
+        try:
+            job_data = CrawlService.resume_crawl(job_id, force=serializer.validated_data["force"])
+
+            response_data = {
+                "job_id": job_data["job_id"],
+                "status": job_data["status"],
+                "url": job_data["url"],
+                "pages_crawled": 0,
+                "created_at": job_data["requested_at"],
+            }
+
+            response_serializer = CrawlStatusSerializer(response_data)
+            return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
+
+        except CrawlJob.DoesNotExist:
+            return Response(
+                {"error": f"Job not found: {job_id}"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        except JobNotResumableError as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_409_CONFLICT
+            )
+        except Exception as e:
+            return Response(
+                {"error": f"Failed to resume crawl job: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
 class SearchView(GenericAPIView):
     """
     Handle search queries across indexed pages.
@@ -186,4 +250,10 @@ class PageDetailsView(GenericAPIView):
             return Response(
                 {"error": f"Failed to retrieve page details: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint (GET /metrics/); plain Django view, not a DRF one."""
+    body, content_type = metrics_payload()
+    return HttpResponse(body, content_type=content_type)
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 from pathlib import Path
+import json
 import os
 import dj_database_url
 
@@ -176,6 +177,84 @@ CELERY_TIMEZONE = 'UTC'
 CELERY_IGNORE_RESULT = True
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 
+# Crawler settings
+# Pages fetched at once by a single crawl job (all share one browser session/IP)
+CRAWL_CONCURRENCY = int(os.environ.get('CRAWL_CONCURRENCY', 1))
+# Try a plain HTTP fetch first, use the headless browser only for JS-rendered pages
+CRAWL_HTTP_FIRST = os.environ.get('CRAWL_HTTP_FIRST', 'TRUE').upper() == 'TRUE'
+# Celery tasks sharing one job in distributed mode (frontier in Redis)
+CRAWL_DISTRIBUTED_WORKERS = int(os.environ.get('CRAWL_DISTRIBUTED_WORKERS', 4))
+# Partitioned mode: shards (child jobs crawled in parallel) a large job is split into
+CRAWL_PARTITION_SHARDS = int(os.environ.get('CRAWL_PARTITION_SHARDS', 4))
+# SLA admission of new jobs: throughput measured over CRAWL_ADMISSION_WINDOW_S (at least the
+# baseline pages/s, assumed while idle); jobs must complete within CRAWL_ADMISSION_SLA_TARGET of
+# the SLA behind the backlog (reserved atomically in Redis), or are deferred / rejected (also while
+# Redis is unavailable); API processes re-read the throughput every CACHE_S
+CRAWL_ADMISSION_WINDOW_S = int(os.environ.get('CRAWL_ADMISSION_WINDOW_S', 300))
+CRAWL_ADMISSION_BASELINE_PAGES_PER_S = float(os.environ.get('CRAWL_ADMISSION_BASELINE_PAGES_PER_S', 2))
+CRAWL_ADMISSION_SLA_TARGET = float(os.environ.get('CRAWL_ADMISSION_SLA_TARGET', 0.8))
+CRAWL_ADMISSION_CACHE_S = int(os.environ.get('CRAWL_ADMISSION_CACHE_S', 5))
+# Politeness per host: token bucket (requests/second + burst), max concurrent fetches.
+# robots.txt Crawl-delay lowers the rate; 429/503 back the host off (up to CRAWL_HOST_MAX_BACKOFF_S)
+CRAWL_HOST_RATE_PER_S = float(os.environ.get('CRAWL_HOST_RATE_PER_S', 2))
+CRAWL_HOST_BURST = int(os.environ.get('CRAWL_HOST_BURST', 4))
+CRAWL_HOST_MAX_CONCURRENCY = int(os.environ.get('CRAWL_HOST_MAX_CONCURRENCY', 4))
+CRAWL_HOST_MAX_BACKOFF_S = int(os.environ.get('CRAWL_HOST_MAX_BACKOFF_S', 120))
+# Rate tokens and backoff shared by all workers through Redis (else per crawl process)
+CRAWL_HOST_LIMITS_SHARED = os.environ.get('CRAWL_HOST_LIMITS_SHARED', 'TRUE').upper() == 'TRUE'
+# Headless browser requests that are aborted (only the DOM is kept):
+# Playwright resource types, and domains (incl. subdomains) such as trackers/ads
+CRAWL_BLOCK_RESOURCE_TYPES = [
+    t for t in os.environ.get('CRAWL_BLOCK_RESOURCE_TYPES', 'image,media,font').split(',') if t
+]
+CRAWL_BLOCK_DOMAINS = [
+    d for d in os.environ.get(
+        'CRAWL_BLOCK_DOMAINS',
+        'google-analytics.com,googletagmanager.com,doubleclick.net,googlesyndication.com,'
+        'facebook.net,connect.facebook.net,hotjar.com,segment.io,mixpanel.com,clarity.ms',
+    ).split(',') if d
+]
+# robots.txt Allow/Disallow filtering and sitemap seeding (per-host data cached in Redis)
+CRAWL_RESPECT_ROBOTS = os.environ.get('CRAWL_RESPECT_ROBOTS', 'TRUE').upper() == 'TRUE'
+CRAWL_USE_SITEMAPS = os.environ.get('CRAWL_USE_SITEMAPS', 'TRUE').upper() == 'TRUE'
+HOST_METADATA_TTL_S = int(os.environ.get('HOST_METADATA_TTL_S', 24 * 3600))
+# robots.txt / sitemaps that failed transiently (robots.txt: host disallowed meanwhile)
+HOST_METADATA_ERROR_TTL_S = int(os.environ.get('HOST_METADATA_ERROR_TTL_S', 300))
+# Frontier checkpoints (Redis) for resuming failed / cut-short jobs
+CRAWL_CHECKPOINT_INTERVAL_S = int(os.environ.get('CRAWL_CHECKPOINT_INTERVAL_S', 30))
+# Priority frontier: url scorer (dotted path; tasks.priority.BreadthFirstScorer = former FIFO order)
+# and queue bound (0 = max(1000, 10 * max_pages)); the lowest scored urls are dropped beyond it
+CRAWL_URL_SCORER = os.environ.get('CRAWL_URL_SCORER', 'tasks.priority.UrlScorer')
+CRAWL_FRONTIER_MAX_QUEUED = int(os.environ.get('CRAWL_FRONTIER_MAX_QUEUED', 0))
+# URL canonicalization: query parameters always removed ("*" suffix = prefix), per-host rules as
+# JSON ({"host": {"drop_params": [...], "keep_params": [...], "lowercase_path": true}}), and whether
+# rel=canonical links teach the query parameters a host ignores
+CRAWL_TRACKING_PARAMS = [
+    p for p in os.environ.get(
+        'CRAWL_TRACKING_PARAMS',
+        'utm_*,fbclid,gclid,dclid,msclkid,yclid,mc_cid,mc_eid,_ga,_gl,igshid,ref_src',
+    ).split(',') if p
+]
+CRAWL_CANONICAL_HOST_RULES = json.loads(os.environ.get('CRAWL_CANONICAL_HOST_RULES') or '{}')
+CRAWL_LEARN_CANONICAL = os.environ.get('CRAWL_LEARN_CANONICAL', 'FALSE').upper() == 'TRUE'
+# Warm browser per Celery worker process, reused across tasks; relaunched after
+# CRAWL_BROWSER_RECYCLE_PAGES navigations or above CRAWL_BROWSER_RECYCLE_RSS_MB (worker + Chromium),
+# checked between jobs and periodically during long ones
+CRAWL_BROWSER_POOL = os.environ.get('CRAWL_BROWSER_POOL', 'TRUE').upper() == 'TRUE'
+CRAWL_BROWSER_RECYCLE_PAGES = int(os.environ.get('CRAWL_BROWSER_RECYCLE_PAGES', 500))
+CRAWL_BROWSER_RECYCLE_RSS_MB = int(os.environ.get('CRAWL_BROWSER_RECYCLE_RSS_MB', 1500))
+# Browser page readiness: DOM quiet for CRAWL_READY_SETTLE_MS after DOMContentLoaded, at most
+# CRAWL_READY_MAX_WAIT_MS; adaptive = skip the wait on domains learned to be static
+CRAWL_READY_SETTLE_MS = int(os.environ.get('CRAWL_READY_SETTLE_MS', 500))
+CRAWL_READY_MAX_WAIT_MS = int(os.environ.get('CRAWL_READY_MAX_WAIT_MS', 5000))
+CRAWL_READY_ADAPTIVE = os.environ.get('CRAWL_READY_ADAPTIVE', 'TRUE').upper() == 'TRUE'
+# Prometheus metrics: the API serves /metrics/; Celery workers push to a Pushgateway and/or
+# write a textfile (node_exporter textfile collector) every METRICS_EXPORT_INTERVAL_S and after each task
+METRICS_PUSHGATEWAY_URL = os.environ.get('METRICS_PUSHGATEWAY_URL', '')
+METRICS_TEXTFILE_DIR = os.environ.get('METRICS_TEXTFILE_DIR', '')
+METRICS_EXPORT_INTERVAL_S = int(os.environ.get('METRICS_EXPORT_INTERVAL_S', 30))
+METRICS_MAX_HOSTS = int(os.environ.get('METRICS_MAX_HOSTS', 100))
+
 
 
 # AWS S3 Configuration for Blob Storage
@@ -183,6 +262,12 @@ AWS_ACCESS_KEY_ID = os.environ.get('AWS_ACCESS_KEY_ID', '')
 AWS_SECRET_ACCESS_KEY = os.environ.get('AWS_SECRET_ACCESS_KEY', '')
 AWS_STORAGE_BUCKET_NAME = os.environ.get('AWS_STORAGE_BUCKET_NAME', 'search-engine-crawl-data')
 AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+BLOB_COMPRESSION = os.environ.get('BLOB_COMPRESSION', 'gzip')  # gzip, zstd (needs zstandard) or none
+BLOB_SEGMENTS = os.environ.get('BLOB_SEGMENTS', 'FALSE').upper() == 'TRUE'  # pack pages into segment objects
+# Per-page objects (BLOB_SEGMENTS off) keyed by content hash, identical HTML stored once
+BLOB_CONTENT_ADDRESSED = os.environ.get('BLOB_CONTENT_ADDRESSED', 'FALSE').upper() == 'TRUE'
+# Content objects written more recently than this are not deleted (a crawl may be reusing them)
+BLOB_CONTENT_DELETE_GRACE_S = int(os.environ.get('BLOB_CONTENT_DELETE_GRACE_S', 3600))
 
 
 # AWS OpenSearch Configuration
@@ -5,12 +5,13 @@ URL configuration for app project.
 from django.contrib import admin
 from django.urls import path, include
 
-from api.views import api_root
+from api.views import api_root, metrics_view
 
 
 urlpatterns = [
     path('', api_root, name='api-root'),
     path('admin/', admin.site.urls),
+    path('metrics/', metrics_view, name='metrics'),
     path('api/', include('api.urls')),
     path('api-auth/', include('rest_framework.urls', namespace='rest_framework'))
 ]
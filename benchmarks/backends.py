@@ -0,0 +1,172 @@
+"""
+In-process stand-ins for S3 and OpenSearch used by the crawl benchmarks.
+
+LocalS3 - The boto3 S3 calls BlobStorageClient makes, kept in memory.
+LocalOpenSearch - The opensearch-py calls SearchIndexClient / BulkIndexer make, kept in memory.
+local_backends - Context manager routing BlobStorageClient and SearchIndexClient to them.
+
+Both add a fixed latency per request (``latency_ms``) to stand in for the network
+round trip, so upload / index stages show up in the timings without AWS.
+"""
+
+import io
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+from integrations import blob_storage_client
+from integrations.search_index_client import SearchIndexClient
+
+
+class _Body(io.BytesIO):
+    """StreamingBody look-alike."""
+
+    def iter_chunks(self, chunk_size: int = 1 << 20):
+        while chunk := self.read(chunk_size):
+            yield chunk
+
+
+class LocalS3:
+    def __init__(self, latency_ms: float = 0):
+        self.latency_s = latency_ms / 1000
+        self.objects = {}  # (bucket, key) -> (body, metadata, last modified)
+        self.requests = 0
+        self.bytes_stored = 0
+        self._lock = threading.Lock()
+
+    def _request(self) -> None:
+        with self._lock:
+            self.requests += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    @staticmethod
+    def _not_found(operation: str, code: str = "NoSuchKey"):
+        return ClientError({"Error": {"Code": code, "Message": "Not Found"}}, operation)
+
+    def put_object(self, Bucket, Key, Body, Metadata=None, **kwargs):
+        self._request()
+        body = Body if isinstance(Body, bytes) else Body.read()
+        with self._lock:
+            self.objects[(Bucket, Key)] = (body, dict(Metadata or {}), datetime.now(timezone.utc))
+            self.bytes_stored += len(body)
+        return {"ETag": f'"{hash(body) & 0xffffffff:x}"'}
+
+    def get_object(self, Bucket, Key, Range=None, **kwargs):
+        self._request()
+        stored = self.objects.get((Bucket, Key))
+        if stored is None:
+            raise self._not_found("GetObject")
+        body, metadata, _ = stored
+        if Range:
+            start, end = Range.removeprefix("bytes=").split("-")
+            body = body[int(start):int(end) + 1]
+        return {"Body": _Body(body), "Metadata": metadata, "ContentLength": len(body)}
+
+    def head_object(self, Bucket, Key, **kwargs):
+        self._request()
+        stored = self.objects.get((Bucket, Key))
+        if stored is None:
+            raise self._not_found("HeadObject", code="404")
+        return {"ContentLength": len(stored[0]), "Metadata": stored[1], "LastModified": stored[2]}
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        self._request()
+        with self._lock:
+            self.objects.pop((Bucket, Key), None)
+        return {}
+
+    def delete_objects(self, Bucket, Delete, **kwargs):
+        self._request()
+        with self._lock:
+            for item in Delete.get("Objects", []):
+                self.objects.pop((Bucket, item["Key"]), None)
+        return {"Errors": []}
+
+
+class _LocalIndices:
+    def __init__(self, store: "LocalOpenSearch"):
+        self._store = store
+
+    def exists(self, index, **kwargs) -> bool:
+        return index in self._store.indices_created
+
+    def create(self, index, body=None, **kwargs):
+        self._store.indices_created.add(index)
+        return {"acknowledged": True, "index": index}
+
+    def delete(self, index, **kwargs):
+        self._store.indices_created.discard(index)
+        self._store.documents = {key: doc for key, doc in self._store.documents.items() if key[0] != index}
+        return {"acknowledged": True}
+
+    def refresh(self, index=None, **kwargs):
+        self._store._request()
+        return {}
+
+
+class LocalOpenSearch:
+    def __init__(self, latency_ms: float = 0):
+        self.latency_s = latency_ms / 1000
+        self.indices_created = set()
+        self.documents = {}  # (index, id) -> source
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.indices = _LocalIndices(self)
+
+    def _request(self) -> None:
+        with self._lock:
+            self.requests += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    def index(self, index, id, body, **kwargs):
+        self._request()
+        with self._lock:
+            self.documents[(index, id)] = body
+        return {"_id": id, "result": "created"}
+
+    def delete(self, index, id, **kwargs):
+        self._request()
+        with self._lock:
+            self.documents.pop((index, id), None)
+        return {"_id": id, "result": "deleted"}
+
+    def bulk(self, body, **kwargs):
+        started = time.perf_counter()
+        self._request()
+        lines = iter(line for line in body.split("\n") if line)
+        items = []
+        with self._lock:
+            for line in lines:
+                (operation, meta), = json.loads(line).items()
+                key = (meta.get("_index"), meta.get("_id"))
+                if operation == "delete":
+                    self.documents.pop(key, None)
+                else:
+                    self.documents[key] = json.loads(next(lines))
+                items.append({operation: {"_id": meta.get("_id"), "status": 200}})
+        return {"took": round((time.perf_counter() - started) * 1000), "errors": False, "items": items}
+
+    def search(self, index=None, body=None, **kwargs):
+        self._request()
+        return {"hits": {"total": {"value": 0}, "hits": []}}
+
+
+@contextmanager
+def local_backends(s3: LocalS3, opensearch: LocalOpenSearch):
+    """Route BlobStorageClient's boto3 client and SearchIndexClient's OpenSearch client to the stand-ins."""
+    SearchIndexClient._instance, SearchIndexClient._client = None, None  # singleton: rebuild with the stand-in
+    fake_boto3 = SimpleNamespace(client=lambda service, **kwargs: s3)
+    try:
+        with mock.patch.object(blob_storage_client, "boto3", fake_boto3), \
+                mock.patch.object(SearchIndexClient, "_get_opensearch_client", lambda self: opensearch):
+            yield
+    finally:
+        SearchIndexClient._instance, SearchIndexClient._client = None, None
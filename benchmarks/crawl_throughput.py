@@ -0,0 +1,317 @@
+"""
+Benchmark: crawl throughput of run_crawl_job, fully offline.
+
+Serves a synthetic site locally (benchmarks/fixture_site.py), routes S3 and OpenSearch
+to in-process stand-ins (benchmarks/backends.py) and runs crawl jobs in this process
+(Celery task run eagerly, SQLite database in a temp dir). Reports pages/s, per-stage
+latency percentiles (from the crawl_stage_seconds histogram, like histogram_quantile)
+and peak RSS of the process tree (incl. Chromium), and saves them as JSON.
+
+Needs Redis (REDISCLOUD_URL, e.g. a local redis-server), or ``--fake-redis`` with
+``pip install "fakeredis[lua]"``. JS-rendered pages need the Playwright browsers.
+Other crawler settings (BLOB_SEGMENTS, BLOB_COMPRESSION, ...) are read from the
+environment as usual, so changes can be compared run against run.
+
+Usage (from the repo root):
+    python -m benchmarks.crawl_throughput --pages 500 --fan-out 8 --concurrency 8 --output .bench/crawl.json
+    python -m benchmarks.crawl_throughput --js-ratio 0.1 --slow-ratio 0.05 --compare .bench/crawl.json
+"""
+
+import argparse
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+# Benchmark-controlled crawler settings; everything else comes from the environment
+BENCH_SETTINGS = ("CRAWL_CONCURRENCY", "CRAWL_HOST_RATE_PER_S", "CRAWL_HOST_BURST", "CRAWL_HOST_MAX_CONCURRENCY",
+                  "CRAWL_HTTP_FIRST", "CRAWL_USE_SITEMAPS", "CRAWL_RESPECT_ROBOTS")
+REPORTED_SETTINGS = BENCH_SETTINGS + ("BLOB_SEGMENTS", "BLOB_COMPRESSION", "BLOB_CONTENT_ADDRESSED",
+                                      "CRAWL_URL_SCORER", "CRAWL_BROWSER_POOL", "CRAWL_READY_ADAPTIVE")
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def configure(args, workdir: Path) -> None:
+    """Environment for app.settings, then Django setup and a fresh SQLite schema."""
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{workdir / 'bench.sqlite3'}"
+    os.environ.update({
+        "CRAWL_CONCURRENCY": str(args.concurrency),
+        "CRAWL_HOST_RATE_PER_S": str(args.host_rate),
+        "CRAWL_HOST_BURST": str(args.concurrency),
+        "CRAWL_HOST_MAX_CONCURRENCY": str(args.concurrency),
+        "CRAWL_HTTP_FIRST": "TRUE" if args.http_first else "FALSE",
+        "CRAWL_USE_SITEMAPS": "TRUE" if args.sitemap else "FALSE",
+        "CRAWL_RESPECT_ROBOTS": "TRUE",
+    })
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+
+    if args.fake_redis:
+        import fakeredis
+        import redis
+
+        server = fakeredis.FakeServer()
+        redis.Redis.from_url = classmethod(lambda cls, url, **kwargs: fakeredis.FakeRedis(server=server))
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command("migrate", verbosity=0)
+
+
+class RssSampler:
+    """Peak RSS of this process and its children (Chromium), sampled in the background."""
+
+    def __init__(self, interval_s: float = 0.1):
+        from integrations.browser_pool import process_tree_rss_mb
+
+        self._measure = process_tree_rss_mb
+        self.interval_s = interval_s
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss_mb = self._measure()
+            if rss_mb is None:  # no /proc: peak of this process only (kB on Linux, bytes on macOS)
+                maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                rss_mb = maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+            self.peak_mb = max(self.peak_mb, rss_mb)
+            self._stop.wait(self.interval_s)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+
+
+def histogram_snapshot() -> dict:
+    """Cumulative ``crawl_stage_seconds`` buckets, count and sum per stage (all hosts / outcomes)."""
+    from integrations.metrics import STAGE_SECONDS
+
+    stages = {}
+    for family in STAGE_SECONDS.collect():
+        for sample in family.samples:
+            stage = stages.setdefault(sample.labels["stage"], {"buckets": {}, "count": 0.0, "sum": 0.0})
+            if sample.name.endswith("_bucket"):
+                upper = float(sample.labels["le"])
+                stage["buckets"][upper] = stage["buckets"].get(upper, 0.0) + sample.value
+            elif sample.name.endswith("_count"):
+                stage["count"] += sample.value
+            elif sample.name.endswith("_sum"):
+                stage["sum"] += sample.value
+    return stages
+
+
+def counter_snapshot(counter, label: str) -> dict:
+    values = {}
+    for family in counter.collect():
+        for sample in family.samples:
+            if sample.name.endswith("_total"):
+                values[sample.labels[label]] = values.get(sample.labels[label], 0.0) + sample.value
+    return values
+
+
+def quantile(q: float, buckets: list[tuple[float, float]]) -> float | None:
+    """Quantile from cumulative buckets, interpolated linearly within a bucket (histogram_quantile)."""
+    total = buckets[-1][1] if buckets else 0
+    if not total:
+        return None
+    rank = q * total
+    previous_upper, previous_count = 0.0, 0.0
+    for upper, count in buckets:
+        if count >= rank:
+            if math.isinf(upper):
+                return previous_upper
+            return previous_upper + (upper - previous_upper) * (rank - previous_count) / max(count - previous_count, 1e-12)
+        previous_upper, previous_count = upper, count
+    return previous_upper
+
+
+def stage_latencies(before: dict, after: dict) -> dict:
+    latencies = {}
+    for stage, data in sorted(after.items()):
+        old = before.get(stage, {"buckets": {}, "count": 0.0, "sum": 0.0})
+        count = data["count"] - old["count"]
+        if not count:
+            continue
+        buckets = sorted((upper, value - old["buckets"].get(upper, 0.0)) for upper, value in data["buckets"].items())
+        latencies[stage] = {
+            "count": int(count),
+            "mean_ms": round((data["sum"] - old["sum"]) / count * 1000, 2),
+            **{f"p{round(q * 100)}_ms": round(quantile(q, buckets) * 1000, 2) for q in QUANTILES},
+        }
+    return latencies
+
+
+def run_once(site, args) -> dict:
+    from integrations.metrics import BYTES_TOTAL, PAGES_TOTAL
+    from models.crawl_job import CrawlJob
+    from models.page import Page
+    from tasks.crawl import run_crawl_job
+
+    # Every run starts from an empty database (otherwise fresh pages are skipped)
+    Page.objects.all().delete()
+    CrawlJob.objects.all().delete()
+    job = CrawlJob.objects.create(url=site.start_url, max_depth=args.max_depth, max_pages=args.pages)
+
+    stages_before = histogram_snapshot()
+    pages_before = counter_snapshot(PAGES_TOTAL, "outcome")
+    bytes_before = counter_snapshot(BYTES_TOTAL, "stage")
+    requests_before = site.requests
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        result = run_crawl_job.apply(args=[str(job.id), site.start_url, args.sla_hours])
+        elapsed = time.perf_counter() - started
+
+    job.refresh_from_db()
+    pages = Page.objects.filter(job=job)
+    crawled = pages.count()
+    pages_after = counter_snapshot(PAGES_TOTAL, "outcome")
+    bytes_after = counter_snapshot(BYTES_TOTAL, "stage")
+    return {
+        "status": job.status if result.successful() else f"error: {result.result!r}",
+        "seconds": round(elapsed, 3),
+        "pages": crawled,
+        "failed_pages": pages.exclude(error__isnull=True).exclude(error="").count(),
+        "pages_per_s": round(crawled / elapsed, 2) if elapsed else None,
+        "site_requests": site.requests - requests_before,
+        "pages_by_outcome": {k: int(v - pages_before.get(k, 0)) for k, v in pages_after.items() if v - pages_before.get(k, 0)},
+        "bytes": {k: int(v - bytes_before.get(k, 0)) for k, v in bytes_after.items() if v - bytes_before.get(k, 0)},
+        "stages": stage_latencies(stages_before, histogram_snapshot()),
+        "peak_rss_mb": round(rss.peak_mb, 1),
+    }
+
+
+def print_run(n: int, run: dict) -> None:
+    print(
+        f"run {n}: {run['pages']} pages in {run['seconds']:.1f}s = {run['pages_per_s']} pages/s, "
+        f"peak RSS {run['peak_rss_mb']} MB, {run['failed_pages']} failed ({run['status']})"
+    )
+    for stage, latency in run["stages"].items():
+        print(
+            f"    {stage:<18} n={latency['count']:<6} p50 {latency['p50_ms']:>9.1f} ms"
+            f"   p90 {latency['p90_ms']:>9.1f} ms   p99 {latency['p99_ms']:>9.1f} ms"
+        )
+
+
+def compare(results: dict, baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text())
+    old, new = baseline["summary"], results["summary"]
+    print(f"\nvs {baseline_path} ({baseline.get('git_commit') or '?'}, {baseline['started_at']}):")
+    for key in ("median_pages_per_s", "max_peak_rss_mb"):
+        if old.get(key) and new.get(key):
+            print(f"    {key:<26} {old[key]:>10} -> {new[key]:<10} ({new[key] / old[key]:.2f}x)")
+    old_stages, new_stages = baseline["runs"][-1]["stages"], results["runs"][-1]["stages"]
+    for stage in sorted(set(old_stages) & set(new_stages)):
+        print(f"    {stage + ' p50 ms':<26} {old_stages[stage]['p50_ms']:>10} -> {new_stages[stage]['p50_ms']}")
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    site_args = arg_parser.add_argument_group("fixture site")
+    site_args.add_argument("--pages", type=int, default=500, help="pages on the site (= job max_pages)")
+    site_args.add_argument("--fan-out", type=int, default=8, help="child links per page")
+    site_args.add_argument("--page-kb", type=int, default=30, help="approximate HTML size per page")
+    site_args.add_argument("--js-ratio", type=float, default=0.0, help="share of JS-rendered pages (browser)")
+    site_args.add_argument("--slow-ratio", type=float, default=0.0, help="share of slow pages")
+    site_args.add_argument("--slow-ms", type=int, default=1000, help="response delay of slow pages")
+    site_args.add_argument("--sitemap", action="store_true", help="serve a sitemap listing every page")
+    site_args.add_argument("--seed", type=int, default=1)
+    crawl_args = arg_parser.add_argument_group("crawler")
+    crawl_args.add_argument("--concurrency", type=int, default=8, help="CRAWL_CONCURRENCY (also per-host max)")
+    crawl_args.add_argument("--host-rate", type=float, default=1000, help="CRAWL_HOST_RATE_PER_S for the local host")
+    crawl_args.add_argument("--no-http-first", dest="http_first", action="store_false", help="browser for every page")
+    crawl_args.add_argument("--max-depth", type=int, help="job max_depth (default: deep enough for every page)")
+    crawl_args.add_argument("--sla-hours", type=int, default=1)
+    backend_args = arg_parser.add_argument_group("backends")
+    backend_args.add_argument("--s3-latency-ms", type=float, default=20, help="latency of each S3 stand-in request")
+    backend_args.add_argument("--index-latency-ms", type=float, default=10, help="latency of each OpenSearch request")
+    backend_args.add_argument("--fake-redis", action="store_true", help="in-memory Redis (fakeredis[lua])")
+    backend_args.add_argument("--database-url", help="DATABASE_URL (default: SQLite in a temp dir)")
+    arg_parser.add_argument("--runs", type=int, default=3, help="crawl jobs to run (the first one warms up)")
+    arg_parser.add_argument("--output", type=Path, help="write results as JSON")
+    arg_parser.add_argument("--compare", type=Path, help="earlier JSON results to compare with")
+    args = arg_parser.parse_args()
+
+    from benchmarks.fixture_site import FixtureSite, SiteConfig
+
+    site_config = SiteConfig(
+        pages=args.pages, fan_out=args.fan_out, page_kb=args.page_kb, js_ratio=args.js_ratio,
+        slow_ratio=args.slow_ratio, slow_ms=args.slow_ms, sitemap=args.sitemap, seed=args.seed,
+    )
+    if args.max_depth is None:
+        args.max_depth = site_config.depth
+
+    with tempfile.TemporaryDirectory(prefix="crawl-bench-") as workdir:
+        configure(args, Path(workdir))
+
+        from django.conf import settings
+        from benchmarks.backends import LocalOpenSearch, LocalS3, local_backends
+        from integrations.browser_pool import get_browser_pool
+
+        s3, opensearch = LocalS3(args.s3_latency_ms), LocalOpenSearch(args.index_latency_ms)
+        results = {
+            "started_at": datetime.now(dt_timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": sys.version.split()[0],
+            "site": site_config._asdict(),
+            "crawler": {
+                "max_depth": args.max_depth,
+                **{name: getattr(settings, name, None) for name in REPORTED_SETTINGS},
+            },
+            "backends": {"s3_latency_ms": args.s3_latency_ms, "index_latency_ms": args.index_latency_ms},
+            "runs": [],
+        }
+        print(f"{args.pages} pages, fan-out {args.fan_out}, depth {args.max_depth}, concurrency {args.concurrency}")
+
+        try:
+            with FixtureSite(site_config) as site, local_backends(s3, opensearch):
+                for n in range(1, args.runs + 1):
+                    run = run_once(site, args)
+                    results["runs"].append(run)
+                    print_run(n, run)
+        finally:
+            get_browser_pool().close()
+
+    measured = results["runs"][1:] or results["runs"]
+    throughputs = sorted(run["pages_per_s"] or 0 for run in measured)
+    results["summary"] = {
+        "median_pages_per_s": throughputs[len(throughputs) // 2],
+        "max_peak_rss_mb": max(run["peak_rss_mb"] for run in results["runs"]),
+        "s3_objects": len(s3.objects),
+        "indexed_documents": len(opensearch.documents),
+    }
+    print(f"median {results['summary']['median_pages_per_s']} pages/s (warm runs), "
+          f"peak RSS {results['summary']['max_peak_rss_mb']} MB")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"Results saved to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
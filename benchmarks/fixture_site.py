@@ -0,0 +1,156 @@
+"""
+Synthetic website served locally for crawl benchmarks.
+
+SiteConfig - Shape of the site: page count, fan-out, page size, JS-rendered / slow shares.
+FixtureSite - Threaded HTTP server for a SiteConfig (context manager, ``base_url``).
+
+Pages are generated deterministically from ``seed``: page i links to its children
+i*fan_out+1 .. i*fan_out+fan_out (a tree reaching every page), plus the home page and
+one random earlier page (links seen again). Text is random words, so pages are not
+near-duplicates of each other. JS-rendered pages ship an empty ``<div id="root">``
+filled by a script (escalated to the browser); slow pages answer after ``slow_ms``.
+Links are absolute, the crawler only resolves relative ones against https.
+"""
+
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+
+
+class SiteConfig(NamedTuple):
+    pages: int = 500
+    fan_out: int = 8
+    page_kb: int = 30
+    js_ratio: float = 0.0
+    slow_ratio: float = 0.0
+    slow_ms: int = 1000
+    sitemap: bool = False
+    seed: int = 1
+
+    @property
+    def depth(self) -> int:
+        """Depth of the deepest page below the home page (crawl max_depth that reaches all pages)."""
+        depth, last = 0, 0
+        while last < self.pages - 1:
+            last = last * self.fan_out + self.fan_out
+            depth += 1
+        return depth
+
+
+_SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "bra", "che", "dri", "flo", "gru", "pla", "sto"]
+
+
+class FixtureSite:
+    """Serve a SiteConfig on 127.0.0.1 (random port) from a background thread."""
+
+    def __init__(self, config: SiteConfig):
+        self.config = config
+        rng = random.Random(config.seed)
+        self._words = sorted({"".join(rng.choices(_SYLLABLES, k=rng.randint(2, 4))) for _ in range(3000)})
+        self._server = None
+        self._thread = None
+        self.base_url = None
+        self.requests = 0
+
+    @property
+    def start_url(self) -> str:
+        return f"{self.base_url}/p/0"
+
+    def kind(self, i: int) -> str:
+        """"static", "js" or "slow" - fixed per page (home page is always static)."""
+        if i == 0:
+            return "static"
+        draw = random.Random(f"{self.config.seed}:kind:{i}").random()
+        if draw < self.config.js_ratio:
+            return "js"
+        if draw < self.config.js_ratio + self.config.slow_ratio:
+            return "slow"
+        return "static"
+
+    def links(self, i: int) -> list[int]:
+        config = self.config
+        children = range(i * config.fan_out + 1, min(i * config.fan_out + config.fan_out, config.pages - 1) + 1)
+        links = list(children) + [0]
+        if i > 1:
+            links.append(random.Random(f"{config.seed}:link:{i}").randrange(1, i))
+        return links
+
+    def render(self, i: int) -> bytes:
+        rng = random.Random(f"{self.config.seed}:page:{i}")
+        title = f"Page {i}: {' '.join(rng.choices(self._words, k=3))}"
+        anchors = "".join(
+            f'<li><a href="{self.base_url}/p/{link}">About {" ".join(rng.choices(self._words, k=3))}</a></li>'
+            for link in self.links(i)
+        )
+        paragraphs, size = [], 0
+        while size < self.config.page_kb * 1024:
+            paragraph = f"<p>{' '.join(rng.choices(self._words, k=80))}.</p>"
+            paragraphs.append(paragraph)
+            size += len(paragraph)
+        body = f"<article><h1>{title}</h1>{''.join(paragraphs)}</article><nav><ul>{anchors}</ul></nav>"
+
+        if self.kind(i) == "js":
+            escaped = body.replace("\\", "\\\\").replace("`", "\\`").replace("</", "<\\/")
+            body = f'<div id="root"></div><script>document.getElementById("root").innerHTML = `{escaped}`;</script>'
+        return f"<!doctype html><html><head><title>{title}</title></head><body>{body}</body></html>".encode("utf-8")
+
+    def sitemap(self) -> bytes:
+        urls = "".join(f"<url><loc>{self.base_url}/p/{i}</loc></url>" for i in range(self.config.pages))
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+        ).encode("utf-8")
+
+    def start(self) -> "FixtureSite":
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                site.requests += 1
+                path = self.path.split("?", 1)[0].rstrip("/")
+                if path == "/robots.txt":
+                    sitemap = f"Sitemap: {site.base_url}/sitemap.xml\n" if site.config.sitemap else ""
+                    return self._send(200, f"User-agent: *\nAllow: /\n{sitemap}".encode(), "text/plain")
+                if path == "/sitemap.xml" and site.config.sitemap:
+                    return self._send(200, site.sitemap(), "application/xml")
+                if path in ("", "/p"):
+                    path = "/p/0"
+                if path.startswith("/p/") and path[3:].isdigit() and int(path[3:]) < site.config.pages:
+                    i = int(path[3:])
+                    if site.kind(i) == "slow":
+                        time.sleep(site.config.slow_ms / 1000)
+                    return self._send(200, site.render(i), "text/html; charset=utf-8")
+                self._send(404, b"not found", "text/plain")
+
+            def _send(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fixture-site", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
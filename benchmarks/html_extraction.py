@@ -0,0 +1,124 @@
+"""
+Benchmark: HTML extraction (title, visible text, links) per page.
+
+Compares the former two-parse path (BeautifulSoup tree + HyperlinkParser) with the
+single-pass extractor of integrations/html_extractor.py, pure Python and selectolax
+(if installed), on a corpus of saved pages.
+
+Usage (from the repo root):
+    python -m benchmarks.html_extraction --urls urls.txt --corpus .bench/pages   # download once
+    python -m benchmarks.html_extraction --corpus .bench/pages [--repeat 5]
+"""
+
+import argparse
+import hashlib
+import statistics
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+
+from integrations import html_extractor
+from integrations.html_extractor import extract_html
+
+
+class _LegacyHyperlinkParser(HTMLParser):
+    """HyperlinkParser as it was in integrations/http_client.py."""
+
+    def __init__(self):
+        super().__init__()
+        self.hyperlinks = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "a" and "href" in attrs:
+            self.hyperlinks.append(attrs["href"])
+
+
+def legacy_extract(html_content: str):
+    """Former HeadlessBrowser path: BeautifulSoup(html.parser) tree, then a second parse for links."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_content, "html.parser")
+    for tag in soup(["script", "style"]):
+        tag.decompose()
+    plain_text = soup.get_text(separator=" ", strip=True)
+    title = soup.title.string.strip() if soup.title and soup.title.string else None
+    parser = _LegacyHyperlinkParser()
+    parser.feed(html_content)
+    return plain_text, title, parser.hyperlinks
+
+
+def download(urls_file: Path, corpus: Path) -> None:
+    import requests
+
+    corpus.mkdir(parents=True, exist_ok=True)
+    for url in urls_file.read_text().split():
+        path = corpus / (hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + ".html")
+        if path.exists():
+            continue
+        try:
+            response = requests.get(url, timeout=15, headers={"User-Agent": "Mozilla/5.0 (compatible; SearchEngineBot/1.0)"})
+        except requests.RequestException as e:
+            print(f"skip {url}: {e}")
+            continue
+        if response.ok and "html" in response.headers.get("Content-Type", ""):
+            path.write_text(response.text, encoding="utf-8")
+
+
+def run(name, extract, pages, repeat):
+    per_page = []
+    results = []
+    for html_content in pages:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = extract(html_content)
+            timings.append(time.perf_counter() - started)
+        per_page.append(min(timings))
+        results.append(result)
+    total = sum(per_page)
+    print(
+        f"{name:<14} total {total * 1000:9.1f} ms   median {statistics.median(per_page) * 1000:7.2f} ms/page"
+        f"   {len(pages) / total:8.1f} pages/s"
+    )
+    return total, results
+
+
+def agreement(reference, results) -> str:
+    same_text = sum(ref[0] == res[0] for ref, res in zip(reference, results))
+    same_title = sum(ref[1] == res[1] for ref, res in zip(reference, results))
+    same_links = sum(set(ref[2]) == set(res[2]) for ref, res in zip(reference, results))
+    n = len(reference)
+    return f"text {same_text}/{n}, title {same_title}/{n}, links {same_links}/{n} identical to legacy"
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--corpus", type=Path, required=True, help="directory of *.html pages")
+    arg_parser.add_argument("--urls", type=Path, help="file with urls to download into --corpus first")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="runs per page, the fastest one counts")
+    args = arg_parser.parse_args()
+
+    if args.urls:
+        download(args.urls, args.corpus)
+
+    pages = [path.read_text(encoding="utf-8", errors="replace") for path in sorted(args.corpus.glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"No *.html pages in {args.corpus}")
+    print(f"{len(pages)} pages, {sum(map(len, pages)) / 1e6:.1f} MB")
+
+    legacy_total, legacy_results = run("legacy (bs4)", legacy_extract, pages, args.repeat)
+
+    candidates = [("single-pass", lambda html_content: extract_html(html_content, fast=False))]
+    if html_extractor.LexborHTMLParser is not None:
+        candidates.append(("selectolax", extract_html))
+    else:
+        print("selectolax not installed, skipped")
+
+    for name, extract in candidates:
+        total, results = run(name, extract, pages, args.repeat)
+        print(f"{'':<14} {legacy_total / total:.1f}x faster; {agreement(legacy_results, results)}")
+
+
+if __name__ == "__main__":
+    main()
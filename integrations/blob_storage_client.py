@@ -1,18 +1,97 @@
 """
 BlobStorageClient - S3 integration for storing crawled page content
+BlobUploader - Background S3 uploads on a bounded worker pool
+SegmentWriter - Packs many pages into large segment objects, read back with range GETs
+SegmentRef - Location of a page record in a segment: (key, offset, length)
+check_compression - Django system check: BLOB_COMPRESSION is known and its codec installed
+
+Content is compressed on write (BLOB_COMPRESSION: gzip, zstd or none); the codec is
+recorded in the object metadata and reads decompress transparently. Objects written
+before compression was added have no codec and are read as is.
+
+With BLOB_CONTENT_ADDRESSED, per-page objects are keyed by the hash of their content,
+so identical HTML is stored once; Page rows sharing a key act as its reference count.
+A store() may reuse an object before its Page row is saved, so content objects written
+within BLOB_CONTENT_DELETE_GRACE_S are never deleted, and stores re-upload (refresh)
+objects older than half of it instead of reusing them.
 """
 
+import gzip
 import hashlib
+import json
 import logging
-from datetime import datetime
-from typing import Optional
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Iterator, NamedTuple, Optional
 import boto3
 from botocore.exceptions import ClientError
 from django.conf import settings
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+
+from integrations.metrics import BYTES_TOTAL, timed
+
+try:  # For BLOB_COMPRESSION = "zstd" (requirements.txt); checked at startup
+    import zstandard
+except ImportError:
+    zstandard = None
 
 
 logger = logging.getLogger(__name__)
 
+CODEC_METADATA_KEY = 'codec'  # x-amz-meta-codec
+CODECS = ('none', 'gzip', 'zstd')
+
+
+@checks.register()
+def check_compression(app_configs=None, **kwargs):
+    """Fail ``manage.py`` commands (runserver, migrate, check) on an unusable BLOB_COMPRESSION."""
+    codec = getattr(settings, 'BLOB_COMPRESSION', 'gzip') or 'none'
+    if codec not in CODECS:
+        return [checks.Error(f"Unknown BLOB_COMPRESSION {codec!r}, expected one of {CODECS}", id="blob.E001")]
+    if codec == 'zstd' and zstandard is None:
+        return [checks.Error("BLOB_COMPRESSION is zstd but zstandard is not installed", id="blob.E002")]
+    return []
+
+
+def compress(data: bytes, codec: str, level: Optional[int] = None) -> bytes:
+    """Compress ``data`` with ``codec`` (one of CODECS)."""
+    if codec == 'gzip':
+        return gzip.compress(data, compresslevel=level or 6, mtime=0)
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=level or 3).compress(data)
+    return data
+
+
+def decompress(data: bytes, codec: Optional[str]) -> bytes:
+    """Reverse :func:`compress`; a missing codec means the object was stored uncompressed."""
+    if codec == 'gzip':
+        return gzip.decompress(data)
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Object is zstd compressed, install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+
+def _decompressor(codec: str):
+    """Streaming decompressor of a single gzip member / zstd frame."""
+    if codec == 'gzip':
+        return zlib.decompressobj(wbits=31)
+    if zstandard is None:
+        raise RuntimeError("Object is zstd compressed, install zstandard to read it")
+    return zstandard.ZstdDecompressor().decompressobj()
+
+
+class SegmentRef(NamedTuple):
+    key: str
+    offset: int
+    length: int
+
 
 class BlobStorageClient:
     """Client for storing crawled page content in AWS S3."""
@@ -28,27 +107,60 @@ class BlobStorageClient:
             region_name=getattr(settings, 'AWS_REGION', 'us-east-1'),
         )
 
+        self.content_addressed = getattr(settings, 'BLOB_CONTENT_ADDRESSED', False)
+        self.content_delete_grace_s = getattr(settings, 'BLOB_CONTENT_DELETE_GRACE_S', 3600)
+        self.compression = getattr(settings, 'BLOB_COMPRESSION', 'gzip') or 'none'
+        self.compression_level = getattr(settings, 'BLOB_COMPRESSION_LEVEL', None)
+        if self.compression not in CODECS:
+            raise ValueError(f"Unknown BLOB_COMPRESSION {self.compression!r}, expected one of {CODECS}")
+        if self.compression == 'zstd' and zstandard is None:
+            raise ImproperlyConfigured("BLOB_COMPRESSION is zstd but zstandard is not installed")
+
     def store(self, page_id: int, content: str) -> str:
         """Persist the HTML body for a page and return the generated key.
 
         Args:
             page_id: Database primary key of the `Page` record. Used to
                 partition objects underneath `crawls/{page_id}/` for easier
-                cleanup/retention policies.
-            content: Raw HTML (or serialized text) that should be written to S3.
+                cleanup/retention policies (not with BLOB_CONTENT_ADDRESSED).
+            content: Raw HTML (or serialized text) that should be written to S3,
+                compressed with the configured BLOB_COMPRESSION codec.
 
         Returns:
-            str: The storage key (from :meth:`_generate_key`) that callers can
-            cache on the `Page` row for future retrieval.
+            str: The storage key (from :meth:`_generate_key`, or :meth:`_content_key`
+            in content-addressed mode) that callers can cache on the `Page` row for
+            future retrieval.
         """
-        storage_key = self._generate_key(page_id)
+        body = content.encode('utf-8')
 
-        self.s3_client.put_object(
-            Bucket=self.bucket_name,
-            Key=storage_key,
-            Body=content.encode('utf-8'),
-            ContentType='text/html',
-        )
+        if self.content_addressed:
+            storage_key = self._content_key(body)
+            # Reused only while recent enough that a concurrent purge can't delete it
+            # before the Page row referencing it is saved; older objects are refreshed
+            age_s = self._age_s(storage_key)
+            if age_s is not None and age_s < self.content_delete_grace_s / 2:
+                logger.info(f"Content already stored at {storage_key}, upload skipped")
+                return storage_key
+        else:
+            storage_key = self._generate_key(page_id)
+
+        extra = {}
+        if self.compression != 'none':
+            body = compress(body, self.compression, self.compression_level)
+            extra = {
+                'ContentEncoding': self.compression,
+                'Metadata': {CODEC_METADATA_KEY: self.compression},
+            }
+
+        with timed("s3_upload"):
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=storage_key,
+                Body=body,
+                ContentType='text/html; charset=utf-8',
+                **extra,
+            )
+        BYTES_TOTAL.labels(stage="s3_upload").inc(len(body))
 
         logger.info(f"Stored content at {storage_key}")
         return storage_key
@@ -61,27 +173,303 @@ class BlobStorageClient:
             storage_key: The S3 key
 
         Returns:
-            str: The stored content, or None if not found
+            str: The stored content (decompressed), or None if not found
         """
         try:
             response = self.s3_client.get_object(
                 Bucket=self.bucket_name,
                 Key=storage_key
             )
-            return response['Body'].read().decode('utf-8')
+            codec = response.get('Metadata', {}).get(CODEC_METADATA_KEY)
+            return decompress(response['Body'].read(), codec).decode('utf-8')
         except ClientError as e:
             if e.response['Error']['Code'] == 'NoSuchKey':
                 return None
             raise
 
+    def store_segment(self, segment_key: str, body: bytes) -> None:
+        """Upload a sealed segment (records compressed one by one with the configured codec)."""
+        with timed("s3_segment_upload"):
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=segment_key,
+                Body=body,
+                ContentType='application/octet-stream',
+                Metadata={CODEC_METADATA_KEY: self.compression, 'format': 'segment'},
+            )
+        BYTES_TOTAL.labels(stage="s3_upload").inc(len(body))
+        logger.info(f"Stored segment {segment_key} ({len(body)} bytes)")
+
+    def retrieve_record(self, segment_key: str, offset: int, length: int) -> Optional[str]:
+        """Read one page record of a segment with a range GET; None if the segment is gone."""
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name,
+                Key=segment_key,
+                Range=f"bytes={offset}-{offset + length - 1}",
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchKey':
+                return None
+            raise
+        codec = response.get('Metadata', {}).get(CODEC_METADATA_KEY)
+        record = decompress(response['Body'].read(), codec)
+        return record[record.index(b"\n") + 1:].decode('utf-8')
+
+    def iter_segment(self, segment_key: str, chunk_size: int = 1 << 20) -> Iterator[tuple[dict, str]]:
+        """Stream all records of a segment sequentially, as ``(header, content)``.
+
+        ``header`` is the record's JSON header (``page_id``, ``length``); for bulk
+        reprocessing without one request per page.
+        """
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=segment_key)
+        codec = response.get('Metadata', {}).get(CODEC_METADATA_KEY)
+
+        buffer = bytearray()
+        for data in self._decompressed_chunks(response['Body'], codec, chunk_size):
+            buffer += data
+            while True:
+                newline = buffer.find(b"\n")
+                if newline < 0:
+                    break
+                header = json.loads(buffer[:newline])
+                end = newline + 1 + header['length']
+                if len(buffer) < end:
+                    break
+                content = bytes(buffer[newline + 1:end]).decode('utf-8')
+                del buffer[:end]
+                yield header, content
+
+    def _decompressed_chunks(self, body, codec: Optional[str], chunk_size: int) -> Iterator[bytes]:
+        """Decompress a body made of back-to-back gzip members / zstd frames."""
+        if codec not in ('gzip', 'zstd'):
+            yield from body.iter_chunks(chunk_size)
+            return
+        decompressor = None
+        for chunk in body.iter_chunks(chunk_size):
+            while chunk:
+                if decompressor is None:
+                    decompressor = _decompressor(codec)
+                yield decompressor.decompress(chunk)
+                if decompressor.eof:
+                    chunk, decompressor = decompressor.unused_data, None
+                else:
+                    chunk = b""
+
     def delete(self, storage_key: str) -> None:
-        """Delete content from S3."""
+        """Delete content from S3 (content-addressed objects only once out of the grace period)."""
+        if not self._deletable([storage_key]):
+            return
         self.s3_client.delete_object(
             Bucket=self.bucket_name,
             Key=storage_key
         )
 
+    def delete_many(self, storage_keys: list[str]) -> None:
+        """Delete several objects from S3 (1000 keys per request), see :meth:`delete`."""
+        storage_keys = self._deletable(storage_keys)
+        for start in range(0, len(storage_keys), 1000):
+            chunk = storage_keys[start:start + 1000]
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': key} for key in chunk], 'Quiet': True},
+            )
+            for error in response.get('Errors', []):
+                logger.warning(f"Failed to delete {error.get('Key')}: {error.get('Message')}")
+
     def _generate_key(self, page_id: str) -> str:
         """Generate S3 storage key: crawls/{page_id}/{timestamp}.html"""
         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')
-        return f"crawls/{page_id}/{timestamp}.html"
\ No newline at end of file
+        return f"crawls/{page_id}/{timestamp}.html"
+
+    def _content_key(self, body: bytes) -> str:
+        """Content-addressed key: content/{sha256[:2]}/{sha256}.html (of the uncompressed body)"""
+        digest = hashlib.sha256(body).hexdigest()
+        return f"content/{digest[:2]}/{digest}.html"
+
+    def _age_s(self, storage_key: str) -> Optional[float]:
+        """Seconds since the object was last written, None if it doesn't exist."""
+        try:
+            response = self.s3_client.head_object(Bucket=self.bucket_name, Key=storage_key)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+        return (datetime.now(timezone.utc) - response['LastModified']).total_seconds()
+
+    def _deletable(self, storage_keys: list[str]) -> list[str]:
+        """``storage_keys`` without content-addressed objects written within the grace period
+        (a store() may have just reused one for a page whose row isn't saved yet)."""
+        deletable = []
+        for key in storage_keys:
+            if key.startswith("content/"):
+                age_s = self._age_s(key)
+                if age_s is not None and age_s < self.content_delete_grace_s:
+                    logger.info(f"Content {key} was written {age_s:.0f}s ago, delete skipped")
+                    continue
+            deletable.append(key)
+        return deletable
+
+
+class BlobUploader:
+    """Upload page content to S3 in the background, off the crawl thread.
+
+    Uploads run on ``max_workers`` threads and are retried with exponential
+    backoff. At most ``max_pending`` uploads may be queued or running; ``submit``
+    blocks beyond that (backpressure), so fetching can't outrun S3 and pile
+    HTML up in worker memory.
+    """
+
+    def __init__(
+        self,
+        blob_storage_client: Optional[BlobStorageClient] = None,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.blob_storage_client = blob_storage_client or BlobStorageClient()
+        self.max_workers = max_workers or getattr(settings, 'BLOB_UPLOAD_WORKERS', 8)
+        self.max_pending = max_pending or getattr(settings, 'BLOB_UPLOAD_MAX_PENDING', 32)
+        self.max_attempts = max_attempts or getattr(settings, 'BLOB_UPLOAD_MAX_ATTEMPTS', 3)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="blob-upload")
+        self._pending = threading.BoundedSemaphore(self.max_pending)
+
+    def submit(self, page_id: int, content: str) -> Future:
+        """Queue ``content`` for upload; the future resolves to the storage key.
+
+        Blocks while ``max_pending`` uploads are outstanding.
+        """
+        self._pending.acquire()
+        try:
+            future = self._executor.submit(self._upload, page_id, content)
+        except Exception:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        return future
+
+    def _upload(self, page_id: int, content: str) -> str:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return self.blob_storage_client.store(page_id=page_id, content=content)
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    raise
+                delay = 0.5 * 2 ** (attempt - 1)
+                logger.warning(f"Upload for page {page_id} failed (attempt {attempt}), retrying in {delay}s: {e}")
+                time.sleep(delay)
+
+    def flush(self) -> None:
+        """Nothing to seal: each page is uploaded on its own (SegmentWriter interface)."""
+
+    def close(self) -> None:
+        """Wait for queued uploads to finish and stop the worker pool."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SegmentWriter:
+    """Pack the pages of a crawl into large segment objects (WARC-like) under ``prefix``.
+
+    Each page is one record - a JSON header line (``page_id``, ``length``) followed by
+    the content - compressed on its own (a gzip member / zstd frame), so a record can
+    be read with a range GET and a whole segment streamed as one compressed stream.
+
+    Same interface as BlobUploader: ``submit`` returns a future that resolves to the
+    page's SegmentRef once the segment is uploaded. A segment is sealed and uploaded
+    in the background when it reaches ``max_bytes`` or ``max_age_s``, and on close.
+    """
+
+    MAX_SEALED = 2  # sealed segments queued or uploading (bounds memory)
+
+    def __init__(
+        self,
+        prefix: str,
+        blob_storage_client: Optional[BlobStorageClient] = None,
+        max_bytes: Optional[int] = None,
+        max_age_s: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.prefix = prefix
+        self.blob_storage_client = blob_storage_client or BlobStorageClient()
+        self.max_bytes = max_bytes or getattr(settings, 'BLOB_SEGMENT_MAX_BYTES', 32 * 1024 * 1024)
+        self.max_age_s = max_age_s or getattr(settings, 'BLOB_SEGMENT_MAX_AGE_S', 300)
+        self.max_attempts = max_attempts or getattr(settings, 'BLOB_UPLOAD_MAX_ATTEMPTS', 3)
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="segment-upload")
+        self._sealed = threading.BoundedSemaphore(self.MAX_SEALED)
+        self._open()
+
+    def _open(self) -> None:
+        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        self._key = f"{self.prefix}{timestamp}_{uuid.uuid4().hex[:8]}.seg"
+        self._buffer = bytearray()
+        self._records = []  # (future, offset, length)
+        self._opened_at = time.monotonic()
+
+    def submit(self, page_id: int, content: str) -> Future:
+        """Append ``content`` to the open segment; the future resolves to its SegmentRef."""
+        client = self.blob_storage_client
+        body = content.encode('utf-8')
+        header = json.dumps({'page_id': page_id, 'length': len(body)}).encode('utf-8')
+        record = compress(header + b"\n" + body, client.compression, client.compression_level)
+
+        future = Future()
+        self._records.append((future, len(self._buffer), len(record)))
+        self._buffer += record
+
+        if len(self._buffer) >= self.max_bytes or time.monotonic() - self._opened_at >= self.max_age_s:
+            self.flush()
+        return future
+
+    def flush(self) -> None:
+        """Seal the open segment and upload it in the background (blocks while MAX_SEALED are pending)."""
+        if not self._records:
+            return
+        key, body, records = self._key, bytes(self._buffer), self._records
+        self._open()
+
+        self._sealed.acquire()
+        try:
+            future = self._executor.submit(self._upload, key, body, records)
+        except Exception:
+            self._sealed.release()
+            raise
+        future.add_done_callback(lambda _: self._sealed.release())
+
+    def _upload(self, key: str, body: bytes, records: list) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self.blob_storage_client.store_segment(key, body)
+                break
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    for future, _, _ in records:
+                        future.set_exception(e)
+                    return
+                delay = 0.5 * 2 ** (attempt - 1)
+                logger.warning(f"Upload of segment {key} failed (attempt {attempt}), retrying in {delay}s: {e}")
+                time.sleep(delay)
+
+        for future, offset, length in records:
+            future.set_result(SegmentRef(key, offset, length))
+
+    def close(self) -> None:
+        """Seal the open segment and wait for all uploads."""
+        if self._executor is None:
+            return
+        self.flush()
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
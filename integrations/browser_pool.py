@@ -0,0 +1,199 @@
+"""
+BrowserPool - Warm HeadlessBrowser per Celery worker process, shared by its crawl tasks.
+get_browser_pool - The process-wide pool (started on worker_process_init, see tasks/crawl.py).
+
+Launching Playwright + Chromium takes seconds and hundreds of MB, so each worker
+process keeps one browser running between tasks instead of launching one per job.
+Every job gets fresh browser contexts; the browser is relaunched after
+CRAWL_BROWSER_RECYCLE_PAGES navigations or once the process tree (worker + Chromium)
+uses more than CRAWL_BROWSER_RECYCLE_RSS_MB, so long-lived workers don't creep in memory.
+The limits are checked between jobs and, through ``maintain``, during long ones.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from django.conf import settings
+
+from integrations.http_client import HeadlessBrowser
+
+
+logger = logging.getLogger(__name__)
+
+
+def process_tree_rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Resident memory of a process and all its descendants (MB), or None without /proc."""
+    pid = pid or os.getpid()
+    try:
+        children, rss_pages = {}, {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    stat = f.read()
+                with open(f"/proc/{entry}/statm") as f:
+                    rss_pages[int(entry)] = int(f.read().split()[1])
+            except (OSError, IndexError, ValueError):
+                continue  # exited meanwhile
+            ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+            children.setdefault(ppid, []).append(int(entry))
+    except OSError:
+        return None
+
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        total += rss_pages.get(current, 0)
+        pending.extend(children.get(current, ()))
+    return total * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class BrowserPool:
+    """
+    One warm HeadlessBrowser per process, leased to one crawl job at a time.
+
+    ``lease`` hands out the browser (launching or recycling it if needed) with fresh
+    contexts; the recycle limits are checked again when the lease ends, and every
+    CHECK_INTERVAL_S while it lasts if the lessee calls :meth:`maintain`. A disabled
+    pool (CRAWL_BROWSER_POOL=FALSE) leases None, i.e. every fetcher owns its browser.
+    """
+
+    CHECK_INTERVAL_S = 30
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        recycle_pages: Optional[int] = None,
+        recycle_rss_mb: Optional[float] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self.concurrency = concurrency or getattr(settings, 'CRAWL_CONCURRENCY', 1)
+        self.recycle_pages = recycle_pages or getattr(settings, 'CRAWL_BROWSER_RECYCLE_PAGES', 500)
+        self.recycle_rss_mb = recycle_rss_mb or getattr(settings, 'CRAWL_BROWSER_RECYCLE_RSS_MB', 1500)
+        self.enabled = enabled if enabled is not None else getattr(settings, 'CRAWL_BROWSER_POOL', True)
+        self._browser = None
+        self._leased = False
+        self._checked_at = time.monotonic()
+        self._check_rss = True  # False once a relaunch didn't bring the RSS below the limit
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Launch the browser ahead of the first job, in the background: worker process init
+        must return quickly (Celery kills pool children whose init blocks, worker_proc_alive_timeout).
+        A ``lease`` meanwhile waits for the launch (or launches the browser itself)."""
+        if not self.enabled:
+            return
+        threading.Thread(target=self._start, name="browser-pool-start", daemon=True).start()
+
+    def _start(self) -> None:
+        try:
+            with self._lock:
+                self._launch()
+        except Exception as e:
+            logger.warning(f"Browser pool not started, first job will launch it: {e}")
+            with self._lock:
+                self._close_browser()
+
+    @contextmanager
+    def lease(self):
+        """Yield the process' browser for one job, or None if the pool is disabled or busy."""
+        browser = self._acquire()
+        try:
+            yield browser
+        finally:
+            if browser is not None:
+                self._release(browser)
+
+    def maintain(self, browser: Optional[HeadlessBrowser]) -> None:
+        """Relaunch the leased ``browser`` in place if it hit a recycle limit (long jobs; call
+        from the crawl loop). Checks at most every CHECK_INTERVAL_S; in-flight pages finish first."""
+        if browser is None or time.monotonic() - self._checked_at < self.CHECK_INTERVAL_S:
+            return
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if browser is not self._browser or not self._should_recycle(check_rss=self._check_rss):
+                return
+            try:
+                browser.relaunch()
+            except Exception as e:
+                logger.warning(f"Browser pool: relaunch failed, next pages launch it: {e}")
+                return
+            rss_mb = process_tree_rss_mb()
+            if rss_mb is not None and rss_mb >= self.recycle_rss_mb:
+                # The worker itself is above the limit; don't relaunch the browser on RSS again this lease
+                logger.warning(f"Browser pool: {rss_mb:.0f} MB RSS after relaunching the browser")
+                self._check_rss = False
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_browser()
+
+    def _acquire(self) -> Optional[HeadlessBrowser]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._leased:
+                return None  # another job of this process (threads pool) has it; use a private browser
+            if self._browser is not None and self._should_recycle():
+                self._close_browser()
+            try:
+                self._launch()
+                self._browser.reset_contexts()
+            except Exception as e:
+                logger.warning(f"Browser pool: browser not available, job launches its own: {e}")
+                self._close_browser()
+                return None
+            self._leased = True
+            self._checked_at = time.monotonic()
+            self._check_rss = True
+            return self._browser
+
+    def _release(self, browser: HeadlessBrowser) -> None:
+        with self._lock:
+            self._leased = False
+            if browser is self._browser and self._should_recycle():
+                self._close_browser()
+
+    def _launch(self) -> None:
+        if self._browser is None:
+            self._browser = HeadlessBrowser(concurrency=self.concurrency)
+            self._browser.warm_up()
+            logger.info(f"Browser pool of process {os.getpid()}: browser launched")
+
+    def _should_recycle(self, check_rss: bool = True) -> bool:
+        if not self._browser.is_connected():
+            logger.info("Browser pool: browser disconnected, relaunching")
+            return True
+        if self._browser.pages_served >= self.recycle_pages:
+            logger.info(f"Browser pool: recycling browser after {self._browser.pages_served} pages")
+            return True
+        rss_mb = process_tree_rss_mb() if check_rss else None
+        if rss_mb is not None and rss_mb >= self.recycle_rss_mb:
+            logger.info(f"Browser pool: recycling browser at {rss_mb:.0f} MB RSS")
+            return True
+        return False
+
+    def _close_browser(self) -> None:
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception as e:
+                logger.warning(f"Browser pool: failed to close browser: {e}")
+            self._browser = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+        return _pool
@@ -0,0 +1,142 @@
+"""
+Single-pass HTML extraction: title, visible text and hyperlinks of a page.
+
+ExtractedPage - Result of extract_html: plain text, title, raw hrefs and their anchor text,
+    ``<base href>`` and ``<link rel="canonical">``.
+ExtractingParser - Streaming (html.parser based) extractor, no tree is built.
+extract_html - Extract with selectolax (C, lexbor) if installed, else ExtractingParser.
+
+Text matches ``BeautifulSoup.get_text(separator=" ", strip=True)`` after removing
+script/style: stripped text nodes joined by a single space.
+"""
+
+from html.parser import HTMLParser
+from typing import NamedTuple
+
+try:  # Optional fast parser: pip install selectolax
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+
+SKIPPED_TAGS = ("script", "style")
+
+
+class ExtractedPage(NamedTuple):
+    plain_text: str
+    title: str | None
+    hyperlinks: list[str]  # raw href values of <a> tags, in document order
+    anchor_texts: dict[str, str] | None = None  # href -> text of its first non-empty <a>
+    base_href: str | None = None  # first <base href>, relative hrefs resolve against it
+    canonical_href: str | None = None  # first <link rel="canonical" href>
+
+
+class ExtractingParser(HTMLParser):
+    """Collect title, visible text and <a href> values in one pass over the HTML."""
+
+    def __init__(self):
+        super().__init__()
+        self.texts = []
+        self.title = None
+        self.hyperlinks = []
+        self.anchor_texts = {}
+        self.base_href = None
+        self.canonical_href = None
+        self._skip_depth = 0
+        self._anchor_href = None
+        self._anchor_parts = []
+        self._in_title = False
+        self._title_parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "title" and self.title is None:
+            self._in_title = True
+        elif tag == "a":
+            for name, value in attrs:
+                if name == "href" and value is not None:
+                    self.hyperlinks.append(value)
+                    self._anchor_href = value
+                    self._anchor_parts = []
+                    break
+        elif tag == "base" and self.base_href is None:
+            self.base_href = dict(attrs).get("href")
+        elif tag == "link" and self.canonical_href is None:
+            attrs = dict(attrs)
+            if "canonical" in (attrs.get("rel") or "").lower().split():
+                self.canonical_href = attrs.get("href")
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "title" and self._in_title:
+            self._in_title = False
+            self.title = "".join(self._title_parts).strip() or None
+        elif tag == "a" and self._anchor_href is not None:
+            text = " ".join(self._anchor_parts)
+            if text:
+                self.anchor_texts.setdefault(self._anchor_href, text)
+            self._anchor_href = None
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._in_title:
+            self._title_parts.append(data)
+        text = data.strip()
+        if text:
+            self.texts.append(text)
+            if self._anchor_href is not None:
+                self._anchor_parts.append(text)
+
+    def error(self, message):
+        pass
+
+    def result(self) -> ExtractedPage:
+        return ExtractedPage(
+            " ".join(self.texts), self.title, self.hyperlinks, self.anchor_texts, self.base_href, self.canonical_href
+        )
+
+
+def _extract_lexbor(html_content: str) -> ExtractedPage:
+    tree = LexborHTMLParser(html_content)
+    title_node = tree.css_first("title")
+    title = (title_node.text(strip=True) or None) if title_node is not None else None
+    hyperlinks, anchor_texts = [], {}
+    for node in tree.css("a[href]"):
+        href = node.attributes.get("href")
+        if href is None:
+            continue
+        hyperlinks.append(href)
+        text = node.text(separator=" ", strip=True)
+        if text:
+            anchor_texts.setdefault(href, text)
+    base_node = tree.css_first("base[href]")
+    base_href = base_node.attributes.get("href") if base_node is not None else None
+    canonical_href = None
+    for node in tree.css("link[rel][href]"):
+        if "canonical" in (node.attributes.get("rel") or "").lower().split():
+            canonical_href = node.attributes.get("href")
+            break
+    tree.strip_tags(list(SKIPPED_TAGS))
+    plain_text = tree.root.text(separator=" ", strip=True) if tree.root is not None else ""
+    return ExtractedPage(plain_text, title, hyperlinks, anchor_texts, base_href, canonical_href)
+
+
+def _extract_python(html_content: str) -> ExtractedPage:
+    parser = ExtractingParser()
+    parser.feed(html_content)
+    parser.close()
+    return parser.result()
+
+
+def extract_html(html_content: str, fast: bool = True) -> ExtractedPage:
+    """Extract plain text, title and hrefs from ``html_content`` in a single parse.
+
+    ``fast`` uses selectolax when it is installed; otherwise (or with ``fast=False``)
+    the pure-Python streaming parser is used.
+    """
+    if fast and LexborHTMLParser is not None:
+        return _extract_lexbor(html_content)
+    return _extract_python(html_content)
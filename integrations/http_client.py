@@ -2,105 +2,306 @@
 HTML fetching utilities backed by Playwright.
 If need, can be moved to microservice or even use some external API (e.g. Firecrawl)
 
+FetchResult - Fetched page: html, plain text, title, links, status (+ HTTP validators).
 HeadlessBrowser - A headless browser utility using Playwright.
-HyperlinkParser - An HTML parser to extract hyperlinks from HTML content.
+TieredFetcher - Plain HTTP fetch first, headless browser only for JS-rendered pages.
+A warm browser shared by the tasks of a worker process: integrations/browser_pool.py.
+Parsing (title, text, links) is a single pass, see integrations/html_extractor.py.
+Links are canonicalized with integrations/url_canonicalizer.py.
 
 """
 
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
-from html.parser import HTMLParser
+import asyncio
+import codecs
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import NamedTuple
+import requests
+from requests.adapters import HTTPAdapter
+from playwright.async_api import async_playwright
+from urllib.parse import urljoin, urlparse
 import re
-from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+
+from integrations.html_extractor import extract_html
+from integrations.metrics import BYTES_TOTAL, status_outcome, timed
+from integrations.politeness import PolitenessScheduler
+from integrations.readiness import INIT_SCRIPT as READINESS_INIT_SCRIPT, ReadinessPolicy
+from integrations.url_canonicalizer import get_url_canonicalizer
+
+
+logger = logging.getLogger(__name__)
+
+
+class FetchResult(NamedTuple):
+    """Fetched page. Unpacks like the former ``(html, plain_text, title, child_links,
+    status_code)`` tuple plus the response validators used for conditional re-crawls.
+    A 304 (not modified) result has no html/text/links.
+    """
+    html: str | None
+    plain_text: str | None
+    title: str | None
+    child_links: list[str]
+    status_code: int
+    etag: str | None = None
+    last_modified: str | None = None
+    anchor_texts: dict[str, str] | None = None  # child link -> anchor text (frontier priority)
+    canonical_url: str | None = None  # trusted <link rel="canonical"> of the page, canonicalized
+
 
 class HeadlessBrowser:
     """Headless browser utility using Playwright.
-    Provides a synchronous ``fetch_html`` method to get page content and metadata.
-    Uses a dedicated thread for browser operations, to have predictible ram/cpu usage
-    and allow scalling on celery workers pool.
+    Provides a synchronous ``fetch_html`` method to get page content and metadata,
+    and ``submit`` to start a fetch without waiting for it.
+    A single browser (single session/IP) serves up to ``concurrency`` pages at once,
+    to have predictible ram/cpu usage and allow scalling on celery workers pool.
     Parses hyperlinks within the same domain.
-    Browser runs in a dedicated thread to avoid async context issues.
+    Browser runs in a dedicated thread (own asyncio event loop) to avoid async context issues.
+
+    Each slot reuses one page in its own lightweight context (recycled every
+    ``PAGE_REUSE_LIMIT`` navigations or after an error). Requests for blocked resource
+    types (images, fonts, media, ...) and blocked domains (trackers) are aborted, since
+    only the DOM is kept. After DOMContentLoaded a page is read once its DOM is quiet,
+    as decided per domain by ``readiness`` (:class:`ReadinessPolicy`), not on networkidle.
+
+    ``warm_up`` launches the browser ahead of the first fetch and ``reset_contexts``
+    drops all pages, so a long-lived (pooled) browser starts every job with fresh
+    contexts. ``pages_served`` counts navigations for recycling, ``relaunch`` restarts
+    Chromium in place.
     """
 
-    def __init__(self, headless: bool = True, timeout_ms: int = 15000):
+    PAGE_REUSE_LIMIT = 50
+
+    def __init__(
+        self,
+        headless: bool = True,
+        timeout_ms: int = 15000,
+        concurrency: int = 1,
+        blocked_resource_types: list[str] | None = None,
+        blocked_domains: list[str] | None = None,
+        readiness: ReadinessPolicy | None = None,
+    ):
         self.headless = headless
         self.timeout_ms = timeout_ms
-        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.concurrency = max(1, concurrency)
+        self.blocked_resource_types = set(
+            settings.CRAWL_BLOCK_RESOURCE_TYPES if blocked_resource_types is None else blocked_resource_types
+        )
+        self.blocked_domains = tuple(
+            settings.CRAWL_BLOCK_DOMAINS if blocked_domains is None else blocked_domains
+        )
+        self.readiness = readiness or ReadinessPolicy()
         self._playwright = None
         self._browser = None
+        self._init_lock = asyncio.Lock()
+        # Free slots; None means the slot has no page yet (or it was recycled)
+        self._pages = asyncio.Queue()
+        for _ in range(self.concurrency):
+            self._pages.put_nowait(None)
+        self._page_uses = {}
+        self.pages_served = 0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="headless-browser", daemon=True)
+        self._thread.start()
 
-    def _init_browser(self):
+    async def _init_browser(self):
         """Initialize browser in thread. Called once."""
-        if not self._playwright:
-            playwright_ctx = sync_playwright()
-            self._playwright = playwright_ctx.__enter__()
-            self._browser = self._playwright.chromium.launch(headless=self.headless)
+        async with self._init_lock:
+            if not self._playwright:
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=self.headless)
 
-    def _fetch_in_thread(self, url: str) -> tuple[str, str, str, list[str], int]:
-        """Fetch HTML in dedicated thread."""
-        self._init_browser()
+    async def _new_page(self):
+        """Open a page in a fresh lightweight context with request blocking installed."""
+        await self._init_browser()
+        context = await self._browser.new_context(service_workers="block")
+        await context.route("**/*", self._route)
+        await context.add_init_script(READINESS_INIT_SCRIPT)
+        page = await context.new_page()
+        self._page_uses[page] = 0
+        return page
 
-        page = self._browser.new_page()
+    async def _recycle_page(self, page) -> None:
+        self._page_uses.pop(page, None)
         try:
-            response = page.goto(url, wait_until="domcontentloaded", timeout=self.timeout_ms)
-            try:
-                page.wait_for_load_state("networkidle", timeout=self.timeout_ms)
-            except PlaywrightTimeoutError:
-                pass
-
-            html_content = page.content()
-            soup = BeautifulSoup(html_content, "html.parser")
-            for tag in soup(["script", "style"]):
-                tag.decompose()
-            plain_text = soup.get_text(separator=" ", strip=True)
-            title = soup.title.string.strip() if soup.title and soup.title.string else page.title()
-            status_code = response.status
-            child_links = self.get_domain_hyperlinks(url, html_content)
-
-            return html_content, plain_text, title, child_links, status_code
+            await page.context.close()
+        except Exception as e:
+            logger.debug(f"Failed to close browser context: {e}")
+
+    async def _route(self, route):
+        """Abort requests the crawler doesn't need (only the DOM is kept)."""
+        request = route.request
+        if request.resource_type in self.blocked_resource_types or self._is_blocked_domain(request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def _is_blocked_domain(self, url: str) -> bool:
+        host = urlparse(url).hostname or ""
+        return any(host == domain or host.endswith("." + domain) for domain in self.blocked_domains)
+
+    async def _fetch(self, url: str) -> FetchResult:
+        """Fetch HTML in dedicated thread, at most ``concurrency`` pages at once."""
+        page = await self._pages.get()
+        try:
+            if page is None:
+                page = await self._new_page()
+
+            # Navigation + readiness wait + reading the DOM (render_wait is also observed on its own)
+            with timed("fetch_browser", urlparse(url).netloc) as metric:
+                response = await page.goto(url, wait_until="domcontentloaded", timeout=self.timeout_ms)
+                await self.readiness.wait(page, url, timeout_ms=self.timeout_ms)
+
+                html_content = await page.content()
+                page_title = await page.title()
+                status_code = response.status
+                headers = response.headers
+                final_url = page.url  # after redirects (relative links resolve against it)
+                metric["outcome"] = status_outcome(status_code)
+            BYTES_TOTAL.labels(stage="fetch").inc(len(html_content))
+
+            self.pages_served += 1
+            self._page_uses[page] += 1
+            if self._page_uses[page] >= self.PAGE_REUSE_LIMIT:
+                await self._recycle_page(page)
+                page = None
+        except Exception:
+            if page is not None:
+                await self._recycle_page(page)
+                page = None
+            raise
+        finally:
+            self._pages.put_nowait(page)
+
+        # Parsing is CPU bound, keep it off the event loop so other pages keep loading
+        plain_text, title, child_links, anchor_texts, canonical_url = await self._loop.run_in_executor(
+            None, self.parse_html, url, html_content, final_url
+        )
+        return FetchResult(
+            html_content, plain_text, title or page_title, child_links, status_code,
+            etag=headers.get("etag"), last_modified=headers.get("last-modified"), anchor_texts=anchor_texts,
+            canonical_url=canonical_url,
+        )
+
+    def parse_html(
+        self, url: str, html_content: str, final_url: str | None = None
+    ) -> tuple[str, str | None, list[str], dict[str, str], str | None]:
+        """Extract plain text, title, same-domain links, their anchor text and the page's
+        trusted canonical url from HTML (single parse). Links are canonical urls.
+
+        Relative hrefs resolve against ``final_url``, the url the page was served from
+        (after redirects, as-is: ``url`` is canonical, without the trailing slash of a
+        directory page), or its ``<base href>``.
+        """
+        with timed("parse", urlparse(url).netloc):
+            extracted = extract_html(html_content)
+        canonicalizer = get_url_canonicalizer()
+        canonical_url = canonicalizer.learn(final_url or url, extracted.canonical_href)
+        base = self._base_url(final_url or url, extracted.base_href)
+        anchor_texts = {}
+        for href, text in (extracted.anchor_texts or {}).items():
+            link = self._clean_link(href, url, base)
+            if link is not None:
+                anchor_texts.setdefault(link, text)
+        child_links = self.domain_links(url, extracted.hyperlinks, base)
+        return extracted.plain_text, extracted.title, child_links, anchor_texts, canonical_url
+
+    def warm_up(self) -> None:
+        """Launch Playwright and Chromium now instead of on the first fetch."""
+        asyncio.run_coroutine_threadsafe(self._init_browser(), self._loop).result()
+
+    def is_connected(self) -> bool:
+        """False once a launched browser crashed or was closed."""
+        return self._browser is None or self._browser.is_connected()
+
+    def reset_contexts(self) -> None:
+        """Close every slot's page and context (cookies, cache, storage); call between jobs.
+        Readiness stats restart too (learned domain profiles are kept)."""
+        asyncio.run_coroutine_threadsafe(self._reset_pages(), self._loop).result()
+        self.readiness.reset_stats()
+
+    def relaunch(self) -> None:
+        """Restart Chromium (frees its memory) once the pages being fetched are done;
+        fetches started meanwhile wait for the new browser. Resets ``pages_served``."""
+        asyncio.run_coroutine_threadsafe(self._relaunch(), self._loop).result()
+
+    async def _relaunch(self):
+        slots = [await self._pages.get() for _ in range(self.concurrency)]
+        try:
+            await self._shutdown()
+            self.pages_served = 0
+            await self._init_browser()
         finally:
-            page.close()
+            for _ in slots:
+                self._pages.put_nowait(None)
+
+    async def _reset_pages(self):
+        pages = [await self._pages.get() for _ in range(self.concurrency)]
+        for page in pages:
+            if page is not None:
+                await self._recycle_page(page)
+            self._pages.put_nowait(None)
 
-    def fetch_html(self, url: str) -> tuple[str, str, str, list[str], int]:
+    def submit(self, url: str) -> Future:
+        """Start fetching ``url`` and return a future with the ``fetch_html`` result."""
+        return asyncio.run_coroutine_threadsafe(self._fetch(url), self._loop)
+
+    def fetch_html(self, url: str) -> FetchResult:
         """Synchronously fetch HTML and derived metadata for the given URL."""
-        return self._executor.submit(self._fetch_in_thread, url).result()
+        return self.submit(url).result()
 
     def get_domain_hyperlinks(self, url: str, html_content: str) -> list[str]:
         """Extract hyperlinks from HTML that are within the same domain."""
-        local_domain = urlparse(url).netloc
-        parser = HyperlinkParser()
-        parser.feed(html_content)
-
-        HTTP_URL_PATTERN = r'^http[s]*://.+'
-        clean_links = []
-
-        for link in set(parser.hyperlinks):
-            clean_link = None
-
-            if re.search(HTTP_URL_PATTERN, link):
-                url_obj = urlparse(link)
-                if url_obj.netloc == local_domain:
-                    clean_link = link
-            else:
-                if link.startswith("/"):
-                    link = link[1:]
-                elif link.startswith("#") or link.startswith("mailto:"):
-                    continue
-                clean_link = "https://" + local_domain + "/" + link
-
-            if clean_link is not None:
-                if clean_link.endswith("/"):
-                    clean_link = clean_link[:-1]
-                clean_links.append(clean_link)
-
-        return list(set(clean_links))
+        return self.domain_links(url, extract_html(html_content).hyperlinks)
+
+    def domain_links(self, url: str, hyperlinks: list[str], base: str | None = None) -> list[str]:
+        """Keep the hrefs of a page that are within its domain (other than the page itself),
+        as canonical urls. Relative hrefs resolve against ``base`` (default: the page url)."""
+        clean_links = (self._clean_link(link, url, base) for link in set(hyperlinks))
+        return list({link for link in clean_links if link is not None})
+
+    @staticmethod
+    def _base_url(url: str, base_href: str | None) -> str:
+        """Url relative hrefs of ``url`` resolve against: its ``<base href>`` if any."""
+        if not base_href:
+            return url
+        try:
+            return urljoin(url, base_href.strip())  # not canonicalized: its trailing slash matters
+        except ValueError:
+            return url
+
+    @staticmethod
+    def _clean_link(link: str, url: str, base: str | None = None) -> str | None:
+        """Canonical url of an href (resolved against ``base``, default ``url``) if it is
+        within the domain of ``url`` and not ``url`` itself (e.g. a ``#fragment`` link), else None."""
+        canonicalizer = get_url_canonicalizer()
+        clean_link = canonicalizer.canonicalize(link, base=base or url)
+        page = canonicalizer.canonicalize(url)
+        if clean_link is None or page is None or clean_link == page:
+            return None
+        if urlparse(clean_link).netloc != urlparse(page).netloc:
+            return None
+        return clean_link
+
+    async def _shutdown(self):
+        for page in list(self._page_uses):
+            await self._recycle_page(page)
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
 
     def close(self):
         """Close browser and cleanup resources."""
-        if self._executor:
-            self._executor.shutdown(wait=True)
-            self._executor = None
+        if self._loop and not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
 
     def __enter__(self):
         return self
@@ -109,20 +310,196 @@ class HeadlessBrowser:
         self.close()
 
 
-class HyperlinkParser(HTMLParser):
-    """HTML parser to extract hyperlinks."""
+class TieredFetcher:
+    """Fetch pages with a pooled keep-alive HTTP client first and escalate to the
+    headless browser only when the response looks like it needs JS rendering.
+    Exposes the same ``submit``/``fetch_html`` interface (and result tuple) as
+    :class:`HeadlessBrowser`. ``stats`` counts how often each tier was used.
+    Every request goes through a :class:`PolitenessScheduler` (per-host rate limit,
+    Crawl-delay, backoff); 429/503 responses are retried after the backoff.
+    A ``browser`` passed in (e.g. from the worker's BrowserPool) is used but not closed.
+    """
+
+    USER_AGENT = "Mozilla/5.0 (compatible; SearchEngineBot/1.0)"
+    MIN_TEXT_CHARS = 200  # less visible text than this looks like an empty shell
+    NOSCRIPT_TEXT_CHARS = 1000  # <noscript> + little text -> content is rendered by JS
+    RENDER_LEARN_THRESHOLD = 3  # escalations before a domain goes straight to the browser
+    MAX_ATTEMPTS = 3  # per url, when the host answers 429/503
+    MAX_BODY_BYTES = 5 * 1024 * 1024  # larger pages are truncated
+    SPA_MARKERS = re.compile(
+        r'<div[^>]+id=["\'](?:root|app|__next|__nuxt|svelte)["\'][^>]*>\s*</div>'
+        r'|<app-root[^>]*>\s*</app-root>'
+        r'|\bng-app\b',
+        re.IGNORECASE,
+    )
+
+    def __init__(
+        self,
+        concurrency: int = 1,
+        http_first: bool = True,
+        timeout_s: float = 10,
+        scheduler: PolitenessScheduler | None = None,
+        browser: HeadlessBrowser | None = None,
+        **browser_kwargs,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.http_first = http_first
+        self.timeout_s = timeout_s
+        self._owns_browser = browser is None
+        self.browser = browser or HeadlessBrowser(concurrency=self.concurrency, **browser_kwargs)
+        self.scheduler = scheduler or PolitenessScheduler(user_agent=self.USER_AGENT)
+        self.stats = Counter()
+        self._render_escalations = Counter()  # domain -> pages escalated for rendering
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="tiered-fetch")
+
+        self._session = requests.Session()
+        self._session.headers["User-Agent"] = self.USER_AGENT
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
 
-    def __init__(self):
-        super().__init__()
-        self.hyperlinks = []
+    def submit(self, url: str, validators: dict | None = None) -> Future:
+        """Start fetching ``url`` and return a future with the ``fetch_html`` result.
 
-    def handle_starttag(self, tag, attrs):
-        attrs = dict(attrs)
-        if tag == "a" and "href" in attrs:
-            self.hyperlinks.append(attrs["href"])
+        ``validators`` (``etag`` / ``last_modified`` of a previous crawl) make the HTTP
+        tier send a conditional request; the result is a 304 FetchResult if unchanged.
+        """
+        return self._executor.submit(self._fetch, url, validators)
+
+    def fetch_html(self, url: str) -> FetchResult:
+        """Synchronously fetch HTML and derived metadata for the given URL."""
+        return self.submit(url).result()
+
+    def _fetch(self, url: str, validators: dict | None = None) -> FetchResult:
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            result = self._fetch_once(url, validators)
+            if result.status_code not in PolitenessScheduler.BACKOFF_STATUSES or attempt == self.MAX_ATTEMPTS:
+                return result
+            # The scheduler holds the host back until the backoff passed
+            self._count("retried")
+
+    def _fetch_once(self, url: str, validators: dict | None = None) -> FetchResult:
+        domain = urlparse(url).netloc
+        if self.http_first and self._render_escalations[domain] < self.RENDER_LEARN_THRESHOLD:
+            result = self._fetch_http(url, validators)
+            if result is not None:
+                self._count("http")
+                return result
+            self._count("escalated")
+
+        self._count("browser")
+        with self.scheduler.slot(url) as slot:
+            result = self.browser.fetch_html(url)
+            slot["status_code"] = result.status_code
+        return result
+
+    def _fetch_http(self, url: str, validators: dict | None = None) -> FetchResult | None:
+        """Fetch with the HTTP client; return None if the page has to be rendered."""
+        headers = {}
+        if validators and validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators and validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        # Streamed: status and Content-Type are checked before the body is downloaded
+        with self.scheduler.slot(url) as slot, timed("fetch_http", urlparse(url).netloc) as metric:
+            try:
+                response = self._session.get(url, headers=headers, timeout=self.timeout_s, stream=True)
+            except requests.RequestException as e:
+                logger.debug(f"HTTP fetch failed for {url}, falling back to browser: {e}")
+                metric["outcome"] = "error"
+                return None
+            with response:
+                slot["status_code"] = response.status_code
+                metric["outcome"] = status_outcome(response.status_code)
+                content_type = response.headers.get("Content-Type", "")
+                if response.status_code == 304 or response.status_code == 403 or not content_type:
+                    html_content = None  # not modified, or bot wall / unknown type for the browser
+                elif "html" not in content_type:
+                    html_content = ""  # not a page; closed without downloading it
+                else:
+                    try:
+                        html_content = self._read_text(url, response, content_type)
+                    except requests.RequestException as e:
+                        logger.debug(f"HTTP fetch failed for {url}, falling back to browser: {e}")
+                        metric["outcome"] = "error"
+                        return None
 
-    def error(self, message):
-        pass
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        if response.status_code == 304:
+            self._count("not_modified")
+            return FetchResult(None, None, None, [], 304, etag=etag, last_modified=last_modified)
+        if response.status_code in PolitenessScheduler.BACKOFF_STATUSES:
+            return FetchResult(html_content or "", "", "", [], response.status_code)  # rate limited; don't escalate
+        if html_content is None:
+            return None
+        if "html" not in content_type:
+            if 200 <= response.status_code < 300:
+                raise ValueError(f"Not an HTML page: {content_type}")  # the browser can't render it either
+            return FetchResult("", "", "", [], response.status_code)
 
+        plain_text, title, child_links, anchor_texts, canonical_url = self.browser.parse_html(
+            url, html_content, final_url=response.url
+        )
+        # Error pages (404, 410, 5xx) are short by nature; only a 2xx page can be a JS shell
+        if 200 <= response.status_code < 300 and self._needs_render(html_content, plain_text):
+            with self._lock:
+                self._render_escalations[urlparse(url).netloc] += 1
+            return None
 
+        return FetchResult(
+            html_content, plain_text, title or "", child_links, response.status_code,
+            etag=etag, last_modified=last_modified, anchor_texts=anchor_texts, canonical_url=canonical_url,
+        )
 
+    def _read_text(self, url: str, response: requests.Response, content_type: str) -> str:
+        """Read and decode the body of a streamed response, at most ``MAX_BODY_BYTES``."""
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            body += chunk
+            if len(body) > self.MAX_BODY_BYTES:
+                logger.debug(f"{url} is larger than {self.MAX_BODY_BYTES} bytes, truncated")
+                del body[self.MAX_BODY_BYTES:]
+                break
+        BYTES_TOTAL.labels(stage="fetch").inc(len(body))
+
+        if "charset" in content_type and response.encoding:
+            try:
+                return body.decode(response.encoding, errors="replace")
+            except LookupError:
+                pass  # unknown charset, detect it like below
+        try:
+            # Most pages are UTF-8; a character cut by the size limit isn't a decoding error
+            return codecs.getincrementaldecoder("utf-8")().decode(bytes(body), final=False)
+        except UnicodeDecodeError:
+            pass
+        encoding = requests.compat.chardet.detect(bytes(body))["encoding"] or "utf-8"
+        return body.decode(encoding, errors="replace")
+
+    def _needs_render(self, html_content: str, plain_text: str) -> bool:
+        """Heuristics for pages whose content only appears after JS runs."""
+        if len(plain_text) < self.MIN_TEXT_CHARS:
+            return True
+        if len(plain_text) < self.NOSCRIPT_TEXT_CHARS and "<noscript" in html_content.lower():
+            return True
+        return bool(self.SPA_MARKERS.search(html_content))
+
+    def _count(self, tier: str) -> None:
+        with self._lock:
+            self.stats[tier] += 1
+
+    def close(self):
+        """Close HTTP session, browser and cleanup resources."""
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._session.close()
+        if self._owns_browser:
+            self.browser.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
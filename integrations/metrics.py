@@ -0,0 +1,181 @@
+"""
+Crawl metrics exported to Prometheus
+
+STAGE_SECONDS - Histogram of crawl stage durations, by stage, host and outcome
+PAGES_TOTAL - Counter of crawled pages, by host and outcome
+BYTES_TOTAL - Counter of bytes fetched / uploaded, by stage
+timed - Context manager observing a stage duration (outcome "error" if it raises)
+metrics_payload - Exposition of the process' metrics (API scrape endpoint, multiprocess aware)
+export_metrics - Push to a Pushgateway and/or write a node_exporter textfile (Celery workers)
+delete_exported_metrics - Remove the process' Pushgateway group and textfile (worker shutdown)
+
+Stages: fetch_http, fetch_browser, render_wait, parse, s3_upload, s3_segment_upload,
+index, index_bulk, db_write, db_purge. Hosts are bounded to METRICS_MAX_HOSTS distinct
+label values per process, later hosts are reported as "other".
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from django.conf import settings
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    delete_from_gateway,
+    generate_latest,
+    multiprocess,
+    push_to_gateway,
+    write_to_textfile,
+)
+from prometheus_client.metrics_core import Metric
+
+
+logger = logging.getLogger(__name__)
+
+
+STAGE_SECONDS = Histogram(
+    "crawl_stage_seconds",
+    "Duration of crawl pipeline stages",
+    ["stage", "host", "outcome"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 30, 60),
+)
+PAGES_TOTAL = Counter("crawl_pages", "Crawled pages", ["host", "outcome"])
+BYTES_TOTAL = Counter("crawl_bytes", "Bytes fetched or uploaded", ["stage"])
+
+_hosts = set()
+_hosts_lock = threading.Lock()
+_last_export = 0.0
+
+
+def host_label(host: Optional[str]) -> str:
+    """``host`` as a label value; "other" once METRICS_MAX_HOSTS hosts were seen."""
+    if not host:
+        return ""
+    with _hosts_lock:
+        if host in _hosts:
+            return host
+        if len(_hosts) < getattr(settings, 'METRICS_MAX_HOSTS', 100):
+            _hosts.add(host)
+            return host
+    return "other"
+
+
+def status_outcome(status_code: Optional[int]) -> str:
+    """Outcome label of an HTTP status: "2xx", "4xx", ..., "not_modified" or "error"."""
+    if not status_code:
+        return "error"
+    if status_code == 304:
+        return "not_modified"
+    return f"{status_code // 100}xx"
+
+
+@contextmanager
+def timed(stage: str, host: Optional[str] = None, outcome: str = "ok"):
+    """Observe the duration of the block in STAGE_SECONDS.
+
+    Yields a dict whose ``outcome`` the block may change; an exception records "error".
+    """
+    labels = {"outcome": outcome}
+    started = time.perf_counter()
+    try:
+        yield labels
+    except BaseException:
+        labels["outcome"] = "error"
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage=stage, host=host_label(host), outcome=labels["outcome"]).observe(
+            time.perf_counter() - started
+        )
+
+
+def metrics_payload() -> tuple[bytes, str]:
+    """``(body, content_type)`` of the metrics exposition.
+
+    With PROMETHEUS_MULTIPROC_DIR set (several API worker processes) the metrics of all
+    processes are merged, otherwise this process' registry is exposed.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class _PidLabelled:
+    """``registry``'s metrics with a ``pid`` label added to every sample."""
+
+    def __init__(self, registry, pid: str):
+        self.registry = registry
+        self.pid = pid
+
+    def collect(self):
+        for metric in self.registry.collect():
+            labelled = Metric(metric.name, metric.documentation, metric.type, metric.unit)
+            labelled.samples = [sample._replace(labels={**sample.labels, "pid": self.pid}) for sample in metric.samples]
+            yield labelled
+
+
+def _instance() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _textfile_path(textfile_dir: str) -> str:
+    return os.path.join(textfile_dir, f"crawler_{_instance().replace(':', '_')}.prom")
+
+
+def export_metrics(force: bool = False) -> None:
+    """Push this process' metrics (METRICS_PUSHGATEWAY_URL) and/or write them to a textfile
+    (METRICS_TEXTFILE_DIR), at most every METRICS_EXPORT_INTERVAL_S unless ``force``.
+
+    Celery worker processes are not scraped, so they export instead; each process is its
+    own group (``instance`` = host:pid) so their counters don't overwrite each other, and
+    its textfile series carry a ``pid`` label (node_exporter rejects series repeated across files).
+    """
+    global _last_export
+    gateway = getattr(settings, 'METRICS_PUSHGATEWAY_URL', '')
+    textfile_dir = getattr(settings, 'METRICS_TEXTFILE_DIR', '')
+    if not gateway and not textfile_dir:
+        return
+    now = time.monotonic()
+    if not force and now - _last_export < getattr(settings, 'METRICS_EXPORT_INTERVAL_S', 30):
+        return
+    _last_export = now
+
+    if gateway:
+        try:
+            push_to_gateway(gateway, job="crawler", grouping_key={"instance": _instance()}, registry=REGISTRY)
+        except Exception as e:
+            logger.warning(f"Metrics push to {gateway} failed: {e}")
+    if textfile_dir:
+        path = _textfile_path(textfile_dir)
+        try:
+            write_to_textfile(path, _PidLabelled(REGISTRY, str(os.getpid())))
+        except OSError as e:
+            logger.warning(f"Metrics textfile {path} not written: {e}")
+
+
+def delete_exported_metrics() -> None:
+    """Delete this process' Pushgateway group and textfile, so they don't outlive it."""
+    gateway = getattr(settings, 'METRICS_PUSHGATEWAY_URL', '')
+    textfile_dir = getattr(settings, 'METRICS_TEXTFILE_DIR', '')
+    if gateway:
+        try:
+            delete_from_gateway(gateway, job="crawler", grouping_key={"instance": _instance()})
+        except Exception as e:
+            logger.warning(f"Metrics group not deleted from {gateway}: {e}")
+    if textfile_dir:
+        try:
+            os.remove(_textfile_path(textfile_dir))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Metrics textfile not deleted: {e}")
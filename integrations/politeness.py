@@ -0,0 +1,234 @@
+"""
+PolitenessScheduler - Per-host rate limiting for crawl fetches.
+
+Each host gets a token bucket (requests/second + burst) and a max number of
+concurrent fetches. robots.txt ``Crawl-delay`` caps the rate, and 429/503
+responses pause the host with exponential backoff.
+
+With CRAWL_HOST_LIMITS_SHARED the bucket and the backoff live in Redis, keyed by
+host, so all workers (distributed mode, shards of a partitioned job, concurrent
+jobs) share one rate per host; the concurrency limit stays per scheduler.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import redis
+import requests
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class _HostState:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.refilled_at = time.monotonic()
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.backoff_s = 0.0
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+
+
+class PolitenessScheduler:
+    """Hands out fetch slots per host, subject to rate, concurrency and backoff.
+
+    Thread safe: fetcher threads call :meth:`acquire` (blocks until the host may
+    be fetched) and :meth:`release` with the response status, or use :meth:`slot`.
+    """
+
+    BACKOFF_STATUSES = (429, 503)
+    KEY_PREFIX = "politeness:"
+
+    # Take a token of the host's shared bucket (KEYS[1]); ARGV: now, rate, burst, key ttl.
+    # Returns the seconds to wait before retrying (0 = taken), as a string (Lua numbers are truncated)
+    TAKE_SCRIPT = """
+    local now, rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'refilled_at', 'blocked_until')
+    local blocked_until = tonumber(state[3]) or 0
+    if blocked_until > now then
+        return tostring(blocked_until - now)
+    end
+    local tokens = math.min(burst, (tonumber(state[1]) or burst) + math.max(0, now - (tonumber(state[2]) or now)) * rate)
+    local wait_s = 0
+    if tokens < 1 then
+        wait_s = (1 - tokens) / rate
+    else
+        tokens = tokens - 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'refilled_at', tostring(now))
+    redis.call('EXPIRE', KEYS[1], ARGV[4])
+    return tostring(wait_s)
+    """
+
+    # Double the host's shared backoff (KEYS[1]) and block it; ARGV: now, max backoff, key ttl
+    BACKOFF_SCRIPT = """
+    local backoff_s = math.min(tonumber(ARGV[2]), math.max(1, (tonumber(redis.call('HGET', KEYS[1], 'backoff_s')) or 0) * 2))
+    redis.call('HSET', KEYS[1], 'backoff_s', tostring(backoff_s), 'blocked_until', tostring(tonumber(ARGV[1]) + backoff_s))
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    return tostring(backoff_s)
+    """
+
+    def __init__(
+        self,
+        rate_per_s: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_per_host: Optional[int] = None,
+        max_backoff_s: Optional[float] = None,
+        user_agent: str = "*",
+        crawl_delay_provider: Optional[Callable[[str], Optional[float]]] = None,
+        shared: Optional[bool] = None,
+        redis_client=None,
+    ):
+        self.rate_per_s = rate_per_s or getattr(settings, 'CRAWL_HOST_RATE_PER_S', 2.0)
+        self.burst = burst or getattr(settings, 'CRAWL_HOST_BURST', 4)
+        self.max_per_host = max_per_host or getattr(settings, 'CRAWL_HOST_MAX_CONCURRENCY', 4)
+        self.max_backoff_s = max_backoff_s or getattr(settings, 'CRAWL_HOST_MAX_BACKOFF_S', 120)
+        self.user_agent = user_agent
+        self.crawl_delay_provider = crawl_delay_provider or self._robots_crawl_delay
+        if shared is None:
+            shared = getattr(settings, 'CRAWL_HOST_LIMITS_SHARED', True)
+        self.redis = (redis_client or redis.Redis.from_url(settings.REDISCLOUD_URL)) if shared else None
+        if self.redis is not None:
+            self._take_script = self.redis.register_script(self.TAKE_SCRIPT)
+            self._backoff_script = self.redis.register_script(self.BACKOFF_SCRIPT)
+        self._key_ttl_s = int(max(60, 2 * self.max_backoff_s))
+
+        self._hosts = {}
+        self._cond = threading.Condition()
+
+    def _host_state(self, url: str) -> _HostState:
+        parsed = urlparse(url)
+        host = parsed.netloc
+        with self._cond:
+            state = self._hosts.get(host)
+        if state is not None:
+            return state
+
+        # Looked up outside the lock, robots.txt may take a while
+        rate, burst = self.rate_per_s, self.burst
+        crawl_delay = self.crawl_delay_provider(f"{parsed.scheme}://{host}")
+        if crawl_delay:
+            rate, burst = min(rate, 1.0 / crawl_delay), 1
+            logger.info(f"Crawl-delay {crawl_delay}s for {host}")
+
+        with self._cond:
+            return self._hosts.setdefault(host, _HostState(rate, burst))
+
+    def acquire(self, url: str) -> None:
+        """Block until ``url``'s host has a free slot and a rate token."""
+        state = self._host_state(url)
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if state.blocked_until > now:
+                    self._cond.wait(state.blocked_until - now)
+                elif state.in_flight >= self.max_per_host:
+                    self._cond.wait()  # woken up by release()
+                else:
+                    state.in_flight += 1
+                    break
+
+        # The slot is held while waiting for a token
+        try:
+            if self.redis is None or not self._take_shared(urlparse(url).netloc, state):
+                self._take_local(state)
+        except BaseException:
+            with self._cond:
+                state.in_flight -= 1
+                self._cond.notify_all()
+            raise
+
+    def _take_local(self, state: _HostState) -> None:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                state.refill(now)
+                if state.blocked_until > now:
+                    self._cond.wait(state.blocked_until - now)
+                elif state.tokens < 1:
+                    self._cond.wait((1 - state.tokens) / state.rate)
+                else:
+                    state.tokens -= 1
+                    return
+
+    def _take_shared(self, host: str, state: _HostState) -> bool:
+        """Take a token of the host's bucket in Redis; False if Redis is unavailable."""
+        while True:
+            try:
+                wait_s = float(self._take_script(
+                    keys=[self._key(host)], args=[time.time(), state.rate, state.burst, self._key_ttl_s]
+                ))
+            except redis.RedisError as e:
+                logger.warning(f"Shared rate limit of {host} not available, limiting per process: {e}")
+                return False
+            if wait_s <= 0:
+                return True
+            time.sleep(wait_s)
+
+    def release(self, url: str, status_code: Optional[int] = None) -> None:
+        """Free the slot taken by :meth:`acquire`; back off the host on 429/503."""
+        state = self._host_state(url)
+        host = urlparse(url).netloc
+        with self._cond:
+            state.in_flight -= 1
+            backed_off = state.backoff_s > 0
+            if status_code in self.BACKOFF_STATUSES:
+                state.backoff_s = min(self.max_backoff_s, max(1.0, state.backoff_s * 2))
+                state.blocked_until = time.monotonic() + state.backoff_s
+            elif status_code is not None:
+                state.backoff_s = 0.0
+            self._cond.notify_all()
+
+        if status_code in self.BACKOFF_STATUSES:
+            backoff_s = state.backoff_s
+            if self.redis is not None:
+                try:
+                    backoff_s = float(self._backoff_script(
+                        keys=[self._key(host)], args=[time.time(), self.max_backoff_s, self._key_ttl_s]
+                    ))
+                except redis.RedisError as e:
+                    logger.warning(f"Backoff of {host} not shared: {e}")
+            logger.warning(f"{host} answered {status_code}, backing off {backoff_s}s")
+        elif status_code is not None and backed_off and self.redis is not None:
+            try:
+                self.redis.hset(self._key(host), "backoff_s", 0)
+            except redis.RedisError as e:
+                logger.warning(f"Backoff of {host} not reset: {e}")
+
+    def _key(self, host: str) -> str:
+        return f"{self.KEY_PREFIX}{host}"
+
+    @contextmanager
+    def slot(self, url: str):
+        """``with scheduler.slot(url) as slot: ...; slot["status_code"] = status``"""
+        self.acquire(url)
+        slot = {"status_code": None}
+        try:
+            yield slot
+        finally:
+            self.release(url, slot["status_code"])
+
+    def _robots_crawl_delay(self, origin: str) -> Optional[float]:
+        """Crawl-delay from the host's robots.txt (None if missing or unreachable)."""
+        try:
+            response = requests.get(f"{origin}/robots.txt", timeout=5)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        parser = RobotFileParser()
+        parser.parse(response.text.splitlines())
+        delay = parser.crawl_delay(self.user_agent)
+        return float(delay) if delay else None
@@ -0,0 +1,128 @@
+"""
+ReadinessPolicy - Decides how long a browser page waits after DOMContentLoaded before its HTML is read.
+
+Instead of waiting for ``networkidle`` (never reached on pages with analytics beacons
+or long-polling, so each of them burned the whole timeout), a page is ready once its
+DOM has not changed for a short settle window (MutationObserver quiescence), with a
+hard cap. Per domain, the policy learns whether content changes after DOMContentLoaded
+at all; for domains where it doesn't, the wait is skipped (re-checked every few pages).
+"""
+
+import logging
+import time
+from collections import Counter
+from typing import Optional
+from urllib.parse import urlparse
+
+from django.conf import settings
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from integrations.metrics import STAGE_SECONDS, host_label
+
+
+logger = logging.getLogger(__name__)
+
+
+# Installed on every browser context: counts DOM mutations and remembers the last one
+INIT_SCRIPT = """
+(() => {
+    window.__crawlerMutations = 0;
+    window.__crawlerLastMutation = performance.now();
+    new MutationObserver((records) => {
+        window.__crawlerMutations += records.length;
+        window.__crawlerLastMutation = performance.now();
+    }).observe(document, {childList: true, subtree: true, characterData: true, attributes: false});
+    document.addEventListener("DOMContentLoaded", () => {
+        window.__crawlerMutationsAtDcl = window.__crawlerMutations;
+    });
+})();
+"""
+QUIET_JS = "settle => performance.now() - (window.__crawlerLastMutation || 0) >= settle"
+MUTATIONS_SINCE_DCL_JS = "() => (window.__crawlerMutations || 0) - (window.__crawlerMutationsAtDcl || 0)"
+
+
+class _DomainProfile:
+    def __init__(self):
+        self.samples = 0  # pages observed (waited for)
+        self.changed = 0  # of them, pages whose DOM changed after DOMContentLoaded
+        self.wait_ms = None  # moving average of the wait until quiet
+        self.skipped = 0  # pages not waited for since the last observed one
+
+
+class ReadinessPolicy:
+    """
+    Per-domain readiness waits of one HeadlessBrowser (profiles live as long as the
+    browser, i.e. across the jobs of a worker process when it is pooled).
+
+    ``stats`` counts pages by outcome (``skipped``, ``quiet``, ``capped``) and the
+    total ``wait_ms``, since the last ``reset_stats``.
+    """
+
+    LEARN_PAGES = 5  # observed pages before a domain's profile is trusted
+    STATIC_RATIO = 0.1  # at most this share of pages changing after DOMContentLoaded -> static domain
+    PROBE_EVERY = 20  # static domains are still observed every N pages
+    MIN_MUTATIONS = 5  # mutation records after DOMContentLoaded that count as a content change
+    MIN_CAP_MS = 1000
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, settle_ms: Optional[int] = None, max_wait_ms: Optional[int] = None,
+                 adaptive: Optional[bool] = None):
+        self.settle_ms = settle_ms or getattr(settings, 'CRAWL_READY_SETTLE_MS', 500)
+        self.max_wait_ms = max_wait_ms or getattr(settings, 'CRAWL_READY_MAX_WAIT_MS', 5000)
+        self.adaptive = adaptive if adaptive is not None else getattr(settings, 'CRAWL_READY_ADAPTIVE', True)
+        self.stats = Counter()
+        self._profiles = {}  # domain -> _DomainProfile
+
+    async def wait(self, page, url: str, timeout_ms: Optional[int] = None) -> None:
+        """Wait (after DOMContentLoaded) until ``page`` is ready to be read."""
+        domain = urlparse(url).netloc
+        profile = self._profiles.setdefault(domain, _DomainProfile())
+        self.stats["pages"] += 1
+
+        if self.adaptive and self._is_static(profile) and profile.skipped < self.PROBE_EVERY:
+            profile.skipped += 1
+            self.stats["skipped"] += 1
+            STAGE_SECONDS.labels(stage="render_wait", host=host_label(domain), outcome="skipped").observe(0)
+            return
+
+        cap_ms = min(self._cap_ms(profile), timeout_ms or self.max_wait_ms)
+        started = time.monotonic()
+        try:
+            await page.wait_for_function(QUIET_JS, arg=self.settle_ms, timeout=cap_ms, polling=100)
+            outcome = "quiet"
+        except PlaywrightTimeoutError:
+            outcome = "capped"
+        except PlaywrightError as e:  # e.g. navigated away (client-side redirect) while waiting
+            logger.debug(f"Readiness wait of {url} interrupted: {e}")
+            outcome = "capped"
+        waited_ms = (time.monotonic() - started) * 1000
+
+        try:
+            changed = await page.evaluate(MUTATIONS_SINCE_DCL_JS) >= self.MIN_MUTATIONS
+        except PlaywrightError:
+            changed = True
+        self._record(profile, waited_ms, changed)
+        self.stats[outcome] += 1
+        self.stats["wait_ms"] += round(waited_ms)
+        STAGE_SECONDS.labels(stage="render_wait", host=host_label(domain), outcome=outcome).observe(waited_ms / 1000)
+
+    def reset_stats(self) -> None:
+        self.stats = Counter()
+
+    def _is_static(self, profile: _DomainProfile) -> bool:
+        return profile.samples >= self.LEARN_PAGES and profile.changed <= self.STATIC_RATIO * profile.samples
+
+    def _cap_ms(self, profile: _DomainProfile) -> float:
+        """Hard cap; once learned, about twice the domain's usual time to quiet."""
+        if not self.adaptive or profile.samples < self.LEARN_PAGES or profile.wait_ms is None:
+            return self.max_wait_ms
+        return min(self.max_wait_ms, max(self.MIN_CAP_MS, self.settle_ms + 2 * profile.wait_ms))
+
+    def _record(self, profile: _DomainProfile, waited_ms: float, changed: bool) -> None:
+        profile.samples += 1
+        profile.changed += changed
+        profile.skipped = 0
+        if profile.wait_ms is None:
+            profile.wait_ms = waited_ms
+        else:
+            profile.wait_ms += self.EWMA_ALPHA * (waited_ms - profile.wait_ms)
@@ -1,15 +1,20 @@
 """
 SearchIndexClient - AWS OpenSearch integration for indexing crawled pages
+BulkIndexer - Buffered indexing of crawled pages via the OpenSearch _bulk API
 """
 
+import json
 import logging
 import hashlib
+import time
 from typing import Optional, Dict, Any
 from datetime import datetime
 from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
 import boto3
 from django.conf import settings
 
+from integrations.metrics import timed
+
 logger = logging.getLogger(__name__)
 
 
@@ -150,17 +155,16 @@ class SearchIndexClient:
         """Generate a consistent document ID from URL."""
         return hashlib.sha256(url.encode('utf-8')).hexdigest()
 
-    def index_page(
+    def _build_document(
         self,
         url: str,
         title: str,
         content: str,
         page_id: str,
         last_crawled_at: Optional[datetime] = None,
-        refresh: bool = False
-    ) -> str:
-        """Index a crawled page in OpenSearch."""
-        document = {
+    ) -> Dict[str, Any]:
+        """Build the index document for a crawled page."""
+        return {
             "url": url,
             "title": title,
             "content": content,
@@ -169,14 +173,26 @@ class SearchIndexClient:
             "indexed_at": datetime.utcnow().isoformat(),
         }
 
+    def index_page(
+        self,
+        url: str,
+        title: str,
+        content: str,
+        page_id: str,
+        last_crawled_at: Optional[datetime] = None,
+        refresh: bool = False
+    ) -> str:
+        """Index a crawled page in OpenSearch."""
+        document = self._build_document(url, title, content, page_id, last_crawled_at)
         doc_id = self._generate_doc_id(url)
 
-        self.client.index(
-            index=self.index_name,
-            id=doc_id,
-            body=document,
-            refresh=refresh  # Optionally refresh index immediately
-        )
+        with timed("index"):
+            self.client.index(
+                index=self.index_name,
+                id=doc_id,
+                body=document,
+                refresh=refresh  # Optionally refresh index immediately
+            )
 
         return doc_id
 
@@ -192,6 +208,20 @@ class SearchIndexClient:
             logger.error(f"Failed to delete document '{doc_id}': {e}")
             # Don't raise - we want page deletion to succeed even if index deletion fails
 
+    def delete_pages(self, doc_ids: list[str]) -> None:
+        """Delete several documents from the search index with one _bulk request."""
+        if not doc_ids:
+            return
+        body = "\n".join(
+            json.dumps({"delete": {"_index": self.index_name, "_id": doc_id}}) for doc_id in doc_ids
+        ) + "\n"
+        try:
+            self.client.bulk(body=body)
+            logger.info(f"{len(doc_ids)} documents deleted from index '{self.index_name}'.")
+        except Exception as e:
+            logger.error(f"Failed to delete {len(doc_ids)} documents: {e}")
+            # Don't raise - we want page deletion to succeed even if index deletion fails
+
     def search(self, query: str, size: int = 10, from_: int = 0) -> Dict[str, Any]:
         """Search indexed pages."""
         search_body = {
@@ -232,3 +262,90 @@ class SearchIndexClient:
     def refresh_index(self) -> None:
         """Manually refresh the index to make recent changes searchable."""
         self.client.indices.refresh(index=self.index_name)
+
+
+class BulkIndexer:
+    """Buffer page documents and send them to OpenSearch with the ``_bulk`` API.
+
+    Flushes when ``max_docs`` documents or ``max_bytes`` of payload are buffered,
+    or ``flush_interval_s`` seconds passed since the last flush. Documents that
+    OpenSearch rejected are collected per page id (see :meth:`pop_failed`).
+    """
+
+    def __init__(
+        self,
+        search_index_client: Optional[SearchIndexClient] = None,
+        max_docs: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        flush_interval_s: Optional[float] = None,
+    ):
+        self.search_index_client = search_index_client or SearchIndexClient()
+        self.max_docs = max_docs or getattr(settings, 'OPENSEARCH_BULK_MAX_DOCS', 500)
+        self.max_bytes = max_bytes or getattr(settings, 'OPENSEARCH_BULK_MAX_BYTES', 5 * 1024 * 1024)
+        self.flush_interval_s = flush_interval_s or getattr(settings, 'OPENSEARCH_BULK_FLUSH_INTERVAL_S', 5)
+
+        self._lines = []  # NDJSON action/source pairs
+        self._page_ids = []
+        self._bytes = 0
+        self._last_flush = time.monotonic()
+        self._failed = {}  # page_id -> error
+
+    def add(
+        self,
+        url: str,
+        title: str,
+        content: str,
+        page_id: str,
+        last_crawled_at: Optional[datetime] = None,
+    ) -> str:
+        """Buffer a page for indexing and return its (deterministic) document id."""
+        client = self.search_index_client
+        doc_id = client._generate_doc_id(url)
+        document = client._build_document(url, title, content, page_id, last_crawled_at)
+
+        action = json.dumps({"index": {"_index": client.index_name, "_id": doc_id}})
+        source = json.dumps(document)
+        self._lines.extend([action, source])
+        self._page_ids.append(page_id)
+        self._bytes += len(action) + len(source) + 2
+
+        if len(self._page_ids) >= self.max_docs or self._bytes >= self.max_bytes:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+        return doc_id
+
+    def flush_if_due(self) -> None:
+        """Flush if ``flush_interval_s`` passed since the last flush."""
+        if self._page_ids and time.monotonic() - self._last_flush >= self.flush_interval_s:
+            self.flush()
+
+    def flush(self) -> None:
+        """Send buffered documents in one ``_bulk`` request."""
+        if self._page_ids:
+            lines, page_ids = self._lines, self._page_ids
+            self._lines, self._page_ids, self._bytes = [], [], 0
+
+            with timed("index_bulk") as metric:
+                try:
+                    response = self.search_index_client.client.bulk(body="\n".join(lines) + "\n")
+                except Exception as e:
+                    metric["outcome"] = "error"
+                    logger.error(f"Bulk indexing of {len(page_ids)} documents failed: {e}")
+                    self._failed.update({page_id: str(e) for page_id in page_ids})
+                else:
+                    if response.get("errors"):
+                        metric["outcome"] = "partial"
+                        for page_id, item in zip(page_ids, response["items"]):
+                            error = item.get("index", {}).get("error")
+                            if error:
+                                self._failed[page_id] = f"Indexing failed: {error.get('type')}: {error.get('reason')}"
+                    logger.info(f"Bulk indexed {len(page_ids)} documents in {response.get('took')}ms")
+
+        self._last_flush = time.monotonic()
+
+    def pop_failed(self) -> Dict[str, str]:
+        """Return and forget ``{page_id: error}`` for documents that failed to index."""
+        failed, self._failed = self._failed, {}
+        return failed
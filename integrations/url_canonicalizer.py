@@ -0,0 +1,199 @@
+"""
+URL canonicalization, so variants of one page are fetched and stored once.
+
+UrlCanonicalizer - Resolve hrefs (RFC 3986) and normalize urls to a canonical form.
+get_url_canonicalizer - Process-wide canonicalizer configured from settings.
+
+Canonical form: http(s) only; lowercase scheme and host (IDNA), no default port, no
+fragment; dot segments removed and percent-encoding normalized; tracking parameters
+(CRAWL_TRACKING_PARAMS) removed and the query sorted by parameter name; no trailing
+slash (as urls were stored before). CRAWL_CANONICAL_HOST_RULES adds per-host rules,
+and with CRAWL_LEARN_CANONICAL (opt-in) ``rel=canonical`` links of fetched pages teach
+which query parameters a host ignores.
+"""
+
+import logging
+import re
+import threading
+from typing import Iterable, Optional
+from urllib.parse import urljoin, urlsplit, urlunsplit, unquote
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+UNRESERVED = re.compile(r"%([0-9A-Fa-f]{2})")
+PATH_PARAMS = re.compile(r";(jsessionid|phpsessid|sid)=[^/?#]*", re.IGNORECASE)
+_UNRESERVED_CHARS = set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~")
+
+
+def _normalize_escapes(value: str) -> str:
+    """Decode escaped unreserved characters, uppercase the other escapes (RFC 3986 6.2.2)."""
+    def replace(match):
+        char = chr(int(match.group(1), 16))
+        return char if char in _UNRESERVED_CHARS else "%" + match.group(1).upper()
+    return UNRESERVED.sub(replace, value)
+
+
+def _remove_dot_segments(path: str) -> str:
+    """RFC 3986 5.2.4, for absolute paths."""
+    output = []
+    for segment in path.split("/")[1:]:
+        if segment == "..":
+            if output:
+                output.pop()
+        elif segment != ".":
+            output.append(segment)
+    if path.endswith(("/.", "/..")):
+        output.append("")
+    return "/" + "/".join(output)
+
+
+class UrlCanonicalizer:
+    """
+    Thread-safe; learned parameters are kept per process.
+
+    ``host_rules`` maps a host to options:
+      - ``drop_params``: more query parameters to remove (``*`` suffix = prefix match)
+      - ``keep_params``: only these parameters are kept (whitelist)
+      - ``lowercase_path``: the host's paths are case-insensitive
+    """
+
+    # A host's parameter is ignored once at least LEARN_MIN rel=canonical pages dropped it,
+    # and at least LEARN_RATIO of the pages that had it
+    LEARN_MIN = 50
+    LEARN_RATIO = 0.95
+    # Usually select content (pagination, ids, search, facets): never learned as ignored
+    CONTENT_PARAMS = frozenset({
+        "p", "page", "pg", "start", "offset", "limit", "per_page", "id", "item", "product", "article", "post",
+        "q", "query", "s", "search", "sort", "order", "filter", "category", "cat", "tag", "type", "lang",
+    })
+
+    def __init__(self, tracking_params: Optional[Iterable[str]] = None, host_rules: Optional[dict] = None,
+                 learn: Optional[bool] = None):
+        if tracking_params is None:
+            tracking_params = getattr(settings, 'CRAWL_TRACKING_PARAMS', ["utm_*", "fbclid", "gclid"])
+        self._tracking = self._matcher(tracking_params)
+        rules = getattr(settings, 'CRAWL_CANONICAL_HOST_RULES', {}) if host_rules is None else host_rules
+        self.host_rules = {host.lower(): rule for host, rule in rules.items()}
+        self._host_drop = {host: self._matcher(rule.get("drop_params", ())) for host, rule in self.host_rules.items()}
+        self.learn_enabled = learn if learn is not None else getattr(settings, 'CRAWL_LEARN_CANONICAL', False)
+        self._learned = {}  # host -> {param: [pages whose rel=canonical dropped it, kept it]}
+        self._ignored = {}  # host -> params learned as ignored
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _matcher(params: Iterable[str]):
+        exact = {p.lower() for p in params if not p.endswith("*")}
+        prefixes = tuple(p[:-1].lower() for p in params if p.endswith("*"))
+        return lambda name: name in exact or (bool(prefixes) and name.startswith(prefixes))
+
+    def canonicalize(self, url: str, base: Optional[str] = None) -> Optional[str]:
+        """Canonical absolute form of ``url`` (resolved against ``base``), or None if it isn't http(s)."""
+        url = url.strip()
+        if base is not None:
+            try:
+                url = urljoin(base, url)
+            except ValueError:
+                return None
+        try:
+            parts = urlsplit(url)
+            port = parts.port
+        except ValueError:
+            return None
+
+        scheme = parts.scheme.lower()
+        if scheme not in DEFAULT_PORTS or not parts.hostname:
+            return None
+        host = parts.hostname.rstrip(".")
+        try:
+            host = host.encode("idna").decode("ascii") if not host.isascii() else host.lower()
+        except UnicodeError:
+            return None
+        netloc = f"[{host}]" if ":" in host else host  # IPv6 literal (hostname drops the brackets)
+        if port not in (None, DEFAULT_PORTS[scheme]):
+            netloc = f"{netloc}:{port}"
+        if parts.username:
+            netloc = f"{parts.username}{':' + parts.password if parts.password else ''}@{netloc}"
+
+        rule = self.host_rules.get(host, {})
+        path = _remove_dot_segments(_normalize_escapes(PATH_PARAMS.sub("", parts.path)) or "/")
+        if rule.get("lowercase_path"):
+            path = path.lower()
+        path = path.rstrip("/")
+
+        return urlunsplit((scheme, netloc, path, self._query(host, parts.query, rule), ""))
+
+    def _query(self, host: str, query: str, rule: dict) -> str:
+        if not query:
+            return ""
+        keep = {p.lower() for p in rule["keep_params"]} if rule.get("keep_params") is not None else None
+        host_drop = self._host_drop.get(host)
+        ignored = self._ignored.get(host, ())
+
+        params = []
+        for param in query.split("&"):
+            if not param:
+                continue
+            name = unquote(param.split("=", 1)[0]).lower()
+            if keep is not None:
+                if name not in keep:
+                    continue
+            elif self._tracking(name) or (host_drop and host_drop(name)) or name in ignored:
+                continue
+            params.append((name, _normalize_escapes(param)))
+        params.sort(key=lambda item: item[0])  # stable: values of a repeated name keep their order
+        return "&".join(param for _, param in params)
+
+    def learn(self, url: str, canonical_href: Optional[str]) -> Optional[str]:
+        """Record the ``rel=canonical`` of a fetched page; return its canonical url.
+
+        Only a canonical on the same host and path (a query variant) is trusted: the
+        parameters of ``url`` it drops or keeps count towards ignoring them on that host
+        (see LEARN_MIN, LEARN_RATIO; never CONTENT_PARAMS). Other canonicals (often
+        template mistakes) are ignored, None is returned.
+        """
+        if not canonical_href:
+            return None
+        canonical = self.canonicalize(canonical_href, base=url)
+        page = self.canonicalize(url)
+        if canonical is None or page is None:
+            return None
+        page_parts, canonical_parts = urlsplit(page), urlsplit(canonical)
+        if (page_parts.netloc, page_parts.path) != (canonical_parts.netloc, canonical_parts.path):
+            return None
+
+        if self.learn_enabled:
+            names = lambda query: {unquote(p.split("=", 1)[0]).lower() for p in query.split("&") if p}
+            kept = names(urlsplit(canonical_href.strip()).query)  # before learned params are dropped
+            host = canonical_parts.hostname
+            with self._lock:
+                learned = self._learned.setdefault(host, {})
+                ignored = self._ignored.setdefault(host, set())
+                for name in names(urlsplit(url).query) - self.CONTENT_PARAMS:
+                    counts = learned.setdefault(name, [0, 0])
+                    counts[name in kept] += 1
+                    drops, keeps = counts
+                    if drops >= self.LEARN_MIN and drops >= self.LEARN_RATIO * (drops + keeps):
+                        if name not in ignored:
+                            ignored.add(name)
+                            logger.info(f"Query parameter {name!r} ignored on {host} (rel=canonical)")
+                    else:
+                        ignored.discard(name)
+        return canonical
+
+
+_canonicalizer = None
+_canonicalizer_lock = threading.Lock()
+
+
+def get_url_canonicalizer() -> UrlCanonicalizer:
+    global _canonicalizer
+    with _canonicalizer_lock:
+        if _canonicalizer is None:
+            _canonicalizer = UrlCanonicalizer()
+        return _canonicalizer
+
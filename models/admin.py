@@ -39,4 +39,7 @@ class PageAdmin(admin.ModelAdmin):
         ('Crawl Details', {
             'fields': ('http_status', 'last_crawled_at', 'error')
         }),
+        ('Duplicates', {
+            'fields': ('content_hash', 'simhash', 'duplicate_of')
+        }),
     )
\ No newline at end of file
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ModelsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'models'
+
+    def ready(self):
+        import integrations.blob_storage_client  # noqa: F401 - registers its system check
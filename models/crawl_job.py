@@ -17,6 +17,12 @@ class CrawlJob(models.Model):
         ("failed", "Failed"),
     ]
 
+    MODE_CHOICES = [
+        ("single", "Single session"),
+        ("distributed", "Distributed"),
+        ("partitioned", "Partitioned"),
+    ]
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
     # What page this job is crawling
@@ -31,10 +37,18 @@ class CrawlJob(models.Model):
     requested_at = models.DateTimeField(default=timezone.now)
     started_at = models.DateTimeField(null=True, blank=True)
     finished_at = models.DateTimeField(null=True, blank=True)
-    # Limits (only meaningful for root jobs)
+    # Limits (for shards of a partitioned job: their share of the pages)
     max_depth = models.IntegerField(null=True, blank=True)
     max_pages = models.IntegerField(null=True, blank=True)
 
+    # How the job is crawled (resume re-queues the same kind of task)
+    mode = models.CharField(max_length=20, choices=MODE_CHOICES, default="single")
+
+    # Shard of a partitioned root job (see run_partitioned_crawl_job)
+    parent = models.ForeignKey(
+        "self", on_delete=models.CASCADE, null=True, blank=True, related_name="shards"
+    )
+
     class Meta:
         indexes = [
             models.Index(fields=["status"]),
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.26 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0004_alter_page_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='page',
+            index=models.Index(fields=['url'], name='models_page_url_175af5_idx'),
+        ),
+    ]
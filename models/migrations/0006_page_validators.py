@@ -0,0 +1,28 @@
+# Generated by Django 4.2.26 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0005_page_url_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='etag',
+            field=models.CharField(blank=True, max_length=512, null=True),
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='last_modified',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.26 on 2026-10-18 12:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0006_page_validators'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='models.page'),
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.26 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0007_page_simhash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='segment_key',
+            field=models.CharField(blank=True, max_length=512, null=True),
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='segment_length',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='segment_offset',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='page',
+            index=models.Index(fields=['segment_key'], name='models_page_segment_d4b889_idx'),
+        ),
+    ]
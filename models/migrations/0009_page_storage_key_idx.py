@@ -0,0 +1,17 @@
+# Generated by Django 4.2.26 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0008_page_segment'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='page',
+            index=models.Index(fields=['storage_key_raw'], name='models_page_storage_0076fd_idx'),
+        ),
+    ]
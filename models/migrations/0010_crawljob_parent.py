@@ -0,0 +1,19 @@
+# Generated by Django 4.2.26 on 2026-10-18 16:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0009_page_storage_key_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crawljob',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='shards', to='models.crawljob'),
+        ),
+    ]
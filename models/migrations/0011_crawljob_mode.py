@@ -0,0 +1,18 @@
+# Generated by Django 4.2.26 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0010_crawljob_parent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crawljob',
+            name='mode',
+            field=models.CharField(choices=[('single', 'Single session'), ('distributed', 'Distributed'), ('partitioned', 'Partitioned')], default='single', max_length=20),
+        ),
+    ]
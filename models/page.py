@@ -14,11 +14,29 @@ class Page(models.Model):
     storage_key_raw = models.CharField(max_length=512, null=True, blank=True)
     search_index_key = models.CharField(max_length=512, null=True, blank=True)
 
+    # Content packed in a segment object (BLOB_SEGMENTS) instead of storage_key_raw
+    segment_key = models.CharField(max_length=512, null=True, blank=True)
+    segment_offset = models.BigIntegerField(null=True, blank=True)
+    segment_length = models.IntegerField(null=True, blank=True)
+
+    # Re-crawl validators: unchanged pages are not uploaded/indexed again
+    etag = models.CharField(max_length=512, null=True, blank=True)
+    last_modified = models.CharField(max_length=64, null=True, blank=True)
+    content_hash = models.CharField(max_length=64, null=True, blank=True)
+
+    # Near-duplicate detection: duplicates have no blob / index document of their own
+    simhash = models.BigIntegerField(null=True, blank=True)
+    duplicate_of = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, null=True, blank=True, related_name="duplicates"
+    )
+
     error = models.TextField(null=True, blank=True)
 
     def delete(self, *args, **kwargs):
-        # Delete from blob storage if exists
-        if self.storage_key_raw:
+        # Delete from blob storage if exists (and no other page shares it, content-addressed keys)
+        if self.storage_key_raw and not Page.objects.filter(
+            storage_key_raw=self.storage_key_raw
+        ).exclude(id=self.id).exists():
             try:
                 from integrations.blob_storage_client import BlobStorageClient
                 blob_client = BlobStorageClient()
@@ -28,6 +46,16 @@ class Page(models.Model):
                 logger = logging.getLogger(__name__)
                 logger.warning(f"Failed to delete blob for page {self.id}: {e}")
 
+        # Delete the segment once no other page is packed in it
+        if self.segment_key and not Page.objects.filter(segment_key=self.segment_key).exclude(id=self.id).exists():
+            try:
+                from integrations.blob_storage_client import BlobStorageClient
+                BlobStorageClient().delete(self.segment_key)
+            except Exception as e:
+                import logging
+                logger = logging.getLogger(__name__)
+                logger.warning(f"Failed to delete segment for page {self.id}: {e}")
+
         # Delete from search index if exists
         if self.search_index_key:
             try:
@@ -42,3 +70,8 @@ class Page(models.Model):
 
     class Meta:
         unique_together = ("job", "url")  # enforce visited-page tracking
+        indexes = [
+            models.Index(fields=["url"]),  # freshness lookups across jobs
+            models.Index(fields=["segment_key"]),  # segment still referenced?
+            models.Index(fields=["storage_key_raw"]),  # blob still referenced?
+        ]
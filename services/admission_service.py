@@ -0,0 +1,199 @@
+"""
+AdmissionController - SLA admission of new crawl jobs from live throughput and backlog
+
+Responsibilities:
+- Track crawl throughput (pages/s over CRAWL_ADMISSION_WINDOW_S) reported by the workers
+- Track the backlog: pages still to crawl of the admitted jobs (released when they finish)
+- Estimate when a new job would complete and accept, defer or reject it before it is created
+
+State lives in Redis, shared by the API processes and the workers. Throughput is read at
+most once per CRAWL_ADMISSION_CACHE_S; the backlog is checked and a job reserved in it by
+one Lua script, so concurrent API processes can't over-admit. Submits don't touch the
+database, and are deferred while Redis can't be read (fail closed).
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import NamedTuple
+
+import redis
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionDecision(NamedTuple):
+    action: str  # "accept", "defer" or "reject"
+    eta_s: float  # estimated time until the job would be completed, if started now
+    retry_after_s: int = 0  # for "defer": when the backlog will have drained enough
+
+
+class AdmissionController:
+    """
+    Throughput model of the whole crawl cluster: a job submitted now completes once the
+    backlog and its own ``max_pages`` are crawled at the current rate (at least
+    CRAWL_ADMISSION_BASELINE_PAGES_PER_S, the rate assumed while workers are idle).
+
+    A job is accepted (and added to the backlog) by :meth:`admit` if that fits in
+    CRAWL_ADMISSION_SLA_TARGET of the SLA, deferred (retry later) if it would fit on its
+    own but not behind the backlog, and rejected if it can't fit even alone. Workers report
+    crawled pages with :meth:`record_pages` (buffered, flushed every few seconds) and
+    :meth:`release` jobs once they finish.
+    """
+
+    KEY_PREFIX = "admission:"
+    BUCKET_S = 60  # pages counted per minute bucket
+    FLUSH_INTERVAL_S = 5
+    UNAVAILABLE_RETRY_S = 30  # Retry-After of jobs deferred because the state can't be read
+
+    # Add a job (ARGV: job id, pages, max backlog pages, deadline, now, force) to the backlog
+    # (KEYS: backlog hash, deadlines zset) if it fits; returns {admitted, backlog before it}
+    ADMIT_SCRIPT = """
+    local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[5])
+    for _, job_id in ipairs(expired) do
+        redis.call('HDEL', KEYS[1], job_id)
+        redis.call('ZREM', KEYS[2], job_id)
+    end
+    local backlog = 0
+    for _, remaining in ipairs(redis.call('HVALS', KEYS[1])) do
+        backlog = backlog + math.max(0, tonumber(remaining))
+    end
+    if ARGV[6] == '1' or backlog + tonumber(ARGV[2]) <= tonumber(ARGV[3]) then
+        redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+        redis.call('ZADD', KEYS[2], ARGV[4], ARGV[1])
+        return {1, backlog}
+    end
+    return {0, backlog}
+    """
+
+    # Decrement the backlog of jobs (ARGV: job id, pages, ...) still in it; released ones stay out
+    DECREMENT_SCRIPT = """
+    for i = 1, #ARGV, 2 do
+        if redis.call('HEXISTS', KEYS[1], ARGV[i]) == 1 then
+            redis.call('HINCRBY', KEYS[1], ARGV[i], -tonumber(ARGV[i + 1]))
+        end
+    end
+    """
+
+    def __init__(self, redis_client=None):
+        self.redis = redis_client or redis.Redis.from_url(settings.REDISCLOUD_URL)
+        self._decrement_script = self.redis.register_script(self.DECREMENT_SCRIPT)
+        self._admit_script = self.redis.register_script(self.ADMIT_SCRIPT)
+        self.window_s = getattr(settings, 'CRAWL_ADMISSION_WINDOW_S', 300)
+        self.baseline_pages_per_s = getattr(settings, 'CRAWL_ADMISSION_BASELINE_PAGES_PER_S', 2.0)
+        self.sla_target = getattr(settings, 'CRAWL_ADMISSION_SLA_TARGET', 0.8)
+        self.cache_s = getattr(settings, 'CRAWL_ADMISSION_CACHE_S', 5)
+
+        self._lock = threading.Lock()
+        self._throughput = None  # (read at, pages/s)
+        self._pending = {}  # job id -> pages crawled, not flushed yet
+        self._flushed_at = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # API side
+    # ------------------------------------------------------------------
+
+    def admit(self, job_id, max_pages: int, sla_duration_hours: float, deadline_ts: float,
+              force: bool = False) -> AdmissionDecision:
+        """Accept, defer or reject a job of ``max_pages`` pages; an accepted (or ``force``d)
+        job is added to the backlog, until it is released or its SLA deadline passes.
+
+        Deferred if the cluster state can't be read from Redis.
+        """
+        try:
+            pages_per_s = self._pages_per_s()
+            budget_s = sla_duration_hours * 3600 * self.sla_target
+            admitted, backlog = self._admit_script(
+                keys=[self._key("backlog"), self._key("deadlines")],
+                args=[str(job_id), max_pages, math.floor(budget_s * pages_per_s), deadline_ts, time.time(), int(force)],
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Admission state not available, deferring job {job_id}: {e}")
+            return AdmissionDecision("defer", math.inf, retry_after_s=self.UNAVAILABLE_RETRY_S)
+
+        eta_s = (int(backlog) + max_pages) / pages_per_s
+        if admitted:
+            return AdmissionDecision("accept", eta_s)
+        if max_pages / pages_per_s > budget_s:
+            return AdmissionDecision("reject", eta_s)
+        return AdmissionDecision("defer", eta_s, retry_after_s=max(1, math.ceil(eta_s - budget_s)))
+
+    def _pages_per_s(self) -> float:
+        """Cluster throughput (at least the baseline), read from Redis at most every ``cache_s``."""
+        with self._lock:
+            if self._throughput is not None and time.monotonic() - self._throughput[0] < self.cache_s:
+                return self._throughput[1]
+
+        # Full buckets of the window (the current one is still filling)
+        current = int(time.time() // self.BUCKET_S)
+        buckets = range(current - max(1, self.window_s // self.BUCKET_S), current)
+        counts = self.redis.mget([self._key(f"pages:{bucket}") for bucket in buckets])
+        pages_per_s = max(
+            sum(int(count or 0) for count in counts) / (len(buckets) * self.BUCKET_S), self.baseline_pages_per_s
+        )
+
+        with self._lock:
+            self._throughput = (time.monotonic(), pages_per_s)
+        return pages_per_s
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def record_pages(self, job_id, pages: int) -> None:
+        """Count ``pages`` crawled for a job (throughput + backlog); flushed every FLUSH_INTERVAL_S."""
+        with self._lock:
+            self._pending[str(job_id)] = self._pending.get(str(job_id), 0) + pages
+        if time.monotonic() - self._flushed_at >= self.FLUSH_INTERVAL_S:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed_at = time.monotonic()
+        if not pending:
+            return
+
+        bucket_key = self._key(f"pages:{int(time.time() // self.BUCKET_S)}")
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.incrby(bucket_key, sum(pending.values()))
+            pipe.expire(bucket_key, self.window_s + 2 * self.BUCKET_S)
+            self._decrement_script(
+                keys=[self._key("backlog")],
+                args=[value for job_id, pages in pending.items() for value in (job_id, pages)],
+                client=pipe,
+            )
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Admission throughput not reported: {e}")
+
+    def release(self, job_id) -> None:
+        """Remove a finished (completed / failed) job from the backlog."""
+        self.flush()
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hdel(self._key("backlog"), str(job_id))
+            pipe.zrem(self._key("deadlines"), str(job_id))
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Admission backlog of job {job_id} not released: {e}")
+
+    def _key(self, name: str) -> str:
+        return f"{self.KEY_PREFIX}{name}"
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Process-wide controller (its throughput cache and page counts are per process)."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController()
+        return _controller
@@ -3,8 +3,10 @@ CrawlService - Business logic for crawl job management
 
 Responsibilities:
 - Create crawl jobs (root URLs only)
-- Enforce 1-hour SLA logic
+- Enforce 1-hour SLA logic: admit only jobs that can complete within it
+  (AdmissionController: live throughput and backlog, no database query)
 - Push crawl tasks to Redis/Celery
+- Resume failed / cut-short jobs from their checkpoint
 - Aggregate job status from Postgres
 """
 
@@ -12,13 +14,27 @@ import uuid
 from datetime import timedelta
 from django.utils import timezone
 from models.crawl_job import CrawlJob
-from tasks.crawl import run_crawl_job
+from tasks.crawl import run_crawl_job, run_distributed_crawl_job, run_partitioned_crawl_job
+from services.admission_service import get_admission_controller
+from tasks.frontier import CrawlFrontier, RedisFrontier
 
 
 class SLAExceededError(Exception):
     pass
 
 
+class AdmissionDeferredError(SLAExceededError):
+    """The job would fit the SLA, but not behind the current backlog; retry after ``retry_after_s``."""
+
+    def __init__(self, message, retry_after_s):
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
+
+
+class JobNotResumableError(Exception):
+    pass
+
+
 class CrawlService:
     """
     Service for managing web crawl jobs with SLA enforcement.
@@ -31,7 +47,7 @@ class CrawlService:
     DEFAULT_MAX_PAGES = 100
 
     @classmethod
-    def submit_crawl(cls, url, max_depth=None, max_pages=None):
+    def submit_crawl(cls, url, max_depth=None, max_pages=None, distributed=False, partitioned=False):
         """
         Submit a crawl job for a root URL.
 
@@ -39,36 +55,117 @@ class CrawlService:
             url (str): The URL to crawl
             max_depth (int, optional): Maximum recursion depth
             max_pages (int, optional): Maximum pages to crawl
+            distributed (bool): Spread the job over many workers (frontier in Redis)
+                instead of a single browser session
+            partitioned (bool): Split the job into shards (child jobs) crawled in parallel,
+                each in a single browser session (ignored if distributed)
 
         Returns:
             dict: Job details including job_id, status, and SLA deadline
 
         Raises:
-            SLAExceededError: If SLA is currently exceeded
+            AdmissionDeferredError: If the job would exceed the SLA behind the queued jobs (retry later)
+            SLAExceededError: If the job can't complete within the SLA at the current throughput
         """
-        # Check SLA before creating new job
-        if not cls._is_within_sla():
-            raise SLAExceededError("SLA exceeded; new crawl jobs are not accepted at this time, try later")
-
         # Apply defaults
         if max_depth is None:
             max_depth = cls.DEFAULT_MAX_DEPTH
         if max_pages is None:
             max_pages = cls.DEFAULT_MAX_PAGES
 
-        # Create root job
+        # Check SLA before creating new job; an accepted job is reserved in the backlog
         job_id = uuid.uuid4()
-        job = CrawlJob.objects.create(
-            id=job_id,
-            url=url,
-            status="queued",
-            max_depth=max_depth,
-            max_pages=max_pages,
-            requested_at=timezone.now(),
-        )
+        requested_at = timezone.now()
+        deadline = requested_at + timedelta(hours=cls.SLA_DURATION_HOURS)
+        admission = get_admission_controller()
+        decision = admission.admit(job_id, max_pages, cls.SLA_DURATION_HOURS, deadline.timestamp())
+        if decision.action == "reject":
+            raise SLAExceededError(
+                f"A crawl of {max_pages} pages can't complete within the {cls.SLA_DURATION_HOURS}h SLA "
+                f"at the current throughput (~{round(decision.eta_s / 60)} min); lower max_pages"
+            )
+        if decision.action == "defer":
+            raise AdmissionDeferredError(
+                f"SLA would be exceeded behind the queued jobs; new crawl jobs are not accepted at this time, "
+                f"retry in {decision.retry_after_s}s",
+                retry_after_s=decision.retry_after_s,
+            )
+
+        # Create root job
+        try:
+            job = CrawlJob.objects.create(
+                id=job_id,
+                url=url,
+                status="queued",
+                max_depth=max_depth,
+                max_pages=max_pages,
+                mode="distributed" if distributed else "partitioned" if partitioned else "single",
+                requested_at=requested_at,
+            )
+        except Exception:
+            admission.release(job_id)
+            raise
 
         # Queue the crawl task
-        cls._queue_crawl_task(job.id, url)
+        cls._queue_crawl_task(job.id, url, distributed=distributed, partitioned=partitioned)
+
+        return {
+            "job_id": str(job.id),
+            "url": job.url,
+            "status": job.status,
+            "requested_at": job.requested_at.isoformat(),
+            "max_depth": job.max_depth,
+            "max_pages": job.max_pages,
+        }
+
+    @classmethod
+    def resume_crawl(cls, job_id, force=False):
+        """
+        Resume a crawl job from where it stopped (frontier checkpoint / Redis frontier),
+        instead of re-fetching everything with a new job.
+
+        Args:
+            job_id (UUID): The job to resume
+            force (bool): Also resume a job still marked queued/running (its worker died)
+
+        Returns:
+            dict: Job details like submit_crawl
+
+        Raises:
+            CrawlJob.DoesNotExist: If job not found
+            JobNotResumableError: If the job is still active or there is nothing to resume
+        """
+        job = CrawlJob.objects.get(id=job_id)
+        if job.status in ("queued", "running") and not force:
+            raise JobNotResumableError(f"Job {job.id} is {job.status}; use force if its worker died")
+
+        partitioned = job.mode == "partitioned"
+        distributed = job.mode == "distributed"
+        if partitioned:
+            # Before sharding the job has a checkpoint of its own, afterwards its shards have
+            checkpoints = [job.id] + list(job.shards.values_list("id", flat=True))
+            resumable = any(CrawlFrontier.has_checkpoint(checkpoint) for checkpoint in checkpoints)
+        elif distributed:
+            # The shared Redis frontier is the checkpoint; only probed for distributed jobs
+            if RedisFrontier(job.id, job.max_pages).is_drained():
+                raise JobNotResumableError(f"Job {job.id} has no urls left in its frontier to resume")
+            resumable = True
+        else:
+            resumable = CrawlFrontier.has_checkpoint(job.id)
+        if not resumable:
+            raise JobNotResumableError(f"Job {job.id} has no checkpoint to resume from")
+
+        job.status = "queued"
+        job.finished_at = None
+        job.save(update_fields=["status", "finished_at"])
+
+        # A resumed job gets a new SLA window
+        deadline = timezone.now() + timedelta(hours=cls.SLA_DURATION_HOURS)
+        get_admission_controller().admit(
+            job.id, job.max_pages, cls.SLA_DURATION_HOURS, deadline.timestamp(), force=True
+        )
+
+        cls._queue_crawl_task(job.id, job.url, distributed=distributed, partitioned=partitioned, resume=True)
 
         return {
             "job_id": str(job.id),
@@ -108,40 +205,32 @@ class CrawlService:
 
 
     @classmethod
-    def _is_within_sla(cls):
-        """
-        Check if there are any jobs in the system that exceeded SLA.
-
-        Returns:
-            bool: True if no jobs exceeded SLA, False otherwise
-        """
-        # Check if any jobs in the entire database are beyond SLA
-        cutoff_time = timezone.now() - timedelta(hours=cls.SLA_DURATION_HOURS)
-        jobs_beyond_sla = CrawlJob.objects.filter(
-            status__in=["queued", "running"],
-            requested_at__lt=cutoff_time
-        ).exists()
-
-        return not jobs_beyond_sla
-
-    @classmethod
-    def _queue_crawl_task(cls, job_id, url):
+    def _queue_crawl_task(cls, job_id, url, distributed=False, resume=False, partitioned=False):
         """
         Queue a crawl task to Celery.
 
         Args:
             job_id (UUID): Job ID
             url (str): URL to crawl
+            distributed (bool): Use run_distributed_crawl_job instead of run_crawl_job
+            resume (bool): Continue from the job's saved frontier
+            partitioned (bool): Use run_partitioned_crawl_job (shards in a Celery chord)
         """
         # Import here to avoid circular dependency
         try:
-
+            if distributed:
+                task = run_distributed_crawl_job
+            elif partitioned:
+                task = run_partitioned_crawl_job
+            else:
+                task = run_crawl_job
 
             # Queue task to Celery
-            run_crawl_job.delay(
+            task.delay(
                 job_id=str(job_id),
                 url=url,
                 sla_duration_hours=cls.SLA_DURATION_HOURS,
+                resume=resume,
             )
         except ImportError:
             # If Celery/tasks not yet implemented, log warning
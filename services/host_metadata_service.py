@@ -0,0 +1,213 @@
+"""
+HostMetadataService - Per-host crawl metadata: robots.txt rules and sitemap URLs
+
+Responsibilities:
+- Fetch robots.txt and sitemaps once per host and TTL (HOST_METADATA_TTL_S),
+  cached in Redis so all crawl workers share them; transient failures (timeouts,
+  5xx, 429) are only cached for HOST_METADATA_ERROR_TTL_S
+- Tell whether a url may be fetched (robots.txt Allow/Disallow) and the host's Crawl-delay
+- List sitemap urls (with their lastmod and priority) to seed the crawl frontier
+"""
+
+import gzip
+import json
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import Callable, Optional
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+from xml.etree import ElementTree
+
+import redis
+import requests
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class HostMetadataService:
+    """
+    robots.txt / sitemap lookups for the crawler.
+
+    Raw robots.txt and parsed sitemap entries are cached in Redis (shared across
+    workers, expire after ``ttl_s``); parsed robots rules are also kept in process,
+    until the Redis entry expires. Redis being unavailable only disables the shared cache.
+
+    A robots.txt that can't be fetched (network error, 5xx, 429) disallows the whole
+    host (RFC 9309) and, like sitemaps that couldn't be read, is retried after ``error_ttl_s``.
+    """
+
+    ROBOTS_USER_AGENT = "SearchEngineBot"  # product token matched against robots.txt User-agent lines
+    HTTP_USER_AGENT = "Mozilla/5.0 (compatible; SearchEngineBot/1.0)"
+    KEY_PREFIX = "hostmeta:"
+    SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+    MAX_SITEMAPS = 20  # sitemap files read per host (incl. sitemap indexes)
+    MAX_SITEMAP_BYTES = 50 * 1024 * 1024  # sitemaps.org limit (uncompressed)
+    TIMEOUT_S = 10
+    DISALLOW_ALL = "User-agent: *\nDisallow: /\n"
+
+    def __init__(self, redis_client=None, ttl_s: Optional[int] = None, error_ttl_s: Optional[int] = None):
+        self.redis = redis_client or redis.Redis.from_url(settings.REDISCLOUD_URL)
+        self.ttl_s = ttl_s or getattr(settings, 'HOST_METADATA_TTL_S', 24 * 3600)
+        self.error_ttl_s = error_ttl_s or getattr(settings, 'HOST_METADATA_ERROR_TTL_S', 300)
+        self._robots = {}  # origin -> (RobotFileParser, expires at, monotonic)
+
+    # ------------------------------------------------------------------
+    # robots.txt
+    # ------------------------------------------------------------------
+
+    def can_fetch(self, url: str) -> bool:
+        """True if robots.txt of the url's host allows fetching it."""
+        return self.robots(self._origin(url)).can_fetch(self.ROBOTS_USER_AGENT, url)
+
+    def crawl_delay(self, origin: str) -> Optional[float]:
+        """Crawl-delay of the host in seconds, or None (PolitenessScheduler crawl_delay_provider)."""
+        delay = self.robots(origin).crawl_delay(self.ROBOTS_USER_AGENT)
+        return float(delay) if delay else None
+
+    def robots(self, origin: str) -> RobotFileParser:
+        """Parsed robots.txt of ``origin`` (``scheme://host``); allows everything if there is none."""
+        parser, expires_at = self._robots.get(origin, (None, 0.0))
+        if parser is None or time.monotonic() >= expires_at:
+            text, ttl_s = self._cached(f"robots:{origin}", lambda: self._fetch_robots(origin))
+            parser = RobotFileParser(f"{origin}/robots.txt")
+            parser.parse(text.splitlines())
+            self._robots[origin] = (parser, time.monotonic() + ttl_s)
+        return parser
+
+    def _fetch_robots(self, origin: str) -> tuple[str, int]:
+        """(robots.txt, cache ttl); disallows all for a while if the host can't serve it now."""
+        try:
+            response = requests.get(
+                f"{origin}/robots.txt", timeout=self.TIMEOUT_S, headers={"User-Agent": self.HTTP_USER_AGENT}
+            )
+        except requests.RequestException as e:
+            logger.info(f"robots.txt of {origin} unreachable, disallowing all for {self.error_ttl_s}s: {e}")
+            return self.DISALLOW_ALL, self.error_ttl_s
+        if response.status_code >= 500 or response.status_code == 429:
+            logger.info(f"robots.txt of {origin} answered {response.status_code}, disallowing all for {self.error_ttl_s}s")
+            return self.DISALLOW_ALL, self.error_ttl_s
+        if response.status_code != 200:
+            return "", self.ttl_s  # no robots.txt: everything allowed
+        return response.text, self.ttl_s
+
+    # ------------------------------------------------------------------
+    # Sitemaps
+    # ------------------------------------------------------------------
+
+    def sitemap_urls(self, origin: str) -> list[tuple[str, Optional[datetime], Optional[float]]]:
+        """``(url, lastmod, priority)`` of the host's sitemaps (listed in robots.txt, else /sitemap.xml)."""
+        entries, _ = self._cached(f"sitemap:{origin}", lambda: self._read_sitemaps(origin))
+        return [
+            (entry[0], self._parse_lastmod(entry[1]), self._parse_priority(entry[2] if len(entry) > 2 else None))
+            for entry in json.loads(entries)
+        ]
+
+    def _read_sitemaps(self, origin: str) -> tuple[str, int]:
+        """(JSON entries, cache ttl); the ttl is short if a sitemap couldn't be fetched now."""
+        pending = list(self.robots(origin).site_maps() or [f"{origin}/sitemap.xml"])
+        read, entries, ttl_s = 0, [], self.ttl_s
+        while pending and read < self.MAX_SITEMAPS:
+            sitemap_url = pending.pop(0)
+            read += 1
+            try:
+                root = self._fetch_sitemap(sitemap_url)
+            except requests.RequestException as e:
+                logger.info(f"Sitemap {sitemap_url} unavailable, retried in {self.error_ttl_s}s: {e}")
+                ttl_s = self.error_ttl_s
+                continue
+            if root is None:
+                continue
+            if root.tag == f"{self.SITEMAP_NS}sitemapindex":
+                pending.extend(
+                    urljoin(sitemap_url, loc.text.strip())
+                    for loc in root.iter(f"{self.SITEMAP_NS}loc") if loc.text
+                )
+                continue
+            for node in root.iter(f"{self.SITEMAP_NS}url"):
+                loc = node.findtext(f"{self.SITEMAP_NS}loc")
+                if loc:
+                    lastmod = node.findtext(f"{self.SITEMAP_NS}lastmod")
+                    priority = node.findtext(f"{self.SITEMAP_NS}priority")
+                    entries.append((
+                        loc.strip(), lastmod.strip() if lastmod else None, priority.strip() if priority else None
+                    ))
+        return json.dumps(entries), ttl_s
+
+    def _fetch_sitemap(self, sitemap_url: str) -> Optional[ElementTree.Element]:
+        """Parsed sitemap, None if missing or invalid; raises RequestException on transient failures."""
+        response = requests.get(sitemap_url, timeout=self.TIMEOUT_S, headers={"User-Agent": self.HTTP_USER_AGENT})
+        if response.status_code >= 500 or response.status_code == 429:
+            response.raise_for_status()
+        if response.status_code != 200:
+            return None
+
+        content = response.content
+        if content[:2] == b"\x1f\x8b":
+            try:
+                content = gzip.decompress(content)
+            except OSError as e:
+                logger.info(f"Sitemap {sitemap_url} is not valid gzip: {e}")
+                return None
+        if len(content) > self.MAX_SITEMAP_BYTES:
+            logger.info(f"Sitemap {sitemap_url} is larger than {self.MAX_SITEMAP_BYTES} bytes, skipped")
+            return None
+
+        try:
+            return ElementTree.fromstring(content)
+        except ElementTree.ParseError as e:
+            logger.info(f"Sitemap {sitemap_url} is not valid XML: {e}")
+            return None
+
+    @staticmethod
+    def _parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+        if not value:
+            return None
+        try:
+            lastmod = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        return lastmod if lastmod.tzinfo else lastmod.replace(tzinfo=dt_timezone.utc)
+
+    @staticmethod
+    def _parse_priority(value: Optional[str]) -> Optional[float]:
+        """Sitemap <priority> (0.0-1.0), or None if missing or invalid."""
+        try:
+            priority = float(value)
+        except (TypeError, ValueError):
+            return None
+        return priority if 0.0 <= priority <= 1.0 else None
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _cached(self, name: str, load: Callable[[], tuple[str, int]]) -> tuple[str, int]:
+        """(value, seconds it stays valid) of ``name`` from the shared Redis cache;
+        ``load`` returns the value and its ttl on a miss.
+        """
+        key = self.KEY_PREFIX + name
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.ttl(key)
+            value, ttl_s = pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Host metadata cache unavailable: {e}")
+            return load()
+        if value is not None:
+            return value.decode("utf-8"), ttl_s if ttl_s > 0 else self.ttl_s
+
+        value, ttl_s = load()
+        try:
+            self.redis.set(key, value, ex=ttl_s)
+        except redis.RedisError as e:
+            logger.warning(f"Host metadata cache unavailable: {e}")
+        return value, ttl_s
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
@@ -22,11 +22,20 @@ class PageService():
         except Page.DoesNotExist:
             return None
 
-        # Retrieve blob content if storage key exists
+        # Retrieve blob content if stored (near-duplicates share the original's)
+        content_page = page
+        if not (page.storage_key_raw or page.segment_key) and page.duplicate_of_id:
+            content_page = Page.objects.filter(id=page.duplicate_of_id).first() or page
+
         blob_content = None
-        if page.storage_key_raw:
+        if content_page.segment_key:
+            blob_storage_client = BlobStorageClient()
+            blob_content = blob_storage_client.retrieve_record(
+                content_page.segment_key, content_page.segment_offset, content_page.segment_length
+            )
+        elif content_page.storage_key_raw:
             blob_storage_client = BlobStorageClient()
-            blob_content = blob_storage_client.retrieve(page.storage_key_raw)
+            blob_content = blob_storage_client.retrieve(content_page.storage_key_raw)
 
         # Construct the response dictionary
         page_details = {
@@ -37,8 +46,9 @@ class PageService():
             "metadata": getattr(page, 'metadata', None),
             "crawled_at": page.last_crawled_at.isoformat() if page.last_crawled_at else None,
             "http_status": page.http_status,
-            "storage_key": page.storage_key_raw,
+            "storage_key": page.storage_key_raw or page.segment_key,
             "search_index_key": page.search_index_key,
+            "duplicate_of": str(page.duplicate_of_id) if page.duplicate_of_id else None,
             "error": page.error,
         }
 
@@ -1,124 +1,772 @@
 # crawler/tasks.py
-from collections import deque
-from datetime import timedelta
+from concurrent.futures import FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+import hashlib
+import logging
 import os
-from celery import shared_task
+import time
+from urllib.parse import urlparse
+from celery import chord, shared_task
+from celery.signals import task_postrun, worker_process_init, worker_process_shutdown
+from django.conf import settings
 from django.utils import timezone
 
 from models.crawl_job import CrawlJob
 from models.page import Page
-from integrations.http_client import HeadlessBrowser
-from integrations.blob_storage_client import BlobStorageClient
-from integrations.search_index_client import SearchIndexClient
+from integrations.browser_pool import get_browser_pool
+from integrations.http_client import TieredFetcher
+from integrations.metrics import PAGES_TOTAL, delete_exported_metrics, export_metrics, host_label
+from integrations.politeness import PolitenessScheduler
+from integrations.blob_storage_client import BlobUploader, SegmentRef, SegmentWriter
+from integrations.search_index_client import BulkIndexer, SearchIndexClient
+from integrations.url_canonicalizer import get_url_canonicalizer
+from tasks.fingerprint import SimHashIndex, simhash, to_signed
+from tasks.frontier import CrawlFrontier, RedisFrontier, partition_entries
+from tasks.page_writer import PageWriter
+from services.admission_service import get_admission_controller
+from services.host_metadata_service import HostMetadataService
+
+
+logger = logging.getLogger(__name__)
+
+PAGE_EXPIRE_HRS = int(os.environ.get("PAGE_EXPIRE_HRS", 24))  # How long to keep page data before re-crawling
+
+
+@worker_process_init.connect
+def start_browser_pool(**kwargs):
+    """Launch the worker process' shared browser before its first crawl task (in the background)."""
+    get_browser_pool().start()
+
+
+@worker_process_shutdown.connect
+def close_browser_pool(**kwargs):
+    get_browser_pool().close()
+
+
+@worker_process_shutdown.connect
+def delete_metrics(**kwargs):
+    """Exported metrics of a worker process go away with it (no stale Pushgateway groups)."""
+    delete_exported_metrics()
+
+
+@task_postrun.connect
+def push_metrics(**kwargs):
+    """Worker processes aren't scraped; export their metrics after every task."""
+    export_metrics(force=True)
 
 
 @shared_task(bind=True)
-def run_crawl_job(self, job_id, url, sla_duration_hours: int):
+def run_crawl_job(self, job_id, url, sla_duration_hours: int, resume: bool = False):
     """
     Single task that crawls within single session (to prevent IP rotation, RAM/CPU spikes, anti-bot checks etc).:
       - root page
       - all children pages
     Optimized for predictable RAM/CPU usage, designed for multiple workers scalability.
 
-    Uses the Page table for visited tracking.
+    Uses an in-memory visited set per job (links are de-duplicated when queued) and
+    the Page table for freshness across jobs (one query per batch of discovered links).
 
-    If need even more scalability, it can be split into multiple tasks (per page), but
-    that adds complexity around state management, task chaining, and makes IP rotation possible
-    (which isn't described in project requirements).
+    Up to CRAWL_CONCURRENCY pages are fetched at once, all served by the same browser
+    (so still a single session/IP); the frontier is drained with bounded in-flight fetches.
+    Static pages are fetched with a plain HTTP client, the browser is used only for
+    pages that need JS rendering (CRAWL_HTTP_FIRST).
 
-    """
+    Expired pages are re-crawled conditionally (ETag / Last-Modified, then content hash);
+    unchanged pages keep their blob and index document and only get last_crawled_at bumped.
+    Near-duplicates of pages already crawled (SimHash of the text) are saved without a
+    blob and index document of their own, pointing to the original (duplicate_of).
+
+    The frontier is also seeded from the host's sitemaps (CRAWL_USE_SITEMAPS), and urls
+    disallowed by robots.txt are dropped before they are queued (CRAWL_RESPECT_ROBOTS).
+
+    If need even more scalability, use run_partitioned_crawl_job (shards of the site
+    crawled in parallel, one session each) or run_distributed_crawl_job (per-page work
+    spread over many workers via Redis), at the cost of IP rotation between pages.
 
-    PAGE_EXPIRE_HRS = int(os.environ.get("PAGE_EXPIRE_HRS", 24))  # How long to keep page data before re-crawling
+    The frontier is checkpointed to Redis while crawling; a job that failed or was cut
+    short by the SLA can be resumed from its checkpoint (``resume``, see CrawlService.resume_crawl),
+    with a new SLA window starting when it resumes.
+
+    """
 
     job = CrawlJob.objects.get(pk=job_id)
     job.mark_running()
 
     # Calculate SLA deadline
-    sla_deadline = job.requested_at + timedelta(hours=sla_duration_hours)
+    sla_deadline = _sla_deadline(job, sla_duration_hours, resume)
+
+    # (url, depth) queue + urls seen in this job, checkpointed to Redis
+    frontier = CrawlFrontier(job.max_pages, job_id=job.id)
+    search_index_client = SearchIndexClient()
+    host_metadata = HostMetadataService()  # robots.txt + sitemaps, cached in Redis
+
+    try:
+        if not (resume and _restore(job, frontier, search_index_client)):
+            _enqueue_links(frontier, [job.url], 0, host_metadata)
+            _enqueue_sitemap_urls(frontier, job, host_metadata)
+        _crawl(job, frontier, sla_deadline, search_index_client, host_metadata)
+
+        # Keep the checkpoint only if the SLA cut the crawl short (resumable)
+        if frontier.is_drained():
+            frontier.delete_checkpoint()
+        else:
+            frontier.checkpoint()
+
+        # Completed
+        search_index_client.refresh_index()
+        job.mark_completed()
+        get_admission_controller().release(job.id)
+
+    except Exception:
+        try:
+            frontier.checkpoint()
+        except Exception as e:
+            logger.warning(f"Final checkpoint of crawl job {job.id} failed: {e}")
+        job.mark_failed()
+        get_admission_controller().release(job.id)
+        raise
+
+
+@shared_task(bind=True)
+def run_distributed_crawl_job(self, job_id, url, sla_duration_hours: int, resume: bool = False):
+    """
+    Distributed mode of run_crawl_job for large jobs: the frontier, visited set and
+    page budget live in Redis and CRAWL_DISTRIBUTED_WORKERS crawl_frontier_worker tasks
+    lease batches of URLs from it, so one job is spread over many Celery workers.
+
+    Pages are fetched from different workers (different sessions/IPs), so sites that
+    need sticky session behavior should use the default run_crawl_job.
+    The last worker to finish refreshes the index and marks the job completed.
+    Frontier state is kept in Redis if the job failed or was cut short, so it can be resumed.
+    """
+    job = CrawlJob.objects.get(pk=job_id)
+    job.mark_running()
+
+    try:
+        frontier = RedisFrontier(job.id, job.max_pages)
+        if resume:
+            frontier.reopen()
+        else:
+            host_metadata = HostMetadataService()
+            _enqueue_links(frontier, [job.url], 0, host_metadata)
+            _enqueue_sitemap_urls(frontier, job, host_metadata)
+    except Exception:
+        job.mark_failed()
+        get_admission_controller().release(job.id)
+        raise
+
+    for _ in range(settings.CRAWL_DISTRIBUTED_WORKERS):
+        crawl_frontier_worker.delay(job_id=str(job.id), sla_duration_hours=sla_duration_hours, resume=resume)
+
+
+@shared_task(bind=True)
+def crawl_frontier_worker(self, job_id, sla_duration_hours: int, resume: bool = False):
+    """One of the workers of a distributed crawl job (see run_distributed_crawl_job)."""
+    job = CrawlJob.objects.get(pk=job_id)
+    sla_deadline = _sla_deadline(job, sla_duration_hours, resume)
 
-    # Track pages discovered in this crawl session
-    pages_discovered = 0
+    frontier = RedisFrontier(job.id, job.max_pages)
+    if not frontier.join():
+        return  # job already finalized by the other workers
 
-    frontier = deque([(job.url, 0)])  # (url, depth)
-    blob_storage_client = BlobStorageClient()
     search_index_client = SearchIndexClient()
+    try:
+        _crawl(job, frontier, sla_deadline, search_index_client, HostMetadataService())
+    except Exception:
+        if frontier.leave():
+            job.mark_failed()  # frontier kept for resume (keys expire)
+            get_admission_controller().release(job.id)
+        raise
+
+    if frontier.leave():
+        # Last worker out
+        search_index_client.refresh_index()
+        job.mark_completed()
+        get_admission_controller().release(job.id)
+        if frontier.is_drained():
+            frontier.delete()
+
+
+@shared_task(bind=True)
+def run_partitioned_crawl_job(self, job_id, url, sla_duration_hours: int, resume: bool = False):
+    """
+    Partitioned mode of run_crawl_job for large jobs (thousands of pages, too many for one
+    session within the SLA): the root page and the first level of links are crawled here,
+    then the urls discovered below them (and the sitemap urls) are split by path prefix into
+    up to CRAWL_PARTITION_SHARDS shards. Each shard is a child CrawlJob crawled by a
+    crawl_shard task like run_crawl_job (single session), with a share of the remaining
+    page budget proportional to its entries; all of them run in parallel as a Celery chord.
+
+    Shards claim urls in a visited set shared through Redis, so they never crawl the same
+    url. The chord callback (finish_partitioned_crawl_job) merges the shards' counts,
+    refreshes the index once and marks this job completed.
+
+    On ``resume``, a job already split re-runs the shards that have a checkpoint left;
+    otherwise the first levels continue from the job's checkpoint (with the held entries).
+    """
+    job = CrawlJob.objects.get(pk=job_id)
+    job.mark_running()
+    sla_deadline = _sla_deadline(job, sla_duration_hours, resume)
+
+    if resume and job.shards.exists():
+        shards = [shard for shard in job.shards.all() if CrawlFrontier.has_checkpoint(shard.id)]
+        logger.info(f"Crawl job {job.id}: resuming {len(shards)} shards")
+        _dispatch_shards(job, shards, sla_duration_hours, seed_pages=0, resume=True)
+        return
+
+    # Root + first level only; deeper entries are held back for the shards
+    frontier = CrawlFrontier(
+        job.max_pages, job_id=job.id, hold_depth=1, shared_seen_key=CrawlFrontier.shared_seen_key(job.id)
+    )
+    search_index_client = SearchIndexClient()
+    host_metadata = HostMetadataService()
+
+    try:
+        if not (resume and _restore(job, frontier, search_index_client)):
+            _enqueue_links(frontier, [job.url], 0, host_metadata)
+        _crawl(job, frontier, sla_deadline, search_index_client, host_metadata)
+
+        # Sitemap urls (and entries left if the SLA cut this crawl short) go to the shards
+        # too, not to this (single session) crawl
+        frontier.hold_queued()
+        frontier.hold_depth = 0
+        _enqueue_sitemap_urls(frontier, job, host_metadata)
+        shards = _create_shards(job, frontier, settings.CRAWL_PARTITION_SHARDS)
+        frontier.delete_checkpoint()
+
+    except Exception:
+        try:
+            frontier.checkpoint()
+        except Exception as e:
+            logger.warning(f"Final checkpoint of crawl job {job.id} failed: {e}")
+        job.mark_failed()
+        get_admission_controller().release(job.id)
+        raise
+
+    logger.info(f"Crawl job {job.id}: {len(frontier.held)} urls split into {len(shards)} shards")
+    _dispatch_shards(job, shards, sla_duration_hours, seed_pages=frontier.pages_discovered)
+
+
+def _dispatch_shards(job, shards, sla_duration_hours, seed_pages, resume=False):
+    """Run ``shards`` of a partitioned job in parallel (Celery chord), then finish the job."""
+    if not shards:
+        # Nothing left to crawl (small site, or budget / SLA spent by the first levels)
+        finish_partitioned_crawl_job([], job_id=str(job.id), seed_pages=seed_pages)
+        return
+
+    callback = finish_partitioned_crawl_job.s(job_id=str(job.id), seed_pages=seed_pages)
+    callback.link_error(fail_partitioned_crawl_job.s(job_id=str(job.id), seed_pages=seed_pages))
+    chord(
+        crawl_shard.s(job_id=str(shard.id), sla_duration_hours=sla_duration_hours, resume=resume)
+        for shard in shards
+    )(callback)
+
+
+@shared_task(bind=True, ignore_result=False)
+def crawl_shard(self, job_id, sla_duration_hours: int, resume: bool = False):
+    """One shard of a partitioned crawl job (see run_partitioned_crawl_job); returns its counts.
+
+    Failures are returned rather than raised, so the chord callback still runs for the
+    other shards; a failed shard keeps its checkpoint and can be resumed on its own.
+    """
+    job = CrawlJob.objects.get(pk=job_id)
+    job.mark_running()
+    sla_deadline = _sla_deadline(job, sla_duration_hours, resume)
 
+    frontier = CrawlFrontier(job.max_pages, job_id=job.id, shared_seen_key=CrawlFrontier.shared_seen_key(job.parent_id))
     try:
-        # Reuse a single headless browser across all page fetches for efficiency.
-        with HeadlessBrowser() as browser:
-            while frontier:
+        search_index_client = SearchIndexClient()
+        _restore(job, frontier, search_index_client)
+        _crawl(job, frontier, sla_deadline, search_index_client, HostMetadataService())
+        drained = frontier.is_drained()
+        if drained:
+            frontier.delete_checkpoint()
+        else:
+            frontier.checkpoint()
+    except Exception as e:
+        logger.exception(f"Shard {job.id} of crawl job {job.parent_id} failed")
+        try:
+            frontier.checkpoint()
+        except Exception as checkpoint_error:
+            logger.warning(f"Final checkpoint of crawl job {job.id} failed: {checkpoint_error}")
+        job.mark_failed()
+        return {"job_id": str(job.id), "status": "failed", "pages": frontier.pages_discovered, "error": str(e)}
+
+    job.mark_completed()
+    return {"job_id": str(job.id), "status": "completed", "pages": frontier.pages_discovered, "drained": drained}
+
+
+@shared_task(bind=True)
+def finish_partitioned_crawl_job(self, results, job_id, seed_pages: int = 0):
+    """Chord callback of a partitioned crawl job: merge the shards' counts, refresh the
+    index once and mark the job completed (failed only if every shard failed)."""
+    job = CrawlJob.objects.get(pk=job_id)
+    failed = [result["job_id"] for result in results if result["status"] != "completed"]
+    pages = seed_pages + sum(result["pages"] for result in results)
+    logger.info(
+        f"Crawl job {job.id}: {pages} pages ({seed_pages} before sharding), "
+        f"{len(results)} shards, {len(failed)} failed {failed}"
+    )
+
+    try:
+        SearchIndexClient().refresh_index()
+    finally:
+        CrawlFrontier.delete_shared_seen(job.id)
+
+    if results and len(failed) == len(results):
+        job.mark_failed()
+    else:
+        job.mark_completed()
+    get_admission_controller().release(job.id)
+    return {"pages": pages, "shards": len(results), "failed_shards": failed}
+
+
+@shared_task
+def fail_partitioned_crawl_job(request, exc, traceback, job_id, seed_pages: int = 0):
+    """Chord error callback of a partitioned crawl job: a shard task died without returning
+    (e.g. its worker process was killed), so finish_partitioned_crawl_job didn't run.
+
+    Finishes the job from the shards' rows instead; shards left running are marked failed
+    (they keep their checkpoint and can be resumed with the job).
+    """
+    logger.warning(f"Crawl job {job_id}: a shard task died ({exc!r}), finishing from the shards' rows")
+    job = CrawlJob.objects.get(pk=job_id)
+    results = []
+    for shard in job.shards.all():
+        if shard.status not in ("completed", "failed"):
+            shard.mark_failed()
+        results.append({"job_id": str(shard.id), "status": shard.status, "pages": shard.pages.count()})
+    return finish_partitioned_crawl_job(results, job_id=job_id, seed_pages=seed_pages)
+
+
+def _create_shards(job, frontier, shards):
+    """Child CrawlJobs of a partitioned job, one per shard of the frontier's held entries
+    (saved as their checkpoint), sharing what is left of the job's page budget in
+    proportion to their entries (at least one page each)."""
+    budget = job.max_pages - frontier.pages_discovered
+    if budget <= 0 or not frontier.held:
+        return []
+
+    partitions = partition_entries(frontier.held.values(), min(shards, budget))
+    shard_jobs = []
+    for items, max_pages in zip(partitions, _apportion(budget, [len(items) for items in partitions])):
+        shard = CrawlJob.objects.create(
+            url=max(items, key=lambda item: item[0])[2][0],  # best scored seed, for display
+            parent=job,
+            status="queued",
+            max_depth=job.max_depth,
+            max_pages=max_pages,
+            requested_at=job.requested_at,  # same SLA window as the job
+        )
+        CrawlFrontier(max_pages, job_id=shard.id, redis_client=frontier.redis).seed(items)
+        shard_jobs.append(shard)
+    return shard_jobs
+
+
+def _apportion(budget: int, weights: list[int]) -> list[int]:
+    """Split ``budget`` (>= len(weights)) by ``weights``: one each, the rest by largest remainder."""
+    spare, total = budget - len(weights), sum(weights)
+    quotas = [spare * weight / total for weight in weights]
+    shares = [1 + int(quota) for quota in quotas]
+    by_remainder = sorted(range(len(weights)), key=lambda i: quotas[i] - int(quotas[i]), reverse=True)
+    for i in by_remainder[:budget - sum(shares)]:
+        shares[i] += 1
+    return shares
 
-                # Check SLA - break if we've exceeded the time limit (return what's been done so far)
+
+def _sla_deadline(job, sla_duration_hours, resume=False):
+    """SLA deadline of a job; a resumed job gets a new window from when it was (re)started."""
+    started = job.started_at if resume and job.started_at else job.requested_at
+    return started + timedelta(hours=sla_duration_hours)
+
+
+def _restore(job, frontier, search_index_client, chunk_size=500):
+    """Load the job's last checkpoint; False if there is none.
+
+    Pages crawled after the checkpoint are queued in it again: rows the crashed run
+    already wrote for them are purged (kept: the stale rows the entries refer to).
+    """
+    if not frontier.restore():
+        return False
+    entries = frontier.queued_entries()
+    referenced = {page_id for _, _, stale_page_ids, _ in entries for page_id in stale_page_ids}
+    urls = [url for url, _, _, _ in entries]
+    page_ids = []
+    for start in range(0, len(urls), chunk_size):
+        page_ids += [
+            page_id for page_id in Page.objects.filter(job=job, url__in=urls[start:start + chunk_size])
+            .values_list("id", flat=True) if page_id not in referenced
+        ]
+    if page_ids:
+        logger.info(f"Crawl job {job.id}: {len(page_ids)} pages written after the checkpoint will be re-crawled")
+        page_writer = PageWriter(search_index_client=search_index_client)
+        page_writer.purge(page_ids)
+        page_writer.flush()
+    return True
+
+
+def _crawl(job, frontier, sla_deadline, search_index_client, host_metadata):
+    """Crawl loop: drain the frontier with bounded in-flight fetches until it is drained,
+    the page budget is spent or the SLA deadline is reached (return what's been done so far).
+    """
+    concurrency = settings.CRAWL_CONCURRENCY
+
+    in_flight = {}  # fetch future -> frontier entry
+    uploads = {}  # upload future -> page
+    indexer = BulkIndexer(search_index_client)
+    # Page rows are written behind, in bulk
+    page_writer = PageWriter(search_index_client=search_index_client)
+    fingerprints = SimHashIndex()  # pages stored by this worker, for near-duplicate detection
+    flush_interval_s = min(indexer.flush_interval_s, page_writer.flush_interval_s)
+    admission = get_admission_controller()
+    # Crawled urls stay active in the frontier (checkpointed as queued) until their rows,
+    # blobs and index documents are written; they are settled every CRAWL_CHECKPOINT_INTERVAL_S
+    # (without sealing the open segment: its urls wait until it is uploaded)
+    unsettled = []
+    settle_interval_s = getattr(settings, 'CRAWL_CHECKPOINT_INTERVAL_S', 30)
+    settled_at = time.monotonic()
+
+    # Raw HTML is uploaded to S3 in the background while crawling continues,
+    # packed into large segment objects (BLOB_SEGMENTS) or one object per page.
+    if settings.BLOB_SEGMENTS:
+        uploader = SegmentWriter(prefix=f"segments/{job.id}/")
+    else:
+        uploader = BlobUploader()
+
+    # Reuse a single HTTP session + headless browser across all page fetches for efficiency;
+    # the browser is the worker process' warm one (fresh contexts) when the pool is enabled.
+    # Crawl-delay comes from the shared robots.txt cache, per-host rate and backoff from Redis.
+    scheduler = PolitenessScheduler(
+        user_agent=HostMetadataService.ROBOTS_USER_AGENT, crawl_delay_provider=host_metadata.crawl_delay,
+        redis_client=host_metadata.redis,
+    )
+    # Entered first, exited last: after a failure, saves what the closed uploader stored
+    browser_pool = get_browser_pool()
+    with _salvage_on_error(page_writer, uploads), uploader, browser_pool.lease() as browser, \
+            TieredFetcher(
+                concurrency=concurrency, http_first=settings.CRAWL_HTTP_FIRST, scheduler=scheduler, browser=browser
+            ) as fetcher:
+        while True:
+            frontier.heartbeat()
+            browser_pool.maintain(browser)  # recycles the pooled browser of a long job (memory)
+            export_metrics()  # rate limited (METRICS_EXPORT_INTERVAL_S); long jobs report while running
+
+            # Fill free fetch slots from the frontier
+            while len(in_flight) < concurrency:
+
+                # Check SLA - stop scheduling if we've exceeded the time limit (return what's been done so far)
                 if timezone.now() >= sla_deadline:
                     break
 
-                # limit by pages
-                if pages_discovered >= job.max_pages:
+                # Next url; None if frontier is empty or limit by pages reached
+                entry = frontier.pop()
+                if entry is None:
                     break
-                pages_discovered += 1
+                url, depth, _, previous = entry
 
-                url, depth = frontier.popleft()
+                # Conditional request only for leaf pages: a 304 carries no links to follow
+                validators = previous if depth >= job.max_depth else None
 
-                # Skip if page exists and was crawled within PAGE_EXPIRE_HRS; otherwise allow re-crawl
-                expire_cutoff = timezone.now() - timedelta(hours=PAGE_EXPIRE_HRS)
-                check_page = Page.objects.filter(url=url).first()
-                if check_page:
-                    if check_page.last_crawled_at and check_page.last_crawled_at >= expire_cutoff:
-                        continue  # Fresh enough; skip
-                    else:
-                        check_page.delete()  # Stale; remove to allow fresh crawl
-
-                # Create a Page entry
-                page = Page.objects.create(job=job, url=url)
+                # Fetch the page via reusable fetcher (in background)
+                in_flight[fetcher.submit(url, validators=validators)] = entry
 
+            if not in_flight:
+                if unsettled:
+                    # Give back finished leases before checking whether the frontier is drained; with
+                    # nothing queued, the open segment may be all that keeps leases held, so seal it
+                    _settle(frontier, unsettled, page_writer, uploader, uploads, indexer, seal=len(frontier) == 0)
+                    settled_at = time.monotonic()
+                # Nothing running and nothing more may be scheduled (limits hit or frontier drained)
+                if timezone.now() >= sla_deadline or frontier.is_drained():
+                    break
+                # Other workers may still queue links (distributed mode)
+                time.sleep(1)
+                continue
 
-                try:
-                    # Fetch the page via reusable browser
-                    html, plain_text, title, child_links, status_code = browser.fetch_html(url)
+            done, _ = wait(in_flight, timeout=flush_interval_s, return_when=FIRST_COMPLETED)
+            for future in done:
+                url, depth, stale_page_ids, previous = in_flight.pop(future)
+                result = _store_page(future, job, url, stale_page_ids, previous, page_writer, fingerprints)
+                if result is not None and result.canonical_url and result.canonical_url != url:
+                    frontier.mark_seen([result.canonical_url])  # the page's rel=canonical is this page
 
-                    # Save raw html in BLOB storage
-                    raw_key = blob_storage_client.store(page_id=page.id, content=html)
+                # Queue links (children)
+                if result is not None and result.child_links and depth < job.max_depth:
+                    # child_links = [] # DEBUG
 
-                    # Send to Index storage
-                    doc_id = search_index_client.index_page(
-                        url=url,
-                        title=title,
-                        content=plain_text,
-                        page_id=page.id,
-                        last_crawled_at=timezone.now(),
+                    _enqueue_links(
+                        frontier, result.child_links, depth + 1, host_metadata, anchor_texts=result.anchor_texts
                     )
 
-                    # Update page
-                    page.last_crawled_at = timezone.now()
-                    page.http_status = status_code
-                    page.storage_key_raw = raw_key
-                    page.search_index_key = doc_id
-                    page.save(update_fields=[
-                        "last_crawled_at",
-                        "http_status",
-                        "storage_key_raw",
-                        "search_index_key",
-                    ])
+                unsettled.append(url)
+            # Throughput and backlog for admission (shards count towards their root job)
+            admission.record_pages(job.parent_id or job.id, len(done))
 
+            _write_pages(page_writer.flush_if_due(), page_writer, uploader, uploads, indexer)
+            indexer.flush_if_due()
+            _mark_index_errors(indexer.pop_failed(), page_writer)
+            _save_uploads(uploads, page_writer)
+            if time.monotonic() - settled_at >= settle_interval_s:
+                _settle(frontier, unsettled, page_writer, uploader, uploads, indexer)
+                settled_at = time.monotonic()
 
-                    # Queue links (children)
-                    if depth < job.max_depth:
-                        # child_links = [] # DEBUG
+        logger.info(f"Crawl job {job.id} fetch tiers: {dict(fetcher.stats)}")
+        logger.info(f"Crawl job {job.id} browser readiness waits: {dict(fetcher.browser.readiness.stats)}")
 
-                        for link in child_links:
-                            frontier.append((link, depth + 1))
+        # Write the remaining pages and wait for their uploads (seals the last segment)
+        _write_pages(page_writer.flush(), page_writer, uploader, uploads, indexer)
+        uploader.close()
+        wait(uploads)
+        _save_uploads(uploads, page_writer)
 
-                except Exception as e:
-                    # Mark page failed
-                    page.error = str(e)
-                    page.save(update_fields=["error"])
+    indexer.flush()
+    _mark_index_errors(indexer.pop_failed(), page_writer)
+    page_writer.flush()
+    for url in unsettled:
+        frontier.done(url)
+    admission.flush()
 
-                    continue
 
-        # Completed
-        search_index_client.refresh_index()
-        job.mark_completed()
+def _enqueue_links(frontier, links, depth, host_metadata=None, lastmods=None, anchor_texts=None,
+                   priorities=None, chunk_size=500):
+    """Queue links not seen before in this job, skipping pages crawled within PAGE_EXPIRE_HRS
+    (or not modified since crawled, by the sitemap ``lastmods``) and urls disallowed by robots.txt.
+
+    Freshness is checked with one query per batch of links; ids of stale Page rows
+    are queued with the link so they can be removed when it is re-crawled, together
+    with the validators of the latest one (to detect unchanged pages).
+    ``anchor_texts`` and sitemap ``priorities`` (by link) feed the frontier's url score.
+    Links are canonicalized first (the dicts are keyed by canonical url), so variants of
+    a url are queued, looked up and stored as one.
+    """
+    canonicalizer = get_url_canonicalizer()
+    links = list(dict.fromkeys(link for link in map(canonicalizer.canonicalize, links) if link is not None))
+    new_links = frontier.mark_seen(links)
+    if host_metadata is not None and settings.CRAWL_RESPECT_ROBOTS:
+        new_links = [link for link in new_links if host_metadata.can_fetch(link)]
+    lastmods = lastmods or {}
+    anchor_texts = anchor_texts or {}
+    priorities = priorities or {}
+    expire_cutoff = timezone.now() - timedelta(hours=PAGE_EXPIRE_HRS)
 
+    for start in range(0, len(new_links), chunk_size):
+        chunk = new_links[start:start + chunk_size]
+
+        existing = {}
+        for page in Page.objects.filter(url__in=chunk).values(
+            "id", "url", "last_crawled_at", "etag", "last_modified", "content_hash"
+        ):
+            existing.setdefault(page["url"], []).append(page)
+
+        for link in chunk:
+            pages = existing.get(link, [])
+            fresh_cutoff = min(expire_cutoff, lastmods[link]) if lastmods.get(link) else expire_cutoff
+            if any(page["last_crawled_at"] and page["last_crawled_at"] >= fresh_cutoff for page in pages):
+                continue  # Fresh enough (or not modified since); skip
+
+            # Latest successful crawl, its validators tell if the page changed since
+            crawled = [page for page in pages if page["last_crawled_at"]]
+            latest = max(crawled, key=lambda page: page["last_crawled_at"]) if crawled else None
+            previous = None
+            if latest is not None:
+                previous = {key: latest[key] for key in ("id", "etag", "last_modified", "content_hash")}
+
+            frontier.push(
+                link, depth, stale_page_ids=[page["id"] for page in pages], previous=previous,
+                anchor_text=anchor_texts.get(link), sitemap_priority=priorities.get(link),
+            )
+
+
+def _enqueue_sitemap_urls(frontier, job, host_metadata):
+    """Seed the frontier (depth 1) with up to max_pages sitemap urls of the job's host, newest first.
+
+    Their sitemap <priority> raises (or lowers) their score in the frontier.
+    """
+    if not settings.CRAWL_USE_SITEMAPS or not job.max_depth:
+        return
+
+    root = urlparse(job.url)
+    try:
+        entries = host_metadata.sitemap_urls(f"{root.scheme}://{root.netloc}")
+    except Exception as e:
+        logger.warning(f"Sitemaps of {root.netloc} not available: {e}")
+        return
+
+    canonicalizer = get_url_canonicalizer()
+    host = urlparse(canonicalizer.canonicalize(job.url) or job.url).netloc
+    entries = [(canonicalizer.canonicalize(url), lastmod, priority) for url, lastmod, priority in entries]
+    entries = [entry for entry in entries if entry[0] is not None and urlparse(entry[0]).netloc == host]
+    entries.sort(key=lambda entry: entry[1] or datetime.min.replace(tzinfo=dt_timezone.utc), reverse=True)
+    entries = entries[:job.max_pages]
+    logger.info(f"Crawl job {job.id}: {len(entries)} urls from sitemaps")
+
+    _enqueue_links(
+        frontier, [url for url, _, _ in entries], 1, host_metadata,
+        lastmods={url: lastmod for url, lastmod, _ in entries},
+        priorities={url: priority for url, _, priority in entries if priority is not None},
+    )
+
+
+def _store_page(future, job, url, stale_page_ids, previous, page_writer, fingerprints):
+    """Buffer the Page row of a finished fetch and return the fetch result (for its child links).
+
+    If the page is unchanged since the ``previous`` crawl (304, or same content hash),
+    the previous row is kept - with its blob and index document - and moved to this job;
+    otherwise the stale rows are purged and a new row is added to be uploaded and indexed,
+    unless it is a near-duplicate of a page in ``fingerprints`` (then it only points to it).
+    Returns None if the fetch failed; the error is saved on the page.
+    """
+    try:
+        result = future.result()
+    except Exception as e:
+        # Mark page failed
+        page_writer.purge(stale_page_ids)
+        page_writer.add(Page(job=job, url=url, error=str(e)))
+        PAGES_TOTAL.labels(host=host_label(urlparse(url).netloc), outcome="failed").inc()
+        return None
+
+    now = timezone.now()
+    content_hash = None
+    if result.status_code != 304:
+        content_hash = hashlib.sha256(f"{result.title}\n{result.plain_text}".encode("utf-8")).hexdigest()
+
+    if previous and (result.status_code == 304 or content_hash == previous["content_hash"]):
+        # Unchanged; only bump the crawl time of the previous copy
+        page = Page(id=previous["id"], job=job, last_crawled_at=now)
+        update_fields = ["job", "last_crawled_at"]
+        if result.status_code != 304:
+            page.etag, page.last_modified = result.etag, result.last_modified
+            update_fields += ["etag", "last_modified"]
+        page_writer.update(page, update_fields)
+        PAGES_TOTAL.labels(host=host_label(urlparse(url).netloc), outcome="unchanged").inc()
+        page_writer.purge([page_id for page_id in stale_page_ids if page_id != previous["id"]])
+        return result
+
+    # Stale copies from earlier crawls; remove (in bulk) to allow fresh crawl
+    page_writer.purge(stale_page_ids)
+
+    # Error pages share templates, only fingerprint real content
+    fingerprint = None
+    if not (result.status_code and result.status_code >= 400):
+        fingerprint = simhash(result.plain_text)
+    original = fingerprints.find(fingerprint) if fingerprint is not None else None
+
+    page = Page(
+        job=job,
+        url=url,
+        last_crawled_at=now,
+        http_status=result.status_code,
+        etag=result.etag,
+        last_modified=result.last_modified,
+        content_hash=content_hash,
+        simhash=to_signed(fingerprint) if fingerprint is not None else None,
+        duplicate_of=original,
+    )
+
+    if original is not None:
+        # Near-duplicate; no blob / index document of its own
+        logger.debug(f"{url} is a near-duplicate of {original.url}")
+        page_writer.add(page)
+        PAGES_TOTAL.labels(host=host_label(urlparse(url).netloc), outcome="duplicate").inc()
+    else:
+        if fingerprint is not None:
+            fingerprints.add(fingerprint, page)
+        page_writer.add(page, payload=(result.html, result.plain_text, result.title))
+        PAGES_TOTAL.labels(host=host_label(urlparse(url).netloc), outcome="stored").inc()
+
+    return result
+
+
+def _write_pages(created, page_writer, uploader, uploads, indexer):
+    """Upload and index pages whose rows were just created (they have ids now)."""
+    for page, payload in created:
+        if payload is None:
+            continue
+        html, plain_text, title = payload
+
+        try:
+            # Save raw html in BLOB storage (in background; the key is saved once uploaded)
+            uploads[uploader.submit(page_id=page.id, content=html)] = page
+
+            # Send to Index storage (buffered, sent in bulk)
+            page.search_index_key = indexer.add(
+                url=page.url,
+                title=title,
+                content=plain_text,
+                page_id=page.id,
+                last_crawled_at=page.last_crawled_at,
+            )
+            page_writer.update(page, ["search_index_key"])
+
+        except Exception as e:
+            # Mark page failed
+            page.error = str(e)
+            page_writer.update(page, ["error"])
+
+
+def _settle(frontier, unsettled, page_writer, uploader, uploads, indexer, seal=False):
+    """Write what was crawled so far (rows, index documents, storage keys of finished uploads),
+    then mark done the ``unsettled`` urls whose content is stored, so a checkpoint never counts
+    a page still in memory. Urls whose upload (open segment) isn't done stay active, i.e.
+    checkpointed as queued, until a later settle; ``seal`` uploads the open segment now.
+    """
+    _write_pages(page_writer.flush(), page_writer, uploader, uploads, indexer)
+    if seal:
+        uploader.flush()
+        wait(uploads)
+    _save_uploads(uploads, page_writer)
+    indexer.flush()
+    _mark_index_errors(indexer.pop_failed(), page_writer)
+    page_writer.flush()
+
+    uploading = {page.url for page in uploads.values()}
+    for url in unsettled:
+        if url not in uploading:
+            frontier.done(url)
+    unsettled[:] = [url for url in unsettled if url in uploading]
+
+
+@contextmanager
+def _salvage_on_error(page_writer, uploads):
+    """If the crawl loop fails: save the storage keys of finished uploads, and write the
+    buffered pages marked as not stored (their urls are re-crawled if the job is resumed)."""
+    try:
+        yield
     except Exception:
-        job.mark_failed()
+        try:
+            _save_uploads(uploads, page_writer)
+            for page in uploads.values():
+                page.error = "Content not stored: crawl failed"
+                page_writer.update(page, ["error"])
+            for page, payload in page_writer.flush():
+                if payload is not None:
+                    page.error = "Content not stored: crawl failed"
+                    page_writer.update(page, ["error"])
+            page_writer.flush()
+        except Exception as e:
+            logger.warning(f"Pages of a failed crawl not saved: {e}")
         raise
+
+
+def _mark_index_errors(failed, page_writer):
+    """Record documents rejected by the bulk indexer on their Page rows."""
+    for page_id, error in failed.items():
+        page_writer.update(Page(id=page_id, error=error, search_index_key=None), ["error", "search_index_key"])
+
+
+def _save_uploads(uploads, page_writer):
+    """Save storage keys (or upload errors) of finished uploads on their Page rows."""
+    for future in [future for future in uploads if future.done()]:
+        page = uploads.pop(future)
+        try:
+            result = future.result()
+            if isinstance(result, SegmentRef):
+                page.segment_key, page.segment_offset, page.segment_length = result
+                page_writer.update(page, ["segment_key", "segment_offset", "segment_length"])
+            else:
+                page.storage_key_raw = result
+                page_writer.update(page, ["storage_key_raw"])
+        except Exception as e:
+            page.error = f"Upload failed: {e}"
+            page_writer.update(page, ["error"])
@@ -0,0 +1,84 @@
+"""
+Near-duplicate detection helpers
+
+simhash - 64-bit SimHash fingerprint of a text (word 3-shingles)
+SimHashIndex - Compact in-memory index of fingerprints, finds near-duplicates by Hamming distance
+
+Pages served under several URLs (print views, tracking params, mirrors) have the same
+or almost the same extracted text, so their fingerprints differ in a few bits only.
+"""
+
+import hashlib
+import re
+
+from django.conf import settings
+
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+MIN_WORDS = 20  # too little text to tell pages apart (empty / error pages)
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def simhash(text: str) -> int | None:
+    """64-bit SimHash of ``text``, or None if it has fewer than MIN_WORDS words."""
+    words = _WORD_RE.findall((text or "").lower())
+    if len(words) < MIN_WORDS:
+        return None
+
+    weights = {}
+    for i in range(len(words) - SHINGLE_SIZE + 1):
+        shingle = " ".join(words[i:i + SHINGLE_SIZE])
+        weights[shingle] = weights.get(shingle, 0) + 1
+
+    counts = [0] * FINGERPRINT_BITS
+    for shingle, weight in weights.items():
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        for bit in range(FINGERPRINT_BITS):
+            counts[bit] += weight if h >> bit & 1 else -weight
+
+    return sum(1 << bit for bit, count in enumerate(counts) if count > 0)
+
+
+def to_signed(fingerprint: int) -> int:
+    """Fingerprint as a signed 64-bit int (fits a BigIntegerField)."""
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+class SimHashIndex:
+    """Fingerprints split into ``max_distance + 1`` bands.
+
+    Two fingerprints within ``max_distance`` bits of each other are equal in at least
+    one band (pigeonhole), so a lookup only compares against fingerprints sharing a band.
+    """
+
+    def __init__(self, max_distance: int = None):
+        self.max_distance = max_distance if max_distance is not None else getattr(
+            settings, "CRAWL_SIMHASH_MAX_DISTANCE", 3
+        )
+        num_bands = self.max_distance + 1
+        self._band_bits = -(-FINGERPRINT_BITS // num_bands)  # ceil
+        self._band_mask = (1 << self._band_bits) - 1
+        self._bands = [{} for _ in range(num_bands)]  # band value -> [(fingerprint, item)]
+        self._size = 0
+
+    def _band_keys(self, fingerprint: int):
+        for band in range(len(self._bands)):
+            yield band, fingerprint >> (band * self._band_bits) & self._band_mask
+
+    def add(self, fingerprint: int, item) -> None:
+        for band, key in self._band_keys(fingerprint):
+            self._bands[band].setdefault(key, []).append((fingerprint, item))
+        self._size += 1
+
+    def find(self, fingerprint: int):
+        """Item of a near-duplicate of ``fingerprint``, or None."""
+        for band, key in self._band_keys(fingerprint):
+            for candidate, item in self._bands[band].get(key, ()):
+                if (candidate ^ fingerprint).bit_count() <= self.max_distance:
+                    return item
+        return None
+
+    def __len__(self):
+        return self._size
@@ -0,0 +1,623 @@
+"""
+Crawl frontier helpers
+
+CrawlFrontier - Priority frontier (heap) that only accepts URLs not seen before in the job
+RedisFrontier - Same interface, shared through Redis by many workers of one job
+BloomFilter - Compact probabilistic "seen" set, used instead of a set for very large jobs
+partition_entries - Split frontier entries into shards by path prefix (partitioned jobs)
+
+Frontier entries are ``(url, depth, stale_page_ids, previous)``, where ``stale_page_ids``
+are Page rows of earlier crawls of the url that should be purged once it is re-crawled,
+and ``previous`` is the latest of them as ``{"id", "etag", "last_modified", "content_hash"}``
+(None if the url was never crawled), used to detect unchanged pages.
+Both frontiers own the ``max_pages`` budget: ``pop`` returns None once it is spent.
+Entries are popped highest score first (see tasks/priority.py, CRAWL_URL_SCORER); urls
+linked again while queued gain in-link score. The queue is bounded
+(CRAWL_FRONTIER_MAX_QUEUED), the lowest scored entries are dropped beyond it.
+
+A job's crawl can be resumed after a crash or an SLA cut-off: CrawlFrontier checkpoints
+its queue, visited set and counters to Redis every CRAWL_CHECKPOINT_INTERVAL_S, and
+RedisFrontier state lives in Redis anyway (unfinished leases are given back). The crawl
+loop calls ``done`` only once a page is written (row, blob, index), so urls whose page
+is still buffered are checkpointed as queued and leases aren't acked early.
+
+Partitioned jobs (see run_partitioned_crawl_job) crawl the first levels with a CrawlFrontier
+holding deeper entries back (``hold_depth``), split them into shards with partition_entries
+and seed one CrawlFrontier per shard; shards claim urls in a visited set shared through
+Redis (``shared_seen_key``), so they never crawl the same url.
+"""
+
+import base64
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import math
+import time
+import uuid
+import zlib
+from collections import deque
+from urllib.parse import urlparse
+
+import redis
+from django.conf import settings
+
+from tasks.priority import get_url_scorer
+
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings.
+
+    Never gives false negatives; false positives (a new URL reported as seen,
+    so it is not crawled) happen at roughly ``error_rate`` while fewer than
+    ``capacity`` items were added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> bool:
+        """Add ``item``; return True if it was not (probably) present before."""
+        added = False
+        for pos in self._positions(item):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not self._bits[byte] & mask:
+                self._bits[byte] |= mask
+                added = True
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def to_dict(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "bits": base64.b64encode(bytes(self._bits)).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BloomFilter":
+        bloom = cls(data["capacity"], data["error_rate"])
+        bloom._bits = bytearray(base64.b64decode(data["bits"]))
+        return bloom
+
+
+class CrawlFrontier:
+    """Per-job priority frontier with a visited/enqueued filter.
+
+    Each URL is let through :meth:`mark_seen` once per job, so hub pages linked
+    from many parents are queued (and looked up in the DB) only once, and the
+    queue size reflects unique work; being linked again raises its score instead.
+
+    The queue is a heap of ``(-score, seq, url)``; score changes push a new heap item
+    and outdated ones are skipped on pop. Ties pop in discovery order.
+
+    Given a ``job_id``, the frontier is checkpointed to Redis from :meth:`heartbeat`
+    and can be restored with :meth:`restore` to resume the job.
+
+    Entries deeper than ``hold_depth`` are not queued but kept in ``held`` (to be
+    partitioned). With a ``shared_seen_key``, urls are also claimed in that Redis set,
+    and only the ones no other frontier claimed before are let through.
+    """
+
+    # Rough upper bound of unique links discovered per crawled page
+    LINKS_PER_PAGE = 50
+    CHECKPOINT_TTL_S = 48 * 3600
+
+    def __init__(self, max_pages: int, job_id=None, redis_client=None, scorer=None, hold_depth: int = None,
+                 shared_seen_key: str = None):
+        self.max_pages = max_pages
+        self.pages_discovered = 0
+        expected_urls = max_pages * self.LINKS_PER_PAGE
+        if expected_urls > getattr(settings, "CRAWL_BLOOM_THRESHOLD", 1_000_000):
+            self._seen = BloomFilter(expected_urls)
+        else:
+            self._seen = set()
+        self.scorer = scorer or get_url_scorer()
+        self.max_queued = getattr(settings, "CRAWL_FRONTIER_MAX_QUEUED", None) or max(1000, max_pages * 10)
+
+        self._heap = []  # (-score, seq, url)
+        self._queued = {}  # url -> [base score, in-links, entry]
+        self._active = {}  # url -> [base score, in-links, entry], popped but not done
+        self._seq = itertools.count()
+        self.hold_depth = hold_depth
+        self.held = {}  # url -> [base score, in-links, entry], deeper than hold_depth
+
+        self.job_id = str(job_id) if job_id is not None else None
+        self.shared_seen_key = shared_seen_key
+        self.redis = None
+        if self.job_id is not None or shared_seen_key is not None:
+            self.redis = redis_client or redis.Redis.from_url(settings.REDISCLOUD_URL)
+        self.checkpoint_interval_s = getattr(settings, "CRAWL_CHECKPOINT_INTERVAL_S", 30)
+        self._checkpointed_at = time.monotonic()
+
+    def mark_seen(self, urls) -> list[str]:
+        """Mark ``urls`` as seen; return the ones that were not seen before.
+
+        Urls seen before that are still queued get an in-link boost.
+        """
+        new_urls = []
+        for url in urls:
+            if url in self._seen:
+                item = self._queued.get(url)
+                if item is not None and item[1] < self.scorer.INLINK_MAX:
+                    item[1] += 1
+                    self._heap_push(url, item)
+                elif url in self.held and self.held[url][1] < self.scorer.INLINK_MAX:
+                    self.held[url][1] += 1
+                continue
+            self._seen.add(url)
+            new_urls.append(url)
+        if self.shared_seen_key is not None and new_urls:
+            new_urls = self._claim(new_urls)
+        return new_urls
+
+    def _claim(self, urls: list[str]) -> list[str]:
+        """Urls added to the shared visited set now (not claimed by another frontier before)."""
+        pipe = self.redis.pipeline(transaction=False)
+        for url in urls:
+            pipe.sadd(self.shared_seen_key, url)
+        pipe.expire(self.shared_seen_key, self.CHECKPOINT_TTL_S)
+        added = pipe.execute()
+        return [url for url, is_new in zip(urls, added) if is_new]
+
+    def push(self, url: str, depth: int, stale_page_ids=(), previous: dict = None,
+             anchor_text: str = None, sitemap_priority: float = None) -> None:
+        score = self.scorer.score(url, depth, anchor_text=anchor_text, sitemap_priority=sitemap_priority)
+        item = [score, 0, (url, depth, list(stale_page_ids), previous)]
+        if self.hold_depth is not None and depth > self.hold_depth:
+            self.held[url] = item
+            return
+        self._queued[url] = item
+        self._heap_push(url, item)
+        if len(self._queued) > self.max_queued * 1.25:
+            self._trim()
+
+    def pop(self) -> tuple[str, int, list[int], dict | None] | None:
+        """Next (highest scored) entry to crawl, or None if the queue is empty or ``max_pages`` reached."""
+        if self.pages_discovered >= self.max_pages:
+            return None
+        while self._heap:
+            neg_score, _, url = heapq.heappop(self._heap)
+            item = self._queued.get(url)
+            if item is None or -neg_score != self._score(item):
+                continue  # outdated heap item
+            del self._queued[url]
+            self.pages_discovered += 1
+            self._active[url] = item
+            return item[2]
+        return None
+
+    def done(self, url: str) -> None:
+        """Crawl of a popped url (incl. queueing its links) finished."""
+        self._active.pop(url, None)
+
+    def is_drained(self) -> bool:
+        """True if no more entries will ever be available."""
+        return not self._queued or self.pages_discovered >= self.max_pages
+
+    def heartbeat(self) -> None:
+        """Called regularly by the crawl loop; checkpoints every ``checkpoint_interval_s``."""
+        if self.redis is not None and time.monotonic() - self._checkpointed_at >= self.checkpoint_interval_s:
+            try:
+                self.checkpoint()
+            except redis.RedisError as e:
+                logger.warning(f"Checkpoint of crawl job {self.job_id} failed: {e}")
+
+    def _score(self, item) -> float:
+        base_score, inlinks, _ = item
+        return base_score + self.scorer.INLINK_STEP * inlinks
+
+    def _heap_push(self, url: str, item) -> None:
+        heapq.heappush(self._heap, (-self._score(item), next(self._seq), url))
+        if len(self._heap) > 2 * len(self._queued) + 1000:
+            self._rebuild_heap()
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(-self._score(item), next(self._seq), url) for url, item in self._queued.items()]
+        heapq.heapify(self._heap)
+
+    def _trim(self) -> None:
+        """Keep the ``max_queued`` best entries (memory bound); the dropped urls stay seen."""
+        keep = heapq.nlargest(self.max_queued, self._queued.items(), key=lambda kv: self._score(kv[1]))
+        logger.info(f"Frontier over {self.max_queued} urls, dropped {len(self._queued) - len(keep)} lowest scored")
+        self._queued = dict(keep)
+        self._rebuild_heap()
+
+    # ------------------------------------------------------------------
+    # Checkpoints
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def checkpoint_key(job_id) -> str:
+        return f"crawl:{job_id}:checkpoint"
+
+    @classmethod
+    def has_checkpoint(cls, job_id, redis_client=None) -> bool:
+        redis_client = redis_client or redis.Redis.from_url(settings.REDISCLOUD_URL)
+        return bool(redis_client.exists(cls.checkpoint_key(job_id)))
+
+    @staticmethod
+    def shared_seen_key(job_id) -> str:
+        """Visited set shared by the shards of a partitioned job."""
+        return f"crawl:{job_id}:shared_seen"
+
+    @classmethod
+    def delete_shared_seen(cls, job_id, redis_client=None) -> None:
+        redis_client = redis_client or redis.Redis.from_url(settings.REDISCLOUD_URL)
+        redis_client.delete(cls.shared_seen_key(job_id))
+
+    def checkpoint(self) -> None:
+        """Save queue, visited set and counters; urls in progress are saved as queued."""
+        active = list(self._active.values())
+        if isinstance(self._seen, BloomFilter):
+            seen = {"bloom": self._seen.to_dict()}
+        else:
+            seen = {"urls": list(self._seen)}
+        state = {
+            "queue": active + list(self._queued.values()),  # [base score, in-links, entry]
+            "held": list(self.held.values()),
+            "seen": seen,
+            "pages_discovered": self.pages_discovered - len(active),
+            "saved_at": time.time(),
+        }
+        payload = zlib.compress(json.dumps(state).encode("utf-8"))
+        self.redis.set(self.checkpoint_key(self.job_id), payload, ex=self.CHECKPOINT_TTL_S)
+        self._checkpointed_at = time.monotonic()
+
+    def restore(self) -> bool:
+        """Load the job's last checkpoint; False if there is none."""
+        payload = self.redis.get(self.checkpoint_key(self.job_id))
+        if payload is None:
+            return False
+        state = json.loads(zlib.decompress(payload))
+        self._queued = {entry[0]: [base_score, inlinks, tuple(entry)] for base_score, inlinks, entry in state["queue"]}
+        self._rebuild_heap()
+        self.held = {entry[0]: [base_score, inlinks, tuple(entry)] for base_score, inlinks, entry in state.get("held", [])}
+        if "bloom" in state["seen"]:
+            self._seen = BloomFilter.from_dict(state["seen"]["bloom"])
+        else:
+            self._seen = set(state["seen"]["urls"])
+        self.pages_discovered = state["pages_discovered"]
+        self._active = {}
+        logger.info(f"Crawl job {self.job_id} resumed: {len(self._queued)} queued, {self.pages_discovered} crawled")
+        return True
+
+    def queued_entries(self) -> list[tuple]:
+        """Entries still to crawl (not held back)."""
+        return [item[2] for item in self._queued.values()]
+
+    def hold_queued(self) -> None:
+        """Move the entries still queued to ``held`` (e.g. the SLA cut the crawl short)."""
+        self.held.update(self._queued)
+        self._queued = {}
+        self._heap = []
+
+    def seed(self, items) -> None:
+        """Queue ``[base score, in-links, entry]`` items (e.g. a shard of another frontier's
+        ``held`` ones) and checkpoint them, for the job to start from with :meth:`restore`."""
+        self._queued = {entry[0]: [base_score, inlinks, tuple(entry)] for base_score, inlinks, entry in items}
+        self._rebuild_heap()
+        for url in self._queued:
+            self._seen.add(url)
+        self.checkpoint()
+
+    def delete_checkpoint(self) -> None:
+        if self.redis is not None:
+            self.redis.delete(self.checkpoint_key(self.job_id))
+
+    def __len__(self):
+        return len(self._queued)
+
+
+def partition_entries(items, shards: int) -> list[list]:
+    """Split frontier ``items`` (``[base score, in-links, entry]``) into up to ``shards`` groups.
+
+    Urls are grouped by host and first path segment, so a section of a site (whose pages
+    mostly link to each other) lands in one shard; groups are packed largest first into the
+    least loaded shard. A group larger than a fair share is spread by url hash instead.
+    """
+    items = list(items)
+    shards = max(1, min(shards, len(items)))
+    fair_share = math.ceil(len(items) / shards)
+
+    groups = {}
+    for item in items:
+        parts = urlparse(item[2][0])
+        groups.setdefault((parts.netloc, parts.path.strip("/").split("/", 1)[0]), []).append(item)
+
+    partitions = [[] for _ in range(shards)]
+    for group in sorted(groups.values(), key=len, reverse=True):
+        if len(group) > fair_share:
+            for item in group:
+                digest = hashlib.blake2b(item[2][0].encode("utf-8"), digest_size=8).digest()
+                partitions[int.from_bytes(digest, "big") % shards].append(item)
+        else:
+            min(partitions, key=len).extend(group)
+    return [partition for partition in partitions if partition]
+
+
+class RedisFrontier:
+    """Frontier, visited set and page budget of one job, shared by several workers through Redis.
+
+    The queue is a sorted set of urls by score (entries in a hash next to it).
+    Workers lease small batches of the highest scored entries; a lease is acknowledged
+    once all its urls are crawled and their links queued. Leases of workers that stop
+    sending heartbeats expire and their entries go back to the queue. The frontier is
+    drained once the queue is empty and no leases are outstanding.
+    """
+
+    KEY_TTL_S = 48 * 3600  # safety net; keys are deleted when the job is finalized
+    TRIM_EVERY = 100  # pushes between queue size checks
+
+    # Requeue expired leases, then lease up to ARGV[3] best entries within the page budget.
+    # Returns a flat list: entry, score, entry, score, ...
+    LEASE_SCRIPT = """
+    local queue, entries, pages, leases, lease_expiry = KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5]
+    local now, lease_id, count, max_pages, lease_ttl = tonumber(ARGV[1]), ARGV[2], tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5])
+
+    for _, expired_id in ipairs(redis.call('ZRANGEBYSCORE', lease_expiry, '-inf', now)) do
+        local leased = redis.call('HGET', leases, expired_id)
+        if leased then
+            local items = cjson.decode(leased)
+            for _, item in ipairs(items) do
+                local url = cjson.decode(item[1])[1]
+                redis.call('ZADD', queue, item[2], url)
+                redis.call('HSET', entries, url, item[1])
+            end
+            redis.call('DECRBY', pages, #items)
+            redis.call('HDEL', leases, expired_id)
+        end
+        redis.call('ZREM', lease_expiry, expired_id)
+    end
+
+    local n = math.min(count, max_pages - tonumber(redis.call('GET', pages) or '0'))
+    if n <= 0 then
+        return {}
+    end
+    local popped = redis.call('ZPOPMAX', queue, n)
+    local result, items = {}, {}
+    for i = 1, #popped, 2 do
+        local entry = redis.call('HGET', entries, popped[i])
+        redis.call('HDEL', entries, popped[i])
+        if entry then
+            table.insert(result, entry)
+            table.insert(result, popped[i + 1])
+            table.insert(items, {entry, tonumber(popped[i + 1])})
+        end
+    end
+    if #items == 0 then
+        return {}
+    end
+    redis.call('INCRBY', pages, #items)
+    redis.call('HSET', leases, lease_id, cjson.encode(items))
+    redis.call('ZADD', lease_expiry, now + lease_ttl, lease_id)
+    return result
+    """
+
+    # In-link boost of urls (ARGV[3..]) still queued: +ARGV[1] per link, up to ARGV[2] links.
+    BUMP_SCRIPT = """
+    local queue, inlinks = KEYS[1], KEYS[2]
+    local step, max_links = tonumber(ARGV[1]), tonumber(ARGV[2])
+    for i = 3, #ARGV do
+        if redis.call('ZSCORE', queue, ARGV[i]) then
+            if redis.call('HINCRBY', inlinks, ARGV[i], 1) <= max_links then
+                redis.call('ZINCRBY', queue, step, ARGV[i])
+            end
+        end
+    end
+    """
+
+    # Drop the lowest scored entries beyond ARGV[1] queued urls.
+    TRIM_SCRIPT = """
+    local queue, entries = KEYS[1], KEYS[2]
+    local extra = redis.call('ZCARD', queue) - tonumber(ARGV[1])
+    if extra <= 0 then
+        return 0
+    end
+    local victims = redis.call('ZRANGE', queue, 0, extra - 1)
+    redis.call('ZREMRANGEBYRANK', queue, 0, extra - 1)
+    for i = 1, #victims, 1000 do
+        redis.call('HDEL', entries, unpack(victims, i, math.min(i + 999, #victims)))
+    end
+    return extra
+    """
+
+    # Deregister a worker; return 1 to exactly one worker - the last one alive.
+    LEAVE_SCRIPT = """
+    local workers, finalized = KEYS[1], KEYS[2]
+    redis.call('ZREM', workers, ARGV[1])
+    redis.call('ZREMRANGEBYSCORE', workers, '-inf', tonumber(ARGV[2]))
+    if redis.call('ZCARD', workers) == 0 and redis.call('SETNX', finalized, 1) == 1 then
+        return 1
+    end
+    return 0
+    """
+
+    def __init__(self, job_id, max_pages: int, redis_client=None, lease_size: int = None, scorer=None):
+        self.job_id = str(job_id)
+        self.max_pages = max_pages
+        self.redis = redis_client or redis.Redis.from_url(settings.REDISCLOUD_URL)
+        self.lease_size = lease_size or getattr(settings, "CRAWL_DISTRIBUTED_LEASE_SIZE", 10)
+        self.lease_ttl_s = getattr(settings, "CRAWL_DISTRIBUTED_LEASE_TTL_S", 600)
+        self.heartbeat_ttl_s = getattr(settings, "CRAWL_DISTRIBUTED_HEARTBEAT_TTL_S", 120)
+        self.scorer = scorer or get_url_scorer()
+        self.max_queued = getattr(settings, "CRAWL_FRONTIER_MAX_QUEUED", None) or max(1000, max_pages * 10)
+        self.worker_id = uuid.uuid4().hex
+
+        prefix = f"crawl:{self.job_id}:"
+        self.keys = {
+            name: prefix + name
+            for name in (
+                "pqueue", "entries", "inlinks", "seen", "pages", "leases", "lease_expiry", "workers", "finalized",
+            )
+        }
+        self._lease_script = self.redis.register_script(self.LEASE_SCRIPT)
+        self._bump_script = self.redis.register_script(self.BUMP_SCRIPT)
+        self._trim_script = self.redis.register_script(self.TRIM_SCRIPT)
+        self._leave_script = self.redis.register_script(self.LEAVE_SCRIPT)
+
+        self._buffer = deque()  # (lease_id, raw entry, score) leased but not popped yet
+        self._active = {}  # url -> (lease_id, raw entry, score), popped but not done
+        self._lease_remaining = {}  # lease_id -> urls of the lease not done yet
+        self._pushes = 0
+
+    # ------------------------------------------------------------------
+    # Worker lifecycle
+    # ------------------------------------------------------------------
+
+    def join(self) -> bool:
+        """Register this worker; False if the job was already finalized."""
+        if self.redis.exists(self.keys["finalized"]):
+            return False
+        self.heartbeat()
+        return True
+
+    def heartbeat(self) -> None:
+        """Keep this worker and its leases alive."""
+        now = time.time()
+        pipe = self.redis.pipeline()
+        pipe.zadd(self.keys["workers"], {self.worker_id: now + self.heartbeat_ttl_s})
+        for lease_id in self._lease_remaining:
+            pipe.zadd(self.keys["lease_expiry"], {lease_id: now + self.lease_ttl_s}, xx=True)
+        for name, key in self.keys.items():
+            if name != "finalized":
+                pipe.expire(key, self.KEY_TTL_S)
+        pipe.execute()
+
+    def leave(self) -> bool:
+        """Deregister this worker and give back unfinished work (leased or in progress).
+
+        Returns True for exactly one worker - the last one to leave - which should finalize the job.
+        """
+        pipe = self.redis.pipeline()
+        unfinished = [(entry, score) for _, entry, score in self._active.values()]
+        unfinished += [(entry, score) for _, entry, score in self._buffer]
+        for entry, score in unfinished:
+            url = json.loads(entry)[0]
+            pipe.zadd(self.keys["pqueue"], {url: score})
+            pipe.hset(self.keys["entries"], url, entry)
+        if unfinished:
+            pipe.decrby(self.keys["pages"], len(unfinished))
+        for lease_id in self._lease_remaining:
+            pipe.hdel(self.keys["leases"], lease_id)
+            pipe.zrem(self.keys["lease_expiry"], lease_id)
+        pipe.execute()
+        self._buffer.clear()
+        self._active.clear()
+        self._lease_remaining.clear()
+
+        return bool(self._leave_script(
+            keys=[self.keys["workers"], self.keys["finalized"]],
+            args=[self.worker_id, time.time()],
+        ))
+
+    def reopen(self) -> None:
+        """Allow workers to join a finalized job again (resume); its queue and counters are kept."""
+        self.redis.delete(self.keys["finalized"], self.keys["workers"])
+
+    def delete(self) -> None:
+        """Remove the job's frontier state from Redis (the finalized flag expires on its own)."""
+        self.redis.delete(*[key for name, key in self.keys.items() if name != "finalized"])
+        self.redis.expire(self.keys["finalized"], self.KEY_TTL_S)
+
+    # ------------------------------------------------------------------
+    # Frontier interface
+    # ------------------------------------------------------------------
+
+    def mark_seen(self, urls) -> list[str]:
+        """Mark ``urls`` as seen by any worker of the job; return the ones that were not seen before.
+
+        Urls seen before that are still queued get an in-link boost.
+        """
+        urls = list(urls)
+        if not urls:
+            return []
+        pipe = self.redis.pipeline(transaction=False)
+        for url in urls:
+            pipe.sadd(self.keys["seen"], hashlib.blake2b(url.encode("utf-8"), digest_size=8).hexdigest())
+        added = pipe.execute()
+
+        seen_before = [url for url, is_new in zip(urls, added) if not is_new]
+        if seen_before and self.scorer.INLINK_MAX:
+            self._bump_script(
+                keys=[self.keys["pqueue"], self.keys["inlinks"]],
+                args=[self.scorer.INLINK_STEP, self.scorer.INLINK_MAX, *seen_before],
+            )
+        return [url for url, is_new in zip(urls, added) if is_new]
+
+    def push(self, url: str, depth: int, stale_page_ids=(), previous: dict = None,
+             anchor_text: str = None, sitemap_priority: float = None) -> None:
+        score = self.scorer.score(url, depth, anchor_text=anchor_text, sitemap_priority=sitemap_priority)
+        pipe = self.redis.pipeline()
+        pipe.hset(self.keys["entries"], url, json.dumps([url, depth, list(stale_page_ids), previous]))
+        pipe.zadd(self.keys["pqueue"], {url: score})
+        pipe.execute()
+
+        self._pushes += 1
+        if self._pushes % self.TRIM_EVERY == 0:
+            dropped = self._trim_script(keys=[self.keys["pqueue"], self.keys["entries"]], args=[self.max_queued])
+            if dropped:
+                logger.info(f"Frontier of job {self.job_id} over {self.max_queued} urls, dropped {dropped} lowest scored")
+
+    def pop(self) -> tuple[str, int, list[int], dict | None] | None:
+        """Next entry leased by this worker, or None if none is available right now."""
+        if not self._buffer:
+            self._lease()
+        if not self._buffer:
+            return None
+        lease_id, entry, score = self._buffer.popleft()
+        url, depth, stale_page_ids, previous = json.loads(entry)
+        self._active[url] = (lease_id, entry, score)
+        return url, depth, stale_page_ids, previous
+
+    def done(self, url: str) -> None:
+        lease_id, _, _ = self._active.pop(url, (None, None, None))
+        if lease_id is None:
+            return
+        self._lease_remaining[lease_id] -= 1
+        if not self._lease_remaining[lease_id]:
+            del self._lease_remaining[lease_id]
+            pipe = self.redis.pipeline()
+            pipe.hdel(self.keys["leases"], lease_id)
+            pipe.zrem(self.keys["lease_expiry"], lease_id)
+            pipe.execute()
+
+    def is_drained(self) -> bool:
+        """True once the page budget is spent, or the queue is empty and no worker holds a lease."""
+        pipe = self.redis.pipeline()
+        pipe.get(self.keys["pages"])
+        pipe.zcard(self.keys["pqueue"])
+        pipe.zcard(self.keys["lease_expiry"])
+        pages, queued, leased = pipe.execute()
+        return int(pages or 0) >= self.max_pages or (queued == 0 and leased == 0)
+
+    def _lease(self) -> None:
+        lease_id = f"{self.worker_id}:{uuid.uuid4().hex[:8]}"
+        result = self._lease_script(
+            keys=[self.keys[name] for name in ("pqueue", "entries", "pages", "leases", "lease_expiry")],
+            args=[time.time(), lease_id, self.lease_size, self.max_pages, self.lease_ttl_s],
+        )
+        if result:
+            leased = [(lease_id, result[i], float(result[i + 1])) for i in range(0, len(result), 2)]
+            self._lease_remaining[lease_id] = len(leased)
+            self._buffer.extend(leased)
+
+    def __len__(self):
+        return len(self._buffer) + self.redis.zcard(self.keys["pqueue"])
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from models.crawl_job import CrawlJob
+from services.crawl_service import CrawlService, JobNotResumableError
+
+
+class Command(BaseCommand):
+    help = 'Resume a failed or cut-short crawl job from its checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_id', help='Crawl job to resume')
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Also resume a job still marked queued/running (its worker died)',
+        )
+
+    def handle(self, *args, **options):
+        job_id = options['job_id']
+
+        try:
+            job_data = CrawlService.resume_crawl(job_id, force=options['force'])
+        except CrawlJob.DoesNotExist:
+            raise CommandError(f'Job not found: {job_id}')
+        except JobNotResumableError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Job {job_data["job_id"]} ({job_data["url"]}) queued for resume.')
+        )
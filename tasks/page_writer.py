@@ -0,0 +1,171 @@
+"""
+PageWriter - Write-behind buffer for Page rows of a crawl worker.
+
+Instead of several round-trips per page (create, save, error save, stale delete),
+Page rows are collected in memory and written with bulk_create / bulk_update,
+and stale pages are purged in bulk, once per flush.
+"""
+
+import logging
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from models.page import Page
+from integrations.blob_storage_client import BlobStorageClient
+from integrations.metrics import timed
+from integrations.search_index_client import SearchIndexClient
+
+
+logger = logging.getLogger(__name__)
+
+
+class PageWriter:
+    """Buffer Page inserts, updates and stale-page deletes and flush them in bulk.
+
+    Flushes are driven by the caller (:meth:`flush_if_due` / :meth:`flush`), every
+    ``flush_interval_s`` seconds or once ``max_batch`` new pages are buffered.
+    Each flush runs purge -> bulk_create -> bulk_update, in that order, and returns
+    the created pages with the payload they were added with.
+    """
+
+    def __init__(
+        self,
+        blob_storage_client: Optional[BlobStorageClient] = None,
+        search_index_client: Optional[SearchIndexClient] = None,
+        max_batch: Optional[int] = None,
+        flush_interval_s: Optional[float] = None,
+    ):
+        self.blob_storage_client = blob_storage_client or BlobStorageClient()
+        self.search_index_client = search_index_client or SearchIndexClient()
+        self.max_batch = max_batch or getattr(settings, 'CRAWL_DB_BATCH_SIZE', 50)
+        self.flush_interval_s = flush_interval_s or getattr(settings, 'CRAWL_DB_FLUSH_INTERVAL_S', 2)
+
+        self._new = []  # (unsaved page, payload)
+        self._updates = {}  # page id -> (page, update_fields)
+        self._purge = []  # ids of stale pages to delete
+        self._last_flush = time.monotonic()
+
+    def add(self, page: Page, payload=None) -> None:
+        """Buffer a new (unsaved) page; it is returned with ``payload`` once created."""
+        self._new.append((page, payload))
+
+    def update(self, page: Page, update_fields: list[str]) -> None:
+        """Buffer an update of ``update_fields`` of an existing page.
+
+        Updates of the same page are merged, so ``page`` may also be a bare
+        ``Page(id=..., field=...)`` carrying just the changed values.
+        """
+        pending, fields = self._updates.get(page.id, (page, set()))
+        for field in update_fields:
+            setattr(pending, field, getattr(page, field))
+        self._updates[page.id] = (pending, fields | set(update_fields))
+
+    def purge(self, page_ids) -> None:
+        """Buffer stale pages for deletion (together with their blob and index document)."""
+        self._purge.extend(page_ids)
+
+    def flush_if_due(self) -> list[tuple[Page, object]]:
+        """Flush if the batch is full or ``flush_interval_s`` passed since the last flush."""
+        if len(self._new) >= self.max_batch or time.monotonic() - self._last_flush >= self.flush_interval_s:
+            return self.flush()
+        return []
+
+    def flush(self) -> list[tuple[Page, object]]:
+        """Write everything buffered; return ``(page, payload)`` of the pages created."""
+        if self._purge:
+            page_ids, self._purge = self._purge, []
+            with timed("db_purge"):
+                self._purge_pages(page_ids)
+
+        created = []
+        if self._new:
+            new, self._new = self._new, []
+            with timed("db_write", outcome="create"):
+                created = self._create(new)
+
+        if self._updates:
+            updates, self._updates = self._updates, {}
+            by_fields = {}
+            for page, fields in updates.values():
+                by_fields.setdefault(tuple(sorted(fields)), []).append(page)
+            with timed("db_write", outcome="update"):
+                for update_fields, pages in by_fields.items():
+                    Page.objects.bulk_update(pages, update_fields, batch_size=self.max_batch)
+
+        self._last_flush = time.monotonic()
+        return created
+
+    def _create(self, new: list[tuple[Page, object]]) -> list[tuple[Page, object]]:
+        """Create new pages; near-duplicates after the pages they point to, which may be in the same batch."""
+        originals, duplicates = [], []
+        for page, payload in new:
+            original = page.duplicate_of
+            (duplicates if original is not None and original.pk is None else originals).append((page, payload))
+
+        created = self._bulk_create(originals) if originals else []
+        if duplicates:
+            for page, _ in duplicates:
+                if page.duplicate_of.pk is None:
+                    page.duplicate_of = None  # original was not saved (already there), keep the page unlinked
+            created += self._bulk_create(duplicates)
+        return created
+
+    def _bulk_create(self, new: list[tuple[Page, object]]) -> list[tuple[Page, object]]:
+        """bulk_create new pages; primary keys are set on the objects (PostgreSQL / SQLite 3.35+)."""
+        try:
+            with transaction.atomic():
+                Page.objects.bulk_create([page for page, _ in new], batch_size=self.max_batch)
+            return new
+        except IntegrityError:
+            # Some url was already saved for the job (e.g. a distributed crawl lease was
+            # re-leased after a worker stalled); save one by one, skipping duplicates.
+            created = []
+            for page, payload in new:
+                page.pk = None
+                try:
+                    with transaction.atomic():
+                        page.save()
+                    created.append((page, payload))
+                except IntegrityError:
+                    logger.info(f"Page {page.url} already saved for job {page.job_id}, skipped")
+            return created
+
+    def _purge_pages(self, page_ids: list[int]) -> None:
+        """Bulk equivalent of ``Page.delete`` for many pages."""
+        pages = list(
+            Page.objects.filter(id__in=page_ids).only("id", "storage_key_raw", "search_index_key", "segment_key")
+        )
+        # Index documents (keyed by url, so shared by all rows of a url - e.g. the kept copy
+        # of an unchanged page), blobs (content-addressed ones may be shared) and segments
+        # are deleted once no other page references them
+        doc_ids = self._unreferenced(
+            "search_index_key", {page.search_index_key for page in pages if page.search_index_key}, page_ids
+        )
+        storage_keys = self._unreferenced(
+            "storage_key_raw", {page.storage_key_raw for page in pages if page.storage_key_raw}, page_ids
+        )
+        storage_keys += self._unreferenced(
+            "segment_key", {page.segment_key for page in pages if page.segment_key}, page_ids
+        )
+
+        if storage_keys:
+            try:
+                self.blob_storage_client.delete_many(storage_keys)
+            except Exception as e:
+                logger.warning(f"Failed to delete blobs of {len(storage_keys)} stale pages: {e}")
+
+        self.search_index_client.delete_pages(doc_ids)
+        Page.objects.filter(id__in=page_ids).delete()
+
+    def _unreferenced(self, field: str, keys: set[str], page_ids: list[int]) -> list[str]:
+        """``keys`` of ``field`` that no page other than ``page_ids`` references."""
+        if not keys:
+            return []
+        in_use = set(
+            Page.objects.filter(**{f"{field}__in": keys}).exclude(id__in=page_ids)
+            .values_list(field, flat=True).distinct()
+        )
+        return sorted(keys - in_use)
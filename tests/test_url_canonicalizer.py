@@ -0,0 +1,125 @@
+"""
+Tests of UrlCanonicalizer and of link resolution in HeadlessBrowser.parse_html.
+"""
+
+from django.test import SimpleTestCase, override_settings
+
+from integrations import url_canonicalizer
+from integrations.http_client import HeadlessBrowser
+from integrations.url_canonicalizer import UrlCanonicalizer
+
+
+class UrlCanonicalizerTests(SimpleTestCase):
+    def setUp(self):
+        self.canonicalizer = UrlCanonicalizer(tracking_params=["utm_*", "fbclid"], host_rules={}, learn=False)
+
+    def test_normalizes_scheme_host_port_and_fragment(self):
+        self.assertEqual(
+            self.canonicalizer.canonicalize("HTTP://Example.COM:80/a#top"), "http://example.com/a"
+        )
+        self.assertEqual(self.canonicalizer.canonicalize("https://example.com:8443/"), "https://example.com:8443")
+
+    def test_keeps_ipv6_brackets(self):
+        self.assertEqual(self.canonicalizer.canonicalize("http://[::1]:8080/x"), "http://[::1]:8080/x")
+        self.assertEqual(self.canonicalizer.canonicalize("https://[2001:DB8::1]:443/"), "https://[2001:db8::1]")
+
+    def test_strips_trailing_slash_like_stored_urls(self):
+        self.assertEqual(self.canonicalizer.canonicalize("https://example.com/"), "https://example.com")
+        self.assertEqual(self.canonicalizer.canonicalize("https://example.com/docs/"), "https://example.com/docs")
+
+    def test_removes_dot_segments_and_normalizes_escapes(self):
+        self.assertEqual(
+            self.canonicalizer.canonicalize("https://example.com/a/./b/../c%7e%2f"), "https://example.com/a/c~%2F"
+        )
+
+    def test_drops_tracking_params_and_sorts_query(self):
+        self.assertEqual(
+            self.canonicalizer.canonicalize("https://example.com/p?b=2&utm_source=x&a=1&fbclid=y"),
+            "https://example.com/p?a=1&b=2",
+        )
+
+    def test_host_rules(self):
+        canonicalizer = UrlCanonicalizer(
+            tracking_params=[], host_rules={"shop.com": {"drop_params": ["sort"], "lowercase_path": True}}, learn=False
+        )
+        self.assertEqual(canonicalizer.canonicalize("https://shop.com/A?sort=1&x=1"), "https://shop.com/a?x=1")
+
+    def test_rejects_non_http(self):
+        for href in ("mailto:a@example.com", "javascript:void(0)", "ftp://example.com/f"):
+            self.assertIsNone(self.canonicalizer.canonicalize(href, base="https://example.com/"))
+
+    def test_resolves_relative_to_directory_base(self):
+        self.assertEqual(
+            self.canonicalizer.canonicalize("intro.html", base="https://example.com/docs/"),
+            "https://example.com/docs/intro.html",
+        )
+        self.assertEqual(
+            self.canonicalizer.canonicalize("../a/b.html", base="https://example.com/x/y/"),
+            "https://example.com/x/a/b.html",
+        )
+
+
+class CanonicalLearningTests(SimpleTestCase):
+    def setUp(self):
+        self.canonicalizer = UrlCanonicalizer(tracking_params=[], host_rules={}, learn=True)
+
+    def teach(self, pages, query, canonical_query=""):
+        for i in range(pages):
+            canonical = f"/p{i}?{canonical_query}" if canonical_query else f"/p{i}"
+            self.canonicalizer.learn(f"https://shop.com/p{i}?{query}", canonical)
+
+    def test_learns_ignored_param_after_threshold(self):
+        self.teach(UrlCanonicalizer.LEARN_MIN - 1, "sid=1")
+        self.assertEqual(self.canonicalizer.canonicalize("https://shop.com/x?sid=9"), "https://shop.com/x?sid=9")
+        self.teach(1, "sid=1")
+        self.assertEqual(self.canonicalizer.canonicalize("https://shop.com/x?sid=9"), "https://shop.com/x")
+        self.assertEqual(self.canonicalizer.canonicalize("https://other.com/x?sid=9"), "https://other.com/x?sid=9")
+
+    def test_kept_param_is_not_learned(self):
+        self.teach(UrlCanonicalizer.LEARN_MIN, "color=red")
+        self.teach(UrlCanonicalizer.LEARN_MIN, "color=red", canonical_query="color=red")
+        self.assertEqual(self.canonicalizer.canonicalize("https://shop.com/x?color=red"), "https://shop.com/x?color=red")
+
+    def test_never_learns_content_params(self):
+        self.teach(2 * UrlCanonicalizer.LEARN_MIN, "page=2")
+        self.assertEqual(self.canonicalizer.canonicalize("https://shop.com/x?page=2"), "https://shop.com/x?page=2")
+
+    @override_settings(CRAWL_LEARN_CANONICAL=False)
+    def test_learning_is_opt_in(self):
+        canonicalizer = UrlCanonicalizer(tracking_params=[], host_rules={})
+        for i in range(UrlCanonicalizer.LEARN_MIN):
+            canonicalizer.learn(f"https://shop.com/p{i}?sid=1", f"/p{i}")
+        self.assertEqual(canonicalizer.canonicalize("https://shop.com/x?sid=9"), "https://shop.com/x?sid=9")
+
+
+@override_settings(CRAWL_TRACKING_PARAMS=["utm_*"], CRAWL_CANONICAL_HOST_RULES={}, CRAWL_LEARN_CANONICAL=False)
+class ParseHtmlLinkTests(SimpleTestCase):
+    def setUp(self):
+        url_canonicalizer._canonicalizer = None  # rebuilt with the test settings
+        self.addCleanup(setattr, url_canonicalizer, "_canonicalizer", None)
+        self.browser = HeadlessBrowser.__new__(HeadlessBrowser)  # parse_html needs no browser
+
+    def links(self, url, html, final_url=None):
+        return sorted(self.browser.parse_html(url, html, final_url=final_url)[2])
+
+    def test_relative_links_of_directory_page(self):
+        html = '<a href="intro.html">i</a><a href="../a/b.html">b</a>'
+        self.assertEqual(
+            self.links("https://example.com/x/y", html, final_url="https://example.com/x/y/"),
+            ["https://example.com/x/a/b.html", "https://example.com/x/y/intro.html"],
+        )
+
+    def test_base_href(self):
+        html = '<head><base href="/other/"></head><a href="x">x</a>'
+        self.assertEqual(self.links("https://example.com/dir/page", html), ["https://example.com/other/x"])
+
+    def test_skips_self_fragment_and_other_hosts(self):
+        html = '<a href="#top">t</a><a href="https://example.com/p/">p</a><a href="https://other.com/">o</a>'
+        self.assertEqual(self.links("https://example.com/p", html), [])
+
+    def test_clean_link(self):
+        self.assertEqual(
+            HeadlessBrowser._clean_link("c.html", "https://example.com/a", base="https://example.com/a/"),
+            "https://example.com/a/c.html",
+        )
+        self.assertIsNone(HeadlessBrowser._clean_link("https://other.com/c", "https://example.com/a"))